@@ -0,0 +1,57 @@
+# Micro-benchmark of response cleanup on large review and commit outputs
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.cleanup import clean_commit_message, clean_review_output, stream_review_output
+
+# One section of a typical review; repeated to the requested size
+SECTION = (
+	"## src/module.py\n\n"
+	"- WARNING: `fetch()` retries without backing off (line 42)\n"
+	"- GOOD: configuration is passed down explicitly\n\n"
+	"```python\n"
+	"def fetch(url):\n"
+	"    return session.get(url)\n"
+	"```\n\n"
+)
+OUTRO = "\n\nLet me know if you would like more detail on any of these findings."
+
+def make_text(size: int) -> str:
+	return "Here's the review:\n\n" + SECTION * max(1, size // len(SECTION)) + OUTRO
+
+def timed(fn, repeat: int) -> float:
+	best = float('inf')
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		best = min(best, time.perf_counter() - start)
+	return best
+
+def main():
+	parser = argparse.ArgumentParser(description="Time response cleanup on large inputs")
+	parser.add_argument('--sizes', type=float, nargs='+', default=[0.1, 1, 4, 16], help='Input sizes in MB')
+	parser.add_argument('--repeat', type=int, default=3, help='Runs per case (the fastest is reported)')
+	parser.add_argument('--chunk', type=int, default=16, help='Characters per piece when streaming')
+	args = parser.parse_args()
+	results = []
+	for mb in args.sizes:
+		text = make_text(int(mb * 1024 * 1024))
+		pieces = [text[i:i + args.chunk] for i in range(0, len(text), args.chunk)]
+		cases = {
+			'clean_review_output': lambda: clean_review_output(text),
+			'stream_review_output': lambda: ''.join(stream_review_output(pieces)),
+			'clean_commit_message': lambda: clean_commit_message(text),
+		}
+		for name, fn in cases.items():
+			seconds = timed(fn, args.repeat)
+			results.append({'case': name, 'mb': mb, 'seconds': seconds, 'mb_per_s': len(text) / 1024 / 1024 / seconds})
+			print(f"{name:<22} {mb:>6} MB: {seconds * 1000:9.1f} ms ({results[-1]['mb_per_s']:.1f} MB/s)", file=sys.stderr)
+	print(json.dumps({'python': sys.version.split()[0], 'chunk': args.chunk, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,43 @@
+# Micro-benchmark of keyword coloring on large review reports
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.colors import KeywordColorizer
+
+# A mix of lines that hit each keyword set, structural rules and no rule at all
+LINES = [
+	"## src/module.py",
+	"- ERROR: the connection is never closed when the request fails",
+	"- WARNING: consider caching the parsed configuration",
+	"- GOOD: errors are logged with enough context",
+	"  The loop at line 42 recomputes the same value on every iteration.",
+	"1. Move the lookup out of the loop",
+	"",
+]
+
+def main():
+	parser = argparse.ArgumentParser(description="Time keyword coloring on large reports")
+	parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000, 100000], help='Report sizes in lines')
+	parser.add_argument('--repeat', type=int, default=3, help='Runs per case (the fastest is reported)')
+	args = parser.parse_args()
+	colorizer = KeywordColorizer()
+	results = []
+	for count in args.lines:
+		report = [LINES[i % len(LINES)] for i in range(count)]
+		best = float('inf')
+		for _ in range(args.repeat):
+			start = time.perf_counter()
+			for _ in colorizer.lines(iter(report), enabled=True):
+				pass
+			best = min(best, time.perf_counter() - start)
+		results.append({'lines': count, 'seconds': best, 'us_per_line': best / count * 1e6})
+		print(f"{count:>8} lines: {best * 1000:8.1f} ms ({results[-1]['us_per_line']:.2f} us/line)", file=sys.stderr)
+	print(json.dumps({'python': sys.version.split()[0], 'results': results}, indent=2))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,63 @@
+# Deterministic synthetic repositories with staged diffs of a given size
+import random
+import subprocess
+from pathlib import Path
+from typing import List
+
+# Diff sizes (changed lines) measured by default
+SIZES = [10, 100, 1000, 10000, 100000]
+# Lines per generated file; kept under DIFF_MAX_FILE_LINES so the prefilter keeps every file
+FILE_LINES = 200
+
+_WORDS = ['value', 'count', 'items', 'config', 'result', 'buffer', 'index', 'total', 'name', 'path', 'cache', 'limit']
+
+def _line(rng: random.Random, n: int) -> str:
+	a, b, c = rng.sample(_WORDS, 3)
+	kind = n % 4
+	if kind == 0:
+		return f"def {a}_{b}_{n}({c}):"
+	if kind == 1:
+		return f"\t{a} = {c}.get('{b}', {rng.randint(0, 999)})"
+	if kind == 2:
+		return f"\tif {a} > {rng.randint(0, 99)}:"
+	return f"\t\treturn {a} + {b}_{c}"
+
+def _file(rng: random.Random, lines: int) -> List[str]:
+	return [_line(rng, n) for n in range(lines)]
+
+def _git(path: Path, *args: str):
+	subprocess.run(['git'] + list(args), cwd=str(path), check=True, stdout=subprocess.DEVNULL)
+
+def build_repo(path: Path, lines: int, seed: int = 0) -> str:
+	"""
+	Create a git repository at path with one base commit and about `lines` changed lines staged
+	on top of it: a third of the files are new, the rest have every line rewritten.
+	Returns the base commit, so a benchmark can reset back to the staged state after a commit.
+	"""
+	rng = random.Random(seed)
+	path.mkdir(parents=True, exist_ok=True)
+	_git(path, 'init', '-q', '-b', 'main')
+	_git(path, 'config', 'user.name', 'Benchmark')
+	_git(path, 'config', 'user.email', 'bench@example.com')
+	_git(path, 'config', 'commit.gpgsign', 'false')
+	(path / 'README.md').write_text("# Benchmark repository\n")
+	files = []
+	remaining = lines
+	while remaining > 0:
+		size = min(FILE_LINES, remaining)
+		files.append((f"src/pkg{len(files) // 50}/module_{len(files)}.py", size))
+		remaining -= size
+	for i, (name, size) in enumerate(files):
+		if i % 3:
+			target = path / name
+			target.parent.mkdir(parents=True, exist_ok=True)
+			target.write_text('\n'.join(_file(rng, size)) + '\n')
+	_git(path, 'add', '-A')
+	_git(path, 'commit', '-q', '-m', 'Base')
+	base = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=str(path), check=True, capture_output=True, text=True).stdout.strip()
+	for name, size in files:
+		target = path / name
+		target.parent.mkdir(parents=True, exist_ok=True)
+		target.write_text('\n'.join(_file(rng, size)) + '\n')
+	_git(path, 'add', '-A')
+	return base
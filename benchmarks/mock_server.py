@@ -0,0 +1,171 @@
+# Local stand-in for OpenAI- and Ollama-compatible LLM servers, with configurable latency and token rate
+import argparse
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, Iterator, List
+
+# Reply text the server streams back, one word per token; long enough for commit and review replies
+REPLY = (
+	"Add benchmark fixtures and tidy up module loading\n\n"
+	"- WARNING: the retry loop in fetch() never backs off between attempts\n"
+	"- GOOD: configuration is read once and passed down explicitly\n"
+	"- INFO: consider splitting the parser into smaller functions\n"
+)
+
+class MockLLMServer:
+	"""
+	Serves /v1/chat/completions, /v1/models, /api/chat, /api/generate and /api/tags on localhost.
+	Each reply waits `latency` seconds before the first token, then emits `tokens` words at
+	`token_rate` tokens per second (0 sends them all at once). Request and byte counts are kept
+	in `stats` so a benchmark can check how many provider calls a run made; Ollama warm-up
+	requests (no prompt) are answered at once and counted as `loads`.
+	"""
+
+	def __init__(self, port: int = 0, latency: float = 0.05, token_rate: float = 200.0, tokens: int = 60):
+		self.latency = latency
+		self.token_rate = token_rate
+		self.tokens = tokens
+		self.stats = {'requests': 0, 'loads': 0, 'bytes_received': 0, 'bytes_sent': 0}
+		self._lock = threading.Lock()
+		self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+		self._httpd.daemon_threads = True
+		self._thread = None
+
+	@property
+	def url(self) -> str:
+		host, port = self._httpd.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def start(self) -> 'MockLLMServer':
+		self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._httpd.shutdown()
+		self._httpd.server_close()
+
+	def reset_stats(self):
+		with self._lock:
+			for key in self.stats:
+				self.stats[key] = 0
+
+	def _count(self, **amounts):
+		with self._lock:
+			for key, value in amounts.items():
+				self.stats[key] += value
+
+	def words(self) -> List[str]:
+		words = REPLY.split(' ')
+		return [(words[i % len(words)] + ' ') for i in range(self.tokens)]
+
+	def paced(self) -> Iterator[str]:
+		"""Yield reply tokens on the configured schedule."""
+		start = time.perf_counter() + self.latency
+		for i, word in enumerate(self.words()):
+			due = start + (i / self.token_rate if self.token_rate > 0 else 0)
+			delay = due - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			yield word
+
+	def _handler(self):
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = 'HTTP/1.1'
+
+			def log_message(self, *args):
+				pass
+
+			def _json(self, body: Dict[str, Any]):
+				data = json.dumps(body).encode('utf-8')
+				self.send_response(200)
+				self.send_header('Content-Type', 'application/json')
+				self.send_header('Content-Length', str(len(data)))
+				self.end_headers()
+				self.wfile.write(data)
+				server._count(bytes_sent=len(data))
+
+			def _chunk(self, data: bytes):
+				self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+				self.wfile.flush()
+				server._count(bytes_sent=len(data))
+
+			def _start_stream(self, content_type: str):
+				self.send_response(200)
+				self.send_header('Content-Type', content_type)
+				self.send_header('Transfer-Encoding', 'chunked')
+				self.end_headers()
+
+			def do_GET(self):
+				if self.path.startswith('/api/tags'):
+					self._json({'models': [{'name': 'mock'}]})
+				else:
+					self._json({'object': 'list', 'data': [{'id': 'mock', 'object': 'model', 'created': 0, 'owned_by': 'mock'}]})
+
+			def do_POST(self):
+				body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+				request = json.loads(body or b'{}')
+				if self.path == '/api/generate' and not request.get('prompt'):
+					# Ollama only loads the model when there is no prompt (a warm-up request)
+					server._count(loads=1, bytes_received=len(body))
+					self._json({'model': request.get('model'), 'response': '', 'done': True, 'done_reason': 'load'})
+					return
+				server._count(requests=1, bytes_received=len(body))
+				# Rough prompt size in tokens, for the usage fields
+				prompt_tokens = len(body) // 4
+				if self.path in ('/api/chat', '/api/generate'):
+					self._ollama(request, prompt_tokens)
+				else:
+					self._openai(request, prompt_tokens)
+
+			def _ollama(self, request: Dict[str, Any], prompt_tokens: int):
+				chat = self.path == '/api/chat'
+				self._start_stream('application/x-ndjson')
+				for word in server.paced():
+					piece = {'message': {'role': 'assistant', 'content': word}} if chat else {'response': word}
+					self._chunk((json.dumps(dict(piece, done=False)) + '\n').encode('utf-8'))
+				done = {'done': True, 'prompt_eval_count': prompt_tokens, 'eval_count': server.tokens}
+				self._chunk((json.dumps(done) + '\n').encode('utf-8'))
+				self.wfile.write(b'0\r\n\r\n')
+
+			def _openai(self, request: Dict[str, Any], prompt_tokens: int):
+				usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': server.tokens, 'total_tokens': prompt_tokens + server.tokens}
+				base = {'id': 'mock', 'created': 0, 'model': request.get('model', 'mock')}
+				if not request.get('stream'):
+					text = ''.join(server.paced())
+					self._json(dict(base, object='chat.completion', usage=usage, choices=[
+						{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': text}}
+					]))
+					return
+				self._start_stream('text/event-stream')
+				for word in server.paced():
+					piece = dict(base, object='chat.completion.chunk', choices=[{'index': 0, 'delta': {'content': word}}])
+					self._chunk(('data: ' + json.dumps(piece) + '\n\n').encode('utf-8'))
+				if (request.get('stream_options') or {}).get('include_usage'):
+					final = dict(base, object='chat.completion.chunk', choices=[], usage=usage)
+					self._chunk(('data: ' + json.dumps(final) + '\n\n').encode('utf-8'))
+				self._chunk(b'data: [DONE]\n\n')
+				self.wfile.write(b'0\r\n\r\n')
+
+		return Handler
+
+def main():
+	parser = argparse.ArgumentParser(description="Run the mock LLM server in the foreground")
+	parser.add_argument('--port', type=int, default=11435)
+	parser.add_argument('--latency', type=float, default=0.05, help='Seconds before the first token')
+	parser.add_argument('--token-rate', type=float, default=200.0, help='Tokens per second (0 = no pacing)')
+	parser.add_argument('--tokens', type=int, default=60, help='Tokens per reply')
+	args = parser.parse_args()
+	server = MockLLMServer(args.port, args.latency, args.token_rate, args.tokens)
+	print(f"Mock LLM server on {server.url} (Ollama host, or {server.url}/v1 for OpenAI)")
+	try:
+		server._httpd.serve_forever()
+	except KeyboardInterrupt:
+		pass
+
+if __name__ == "__main__":
+	main()
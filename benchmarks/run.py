@@ -0,0 +1,188 @@
+# End-to-end benchmark of `git-ai commit` and `git-ai review` against the mock LLM server
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.corpus import SIZES, build_repo
+from benchmarks.mock_server import MockLLMServer
+
+COMMANDS = {
+	# stdin answers the "Edit before commit?" prompt
+	'commit': (['commit', '--no-cache'], 'n\n'),
+	'review': (['review', '--changes', 'staged', '--no-cache'], ''),
+}
+
+def write_config(config_dir: Path, provider: str, url: str):
+	config_dir.mkdir(parents=True, exist_ok=True)
+	section = "[OLLAMA]\nhost = {url}\nmodel = mock\n" if provider == 'ollama' else "[OPENAI]\napi_key = mock\nmodel = mock\n"
+	(config_dir / 'sam.git.ini').write_text(
+		f"[DEFAULT]\nprovider = {provider}\ncache_enabled = false\ndaemon_enabled = false\nhook_prefetch = false\n\n"
+		+ section.format(url=url)
+	)
+
+def run_once(repo: Path, command: str, env: Dict[str, str], trace: Path) -> Dict[str, Any]:
+	"""Run one git-ai command in repo and collect its timings from the wall clock and its trace file."""
+	args, stdin = COMMANDS[command]
+	if trace.exists():
+		trace.unlink()
+	cmd = [sys.executable, str(ROOT / 'main.py')] + args + ['--trace-file', str(trace)]
+	start = time.perf_counter()
+	proc = subprocess.Popen(cmd, cwd=str(repo), env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+	max_rss_kb = None
+	if hasattr(os, 'wait4'):
+		# Read the output first so the child never blocks on a full pipe, then reap it for its rusage
+		proc.stdin.write(stdin.encode())
+		proc.stdin.close()
+		output = proc.stdout.read()
+		_, status, usage = os.wait4(proc.pid, 0)
+		proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status >> 8
+		# ru_maxrss is in bytes on macOS and KiB elsewhere
+		max_rss_kb = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+	else:
+		output, _ = proc.communicate(stdin.encode())
+	wall = time.perf_counter() - start
+	if proc.returncode != 0:
+		raise RuntimeError(f"{command} failed ({proc.returncode}):\n{output.decode(errors='replace')[-2000:]}")
+	spans, summary = [], {}
+	for line in trace.read_text().splitlines():
+		record = json.loads(line)
+		if record.get('type') == 'summary':
+			summary = record
+		else:
+			spans.append(record)
+	# Time to first token, from process start: first streamed token, or the end of the first non-streamed call
+	first = [s['start_ms'] + s['attrs']['first_token_ms'] for s in spans if s['name'] == 'provider.stream' and 'first_token_ms' in s['attrs']]
+	first += [s['start_ms'] + s['dur_ms'] for s in spans if s['name'] == 'provider.generate']
+	counters = summary.get('counters', {})
+	return {
+		'wall_ms': wall * 1000,
+		'ttft_ms': min(first) if first else None,
+		'startup_ms': summary.get('spans', {}).get('startup', {}).get('total_ms'),
+		'max_rss_kb': max_rss_kb,
+		'git_processes': int(counters.get('git.processes', 0)),
+		'provider_calls': sum(summary.get('spans', {}).get(name, {}).get('count', 0) for name in ('provider.stream', 'provider.generate')),
+		'bytes_sent': int(counters.get('bytes.sent', 0)),
+	}
+
+def reset_repo(repo: Path, base: str):
+	"""Undo a benchmark commit so the same changes are staged again."""
+	head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=str(repo), capture_output=True, text=True).stdout.strip()
+	if head != base:
+		subprocess.run(['git', 'reset', '-q', '--soft', base], cwd=str(repo), check=True)
+
+def diff_lines(repo: Path) -> int:
+	out = subprocess.run(['git', 'diff', '--cached', '--numstat'], cwd=str(repo), capture_output=True, text=True).stdout
+	return sum(int(a) + int(d) for a, d, _ in (line.split('\t', 2) for line in out.splitlines()) if a != '-')
+
+def _median(runs: List[Dict[str, Any]], key: str) -> Optional[float]:
+	values = [r[key] for r in runs if r.get(key) is not None]
+	return statistics.median(values) if values else None
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+	keys = runs[0].keys()
+	summary = {key: _median(runs, key) for key in keys}
+	summary['wall_ms_min'] = min(r['wall_ms'] for r in runs)
+	return summary
+
+def git_revision() -> Dict[str, str]:
+	def git(*args):
+		return subprocess.run(['git'] + list(args), cwd=str(ROOT), capture_output=True, text=True).stdout.strip()
+	return {'commit': git('rev-parse', 'HEAD'), 'branch': git('rev-parse', '--abbrev-ref', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+def compare(current: Dict[str, Any], baseline_path: str):
+	"""Print the change in median wall time and TTFT against an earlier results file."""
+	baseline = {(r['command'], r['size']): r for r in json.loads(Path(baseline_path).read_text())['results']}
+	print(f"\nCompared with {baseline_path}:", file=sys.stderr)
+	for result in current['results']:
+		old = baseline.get((result['command'], result['size']))
+		if not old:
+			continue
+		changes = []
+		for key in ('wall_ms', 'ttft_ms', 'max_rss_kb', 'git_processes'):
+			before, after = old['median'].get(key), result['median'].get(key)
+			if before and after is not None:
+				changes.append(f"{key} {(after - before) / before * 100:+.1f}%")
+		print(f"  {result['command']:<7} {result['size']:>7} lines: {', '.join(changes)}", file=sys.stderr)
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark git-ai commit and review against a local mock LLM server")
+	parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='Diff sizes in changed lines')
+	parser.add_argument('--commands', nargs='+', choices=list(COMMANDS), default=list(COMMANDS))
+	parser.add_argument('--provider', choices=['ollama', 'openai'], default='ollama', help='API the mock server is used through')
+	parser.add_argument('--repeat', type=int, default=3, help='Runs per case (the median is reported)')
+	parser.add_argument('--latency', type=float, default=0.05, help='Mock server seconds before the first token')
+	parser.add_argument('--token-rate', type=float, default=200.0, help='Mock server tokens per second (0 = no pacing)')
+	parser.add_argument('--tokens', type=int, default=60, help='Tokens per mock reply')
+	parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+	parser.add_argument('--compare', metavar='FILE', help='Earlier results file to compare against')
+	parser.add_argument('--workdir', help='Directory for the generated repositories (default: a temporary directory)')
+	args = parser.parse_args()
+
+	server = MockLLMServer(latency=args.latency, token_rate=args.token_rate, tokens=args.tokens).start()
+	temp = None if args.workdir else tempfile.TemporaryDirectory(prefix='git-ai-bench-')
+	work = Path(args.workdir or temp.name)
+	# Keep the user's config, cache, daemon and GIT_AI_* settings out of the measurements
+	env = {k: v for k, v in os.environ.items() if not k.startswith('GIT_AI_')}
+	env.update(
+		XDG_CONFIG_HOME=str(work / 'config'), XDG_CACHE_HOME=str(work / 'cache'), XDG_RUNTIME_DIR=str(work / 'run'),
+		OPENAI_BASE_URL=server.url + '/v1',
+		# tracemalloc roughly doubles run time; memory is measured as the child's max RSS instead
+		GIT_AI_PROFILE_MEMORY='0',
+	)
+	write_config(work / 'config', args.provider, server.url)
+	results = []
+	try:
+		for size in args.sizes:
+			repo = work / f"repo-{size}"
+			if (repo / '.git').exists():
+				base = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=str(repo), capture_output=True, text=True).stdout.strip()
+			else:
+				base = build_repo(repo, size)
+			lines = diff_lines(repo)
+			for command in args.commands:
+				runs = []
+				server.reset_stats()
+				for _ in range(args.repeat):
+					runs.append(run_once(repo, command, env, work / 'trace.jsonl'))
+					reset_repo(repo, base)
+				result = {
+					'command': command, 'size': size, 'diff_lines': lines, 'median': summarize(runs), 'runs': runs,
+					'server_requests': server.stats['requests'] / args.repeat,
+				}
+				results.append(result)
+				print(f"{command:<7} {size:>7} lines: {result['median']['wall_ms']:8.1f} ms wall, "
+					f"{result['median']['ttft_ms'] or 0:8.1f} ms to first token, "
+					f"{result['median']['git_processes']:.0f} git processes", file=sys.stderr)
+	finally:
+		server.stop()
+		if temp:
+			temp.cleanup()
+	report = {
+		'revision': git_revision(),
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'server': {'provider': args.provider, 'latency': args.latency, 'token_rate': args.token_rate, 'tokens': args.tokens},
+		'repeat': args.repeat,
+		'results': results,
+	}
+	text = json.dumps(report, indent=2)
+	if args.output:
+		Path(args.output).write_text(text + '\n')
+	else:
+		print(text)
+	if args.compare:
+		compare(report, args.compare)
+
+if __name__ == "__main__":
+	main()
@@ -23,7 +23,7 @@ if errorlevel 1 (
 
 REM Always build the project using pyinstaller (no prompt)
 if exist main.py (
-    pyinstaller --onefile main.py
+    pyinstaller --onefile --collect-submodules providers main.py
 ) else (
     echo main.py not found!
     exit /b 1
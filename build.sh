@@ -10,7 +10,7 @@ fi
 
 # Always build the project
 if [ -f main.py ]; then
-  pyinstaller --onefile main.py
+  pyinstaller --onefile --collect-submodules providers main.py
 else
   echo "main.py not found!"
   exit 1
@@ -2,3 +2,8 @@ from .commit import main as commit_main
 from .config import main as config_main
 from .list_models import main as list_models_main
 from .review import main as review_main
+from .cache import main as cache_main
+from .reword import main as reword_main
+from .daemon import main as daemon_main
+from .hook import main as hook_main
+from .warm import main as warm_main
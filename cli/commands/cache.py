@@ -0,0 +1,38 @@
+# CLI command to inspect or clear the local response cache
+from core.cache import get_cache
+from core.findings import clear_findings
+from core.models import ModelListCache
+from utils import Colors
+
+def _format_size(num_bytes):
+	for unit in ('B', 'KB', 'MB', 'GB'):
+		if num_bytes < 1024 or unit == 'GB':
+			return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+		num_bytes /= 1024
+
+def main():
+	import argparse
+	parser = argparse.ArgumentParser(description="Manage the git-ai response cache.")
+	parser.add_argument('action', choices=['stats', 'clear'], help='Show cache statistics or delete all cached responses, model lists and review findings')
+	args = parser.parse_args()
+
+	cache = get_cache()
+	if args.action == 'clear':
+		removed = cache.clear()
+		models = ModelListCache().clear()
+		findings = clear_findings()
+		print(Colors.success(f"🧹 Removed {removed} cached response(s), {models} cached model list(s) and {findings} stored review finding(s)."))
+		return
+
+	stats = cache.stats()
+	lookups = stats['hits'] + stats['misses']
+	hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+	print(Colors.header("💾 Response cache"))
+	print(Colors.info("  Location: ") + Colors.highlight(stats['directory']))
+	print(Colors.info("  Entries:  ") + Colors.highlight(str(stats['entries'])))
+	print(Colors.info("  Size:     ") + Colors.highlight(f"{_format_size(stats['size_bytes'])} / {_format_size(stats['max_bytes'])}"))
+	print(Colors.info("  TTL:      ") + Colors.highlight(f"{stats['ttl'] / 3600:.0f} h"))
+	print(Colors.info("  Hits:     ") + Colors.highlight(f"{stats['hits']} of {lookups} lookups ({hit_rate})"))
+
+if __name__ == "__main__":
+	main()
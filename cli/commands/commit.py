@@ -1,12 +1,12 @@
 # CLI command to generate and make a commit using the configured provider
+import os
+import sys
 from core.config import settings
-from providers.factory import get_provider
-from utils import get_branch, get_diff, stage_all, commit, push, clean_commit_message, Colors
-
-def get_ticket_prefix(branch):
-	import re
-	m = re.match(r'^([A-Za-z]+-\d+)', branch)
-	return m.group(1) if m else ''
+from core.budget import prefilter_diff, print_dropped_summary, print_dry_run_report, print_usage_summary
+from core.cache import cached_generate, cached_stream
+from core.generator import build_commit_prompt, finish_commit_message, is_one_line
+from core.session import CommandSession
+from utils import get_branch, get_diff, stage_all, commit, push, Colors
 
 def main():
 	import argparse
@@ -14,47 +14,62 @@ def main():
 	parser.add_argument('--format', choices=['detailed', 'one-line'], help='Commit message format')
 	parser.add_argument('--provider', help='Provider to use (overrides config)')
 	parser.add_argument('--model', help='Model to use (overrides config)')
+	parser.add_argument('--hedge', metavar='PROVIDER', help='Also ask PROVIDER if the main provider is slow to answer, and use whichever answers first')
 	parser.add_argument('--push', action='store_true', help='Push after commit')
+	parser.add_argument('--no-cache', action='store_true', help='Always call the provider instead of reusing a cached message')
+	parser.add_argument('--no-stream', action='store_true', help='Wait for the full message instead of printing it as it is generated')
+	parser.add_argument('--dry-run', action='store_true', help='Show prompt size, filtered files and projected cost without calling the provider')
 	args = parser.parse_args()
 
+	# Command-line choices apply to this run only and are never written to the config file
 	if args.format:
-		settings.set('COMMIT_FORMAT', args.format)
-	provider_name = args.provider or settings.get('PROVIDER', 'openai')
-	provider_kwargs = {}
+		settings.set_override('COMMIT_FORMAT', args.format)
+	if args.provider:
+		settings.set_override('PROVIDER', args.provider)
+	provider_name = settings.get_provider()
 	if args.model:
-		provider_kwargs['model'] = args.model
-	provider = get_provider(provider_name, **provider_kwargs)
-
-	stage_all()
-	diff = get_diff(staged=True)
+		settings.set_provider_override('MODEL', args.model, provider_name)
+	if args.hedge:
+		settings.set_override('HEDGE_PROVIDER', args.hedge)
+	if args.dry_run:
+		# Don't touch the index on a dry run; report on what is already staged
+		diff = get_diff(staged=True)
+	else:
+		# The provider is set up (and a local model loaded) while the changes are staged and diffed
+		session = CommandSession(provider_name)
+		stage_all()
+		diff = get_diff(staged=True)
 	if not diff.strip():
 		print(Colors.info("ℹ No staged changes to commit."))
 		return
+	diff, dropped = prefilter_diff(diff)
 	branch = get_branch()
-	prefix = get_ticket_prefix(branch)
-	short = settings.get('COMMIT_FORMAT', 'detailed') == 'one-line'
-	sys_msg = (
-		"You are an expert Git commit assistant. When responding, return only the commit message text itself—no extra explanation, quotes, or formatting. "
-		"First, inspect the current Git branch name. If it begins with a ticket code matching the pattern LETTERS-DIGITS (for example ABC-123 or EL-2024), capture that exact code and place it at the very start of your message, followed by a colon and a space. If no ticket code is present, do not include any prefix. "
-		"Next, identify the primary change or task implied by the branch name and present it as the first action in your commit message. Then, describe any secondary updates, fixes, or refactoring included in this commit. "
-		"Use a natural, professional tone that reads like a teammate clearly explaining the work you’ve done. Use bullet points to separate multiple actions if they exist."
-	)
-	user_msg = f"Branch: {branch}\nWrite a {'one-line' if short else 'detailed, human-friendly'} commit message for these changes:\n\n{diff}"
+	prompt, messages = build_commit_prompt(diff, branch, is_one_line(), dropped)
+
+	if args.dry_run:
+		model = settings.get_provider_option('MODEL', provider_name)
+		print_dry_run_report(provider_name, model, [prompt], dropped)
+		print(Colors.dim("💡 Dry run used the currently staged changes; a real run stages everything first."))
+		return
+	print_dropped_summary(dropped)
 	
+	provider = session.provider
 	print(Colors.header("🤖 Generating commit message with AI..."))
-	commit_msg = provider.generate(
-		prompt=user_msg,
-		messages=[
-			{"role": "system", "content": sys_msg},
-			{"role": "user", "content": user_msg}
-		]
-	)
-	
-	# Clean up the AI-generated commit message
-	commit_msg = clean_commit_message(commit_msg)
+	if args.no_stream:
+		commit_msg = cached_generate(provider, prompt=prompt, use_cache=not args.no_cache, messages=messages)
+	else:
+		# Show the raw message as it arrives, then the cleaned-up version below
+		parts = []
+		for piece in cached_stream(provider, prompt=prompt, use_cache=not args.no_cache, messages=messages):
+			parts.append(piece)
+			sys.stdout.write(Colors.dim(piece))
+			sys.stdout.flush()
+		print()
+		commit_msg = ''.join(parts)
+	print_usage_summary(provider)
 	
-	if prefix and not commit_msg.startswith(prefix):
-		commit_msg = f"{prefix}: {commit_msg}"
+	# Clean up the AI-generated commit message and add the branch's ticket code
+	commit_msg = finish_commit_message(commit_msg, branch)
 	
 	print(Colors.success("\n✅ Generated commit message:"))
 	print(Colors.highlight(commit_msg))
@@ -71,6 +86,8 @@ def main():
 			lines.append(line)
 		commit_msg = '\n'.join(lines) if lines else commit_msg
 	
+	# The message is already written; stop the pre-commit hook from prefetching another one
+	os.environ['GIT_AI_HOOK_PREFETCH'] = 'false'
 	commit(commit_msg)
 	print(Colors.success("✅ Committed successfully."))
 	
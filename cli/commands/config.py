@@ -1,7 +1,11 @@
 # CLI config editor for global and provider-specific settings
+import concurrent.futures
 from core.config import settings
 from utils import Colors
 
+# Seconds the MODEL prompt waits for a model list that is still loading
+MODEL_LIST_WAIT = 2
+
 def print_current():
 	print(Colors.header("📋 Current global settings:"))
 	for k, v in settings._data.items():
@@ -12,7 +16,21 @@ def print_current():
 		for k, v in pdata.items():
 			print(Colors.dim(f"  {k}: ") + Colors.highlight(str(v)))
 
+def _print_models(provider, listing):
+	if listing is None:
+		print(Colors.dim(f"  [Model list for {provider} is not available yet; run `list-models` to see it]"))
+	elif listing.get('error'):
+		print(Colors.error(f"  [Error fetching models: {listing['error']}]"))
+	else:
+		for i, m in enumerate(listing['models'], 1):
+			print(Colors.dim(f"  {i}. {m}"))
+
 def interactive_edit():
+	from core.models import ModelListCache, prefetch_models
+	provider = settings.get_provider()
+	# Fetch the model list in the background while the global settings are edited
+	listing = ModelListCache().get(provider)
+	pending = None if listing else prefetch_models(provider, timeout=30)
 	print_current()
 	print(Colors.header("\n✏️ Edit global settings (press Enter to keep current value):"))
 	for k in settings._data:
@@ -23,20 +41,22 @@ def interactive_edit():
 			print(Colors.success(f"✅ Updated {k} = {val}"))
 	
 	print(Colors.header("\n🔧 Edit provider settings:"))
-	provider = settings.get_provider()
+	if settings.get_provider() != provider:
+		# PROVIDER was changed above; list the new provider's models instead
+		provider = settings.get_provider()
+		listing = ModelListCache().get(provider)
+		pending = None if listing else prefetch_models(provider, timeout=30)
 	provider_items = settings._provider_data.get(provider, {})
-	from providers.factory import get_provider
 	
 	for k in provider_items:
 		if k == 'MODEL':
 			print(Colors.info(f"📋 Available models for {provider}:"))
-			try:
-				prov = get_provider(provider)
-				models = prov.list_models()
-				for i, m in enumerate(models, 1):
-					print(Colors.dim(f"  {i}. {m}"))
-			except Exception as e:
-				print(Colors.error(f"  [Error fetching models: {e}]"))
+			if listing is None and pending is not None:
+				try:
+					listing = pending.result(timeout=MODEL_LIST_WAIT)
+				except concurrent.futures.TimeoutError:
+					pass
+			_print_models(provider, listing)
 		
 		current_val = provider_items[k]
 		val = input(Colors.dim(f"{provider}.{k} [{current_val}]: ")).strip()
@@ -54,16 +74,18 @@ def main():
 	parser.add_argument('--set-provider', nargs=3, metavar=('PROVIDER', 'KEY', 'VALUE'), help='Set a provider config value')
 	args = parser.parse_args()
 
-	if args.interactive or (not args.set and not args.set_provider):
-		interactive_edit()
-	if args.set:
-		k, v = args.set
-		settings.set(k, v)
-		print(Colors.success(f"✅ Set {k} = {v}"))
-	if args.set_provider:
-		provider, k, v = args.set_provider
-		settings.set_provider_option(k, v, provider)
-		print(Colors.success(f"✅ Set [{provider}].{k} = {v}"))
+	# Write all changes from this invocation to disk at once
+	with settings.batch():
+		if args.interactive or (not args.set and not args.set_provider):
+			interactive_edit()
+		if args.set:
+			k, v = args.set
+			settings.set(k, v)
+			print(Colors.success(f"✅ Set {k} = {v}"))
+		if args.set_provider:
+			provider, k, v = args.set_provider
+			settings.set_provider_option(k, v, provider)
+			print(Colors.success(f"✅ Set [{provider}].{k} = {v}"))
 
 if __name__ == "__main__":
 	main()
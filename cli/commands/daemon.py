@@ -0,0 +1,62 @@
+# CLI command to manage the background git-ai daemon
+import sys
+import time
+from core import daemon
+from utils import Colors
+
+def _print_status(status):
+	print(Colors.success(f"🟢 Daemon running (pid {status['pid']})"))
+	print(Colors.info("  Socket:    ") + Colors.highlight(str(daemon.socket_path())))
+	print(Colors.info("  Uptime:    ") + Colors.highlight(f"{status['uptime'] / 60:.1f} min"))
+	print(Colors.info("  Requests:  ") + Colors.highlight(f"{status['requests']} ({status['coalesced']} shared with an identical request)"))
+	print(Colors.info("  Providers: ") + Colors.highlight(', '.join(status['providers']) or 'none loaded yet'))
+	for name, metrics in (status.get('schedulers') or {}).items():
+		print(Colors.dim(f"    {name}: {metrics['queued']} queued, {metrics['retries']} retries "
+			f"({metrics['rate_limited']} rate limited), {metrics['wait_seconds']:.1f}s spent waiting"))
+
+def _stop():
+	if not daemon.call('shutdown'):
+		return False
+	for _ in range(50):
+		if not daemon.socket_path().exists():
+			break
+		time.sleep(0.05)
+	return True
+
+def main():
+	import argparse
+	parser = argparse.ArgumentParser(description="Run git-ai provider calls through a long-lived background process.")
+	parser.add_argument('action', choices=['start', 'stop', 'restart', 'status', 'run'],
+		help='Start/stop the background daemon, show its status, or run it in the foreground')
+	args = parser.parse_args()
+
+	if not daemon.daemon_supported():
+		print(Colors.error("❌ The daemon needs Unix domain sockets, which this platform does not support."))
+		sys.exit(1)
+
+	if args.action == 'run':
+		daemon.run_daemon()
+		return
+	if args.action == 'status':
+		status = daemon.call('ping')
+		if status:
+			_print_status(status)
+		else:
+			print(Colors.info("⚪ Daemon not running. Start it with: git-ai daemon start"))
+		return
+	if args.action in ('stop', 'restart'):
+		if _stop():
+			print(Colors.success("🛑 Daemon stopped."))
+		elif args.action == 'stop':
+			print(Colors.info("ℹ Daemon was not running."))
+		if args.action == 'stop':
+			return
+	status = daemon.start_daemon()
+	if status:
+		_print_status(status)
+	else:
+		print(Colors.error(f"❌ Daemon did not start; see {daemon.log_path()}"))
+		sys.exit(1)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,34 @@
+# CLI command run by the installed git hooks, and to install or remove them
+import sys
+from core.config import settings
+from plugins.hooks import enable_hooks, disable_hooks, start_prefetch, run_prefetch, fill_commit_message
+from utils import Colors
+
+def main():
+	import argparse
+	parser = argparse.ArgumentParser(description="git-ai git hooks: prefetch a commit message in pre-commit and fill it in from commit-msg.")
+	parser.add_argument('action', choices=['install', 'uninstall', 'pre-commit', 'commit-msg', 'prefetch'],
+		help='Install/uninstall the hooks in this repository, or run one of them')
+	parser.add_argument('arg', nargs='?', help='Message file (commit-msg) or tree hash (prefetch)')
+	args = parser.parse_args()
+
+	if args.action == 'install':
+		settings.set('HOOKS_ENABLED', 'true')
+		enable_hooks()
+		print(Colors.success("✅ git-ai hooks installed. Run `git commit` and leave the message empty to use the AI message."))
+	elif args.action == 'uninstall':
+		settings.set('HOOKS_ENABLED', 'false')
+		disable_hooks()
+		print(Colors.info("ℹ️ git-ai hooks removed."))
+	elif args.action == 'pre-commit':
+		start_prefetch()
+	elif args.action == 'prefetch':
+		run_prefetch(args.arg)
+	elif args.action == 'commit-msg':
+		if not args.arg:
+			parser.error("commit-msg needs the message file")
+		if fill_commit_message(args.arg):
+			print(Colors.dim("git-ai: filled in the AI-generated commit message"), file=sys.stderr)
+
+if __name__ == "__main__":
+	main()
@@ -1,29 +1,78 @@
-# CLI command to list models for the current provider
+# CLI command to list models for the current provider, or for every configured provider
 from core.config import settings
-from providers.factory import get_provider
+from core.models import fetch_all_models, fetch_models
+from providers.factory import available_providers
 from utils import Colors
 
-def main():
-	provider_name = settings.get('PROVIDER', 'openai')
+# Providers slower than this to answer are reported as slow
+SLOW_SECONDS = 3.0
+
+def _age(seconds):
+	if seconds < 90:
+		return f"{seconds:.0f}s"
+	if seconds < 5400:
+		return f"{seconds / 60:.0f} min"
+	return f"{seconds / 3600:.1f} h"
+
+def configured_providers():
+	"""The current provider plus every other one that has an API key (or needs none)."""
+	names = [settings.get_provider()]
+	for name in available_providers():
+		defaults = settings.PROVIDER_DEFAULTS.get(name, {})
+		if name not in names and ('API_KEY' not in defaults or settings.get_provider_option('API_KEY', name)):
+			names.append(name)
+	return names
+
+def _list_current(args):
+	provider_name = settings.get_provider()
 	print(Colors.header(f"🤖 Fetching available models for {provider_name}..."))
-	
-	try:
-		provider = get_provider(provider_name)
-		models = provider.list_models()
-		
-		print(Colors.success(f"📋 Available models for {provider_name}:"))
-		for i, model in enumerate(models, 1):
-			print(Colors.highlight(f"  {i}. {model}"))
-		
-		if not models:
-			print(Colors.warning("⚠️ No models found or model list is empty"))
-		else:
-			print(Colors.dim(f"\n💡 Total: {len(models)} model(s) available"))
-			print(Colors.dim("💡 Use these model names in your configuration"))
-			
-	except Exception as e:
-		print(Colors.error(f"❌ Error fetching models: {e}"))
+	result = fetch_models(provider_name, refresh=args.refresh, timeout=args.timeout)
+	if result['error']:
+		print(Colors.error(f"❌ Error fetching models: {result['error']}"))
 		print(Colors.dim("💡 Check your provider configuration and network connection"))
+		return
+	models = result['models']
+	print(Colors.success(f"📋 Available models for {provider_name}:"))
+	for i, model in enumerate(models, 1):
+		print(Colors.highlight(f"  {i}. {model}"))
+
+	if not models:
+		print(Colors.warning("⚠️ No models found or model list is empty"))
+	else:
+		print(Colors.dim(f"\n💡 Total: {len(models)} model(s) available"))
+		print(Colors.dim("💡 Use these model names in your configuration"))
+	if result['cached_age'] is not None:
+		print(Colors.dim(f"💡 Cached {_age(result['cached_age'])} ago; use --refresh to fetch the list again"))
+
+def _list_all(args):
+	names = configured_providers()
+	print(Colors.header(f"🤖 Fetching models from {len(names)} provider(s): {', '.join(names)}..."))
+	for result in fetch_all_models(names, refresh=args.refresh, timeout=args.timeout):
+		name = result['provider']
+		if result['error']:
+			print(Colors.error(f"❌ {name}: down ({result['error']})"))
+			continue
+		if result['cached_age'] is not None:
+			status = Colors.dim(f"cached {_age(result['cached_age'])} ago")
+		elif result['seconds'] > SLOW_SECONDS:
+			status = Colors.warning(f"slow, {result['seconds']:.1f}s")
+		else:
+			status = Colors.dim(f"{result['seconds']:.1f}s")
+		print(Colors.success(f"📋 {name}: ") + Colors.highlight(f"{len(result['models'])} model(s)") + f" ({status})")
+		for model in result['models']:
+			print(Colors.dim(f"    {model}"))
+
+def main():
+	import argparse
+	parser = argparse.ArgumentParser(description="List the models a provider offers.")
+	parser.add_argument('--all', action='store_true', help='Query every configured provider concurrently')
+	parser.add_argument('--refresh', action='store_true', help='Ignore cached model lists and ask the providers again')
+	parser.add_argument('--timeout', type=float, default=10.0, help='Seconds to wait for each provider (default: 10)')
+	args = parser.parse_args()
+	if args.all:
+		_list_all(args)
+	else:
+		_list_current(args)
 
 if __name__ == "__main__":
 	main()
@@ -1,11 +1,18 @@
 # AI-powered code review command for git-ai
-import os
 import argparse
+import subprocess
 import sys
 from datetime import datetime
 from core.config import settings
-from providers.factory import get_provider
-from utils import get_diff, clean_review_output, Colors, format_cli_output
+from core.cache import ResponseCache, cache_enabled, cached_generate, cached_stream, get_cache
+from core.budget import prefilter_diff, print_dropped_summary, print_dry_run_report, print_usage_summary
+from core.generator import prompt_text
+from core.findings import HUNK_SECTION_INSTRUCTIONS, FindingStore, assemble_report, findings_enabled, hunks_diff, label_hunks, split_findings, split_hunks
+from core.review_engine import SEVERITIES, ChunkResult, ReviewEngine, get_chunk_budget, highest_severity, merge_results, plan_chunks
+from core.session import CommandSession
+from utils import get_diff, get_repo, parse_range, clean_review_output, stream_review_output, Colors, format_cli_output, colorize_lines
+from utils.diff import parse_diff
+from utils.repo_index import RepoIndex
 
 REVIEW_TYPES = ["all", "logical", "security", "performance", "style", "documentation"]
 
@@ -17,10 +24,22 @@ def main():
     parser.add_argument('--output', type=str, help='HTML output file name (default: ai_review_TIMESTAMP.html)')
     parser.add_argument('--severity', choices=['low', 'medium', 'high', 'critical'], default='medium', help='Minimum severity level to report (default: medium)')
     parser.add_argument('--changes', choices=['staged', 'unstaged', 'all', 'last-commit'], default='all', help='What changes to review: staged, unstaged, all, or last-commit (default: all)')
+    parser.add_argument('--range', metavar='A..B', help='Review each commit in A..B on its own (e.g. v1.2..v1.3) and report them together, most severe first')
+    parser.add_argument('--workers', type=int, help='Concurrent provider requests for --range (default: REVIEW_WORKERS)')
+    parser.add_argument('--hedge', metavar='PROVIDER', help='Also ask PROVIDER if the main provider is slow to answer, and use whichever answers first')
+    parser.add_argument('--no-cache', action='store_true', help='Always call the provider instead of reusing a cached review')
+    parser.add_argument('--no-stream', action='store_true', help='Wait for the full review instead of printing it as it is generated')
+    parser.add_argument('--dry-run', action='store_true', help='Show prompt size, filtered files and projected cost without calling the provider')
     args = parser.parse_args()
 
     provider_name = settings.get('PROVIDER', 'openai')
-    provider = get_provider(provider_name)
+    if args.hedge:
+        settings.set_override('HEDGE_PROVIDER', args.hedge)
+    # The provider is set up (and a local model loaded) while git collects the diff
+    session = None if args.dry_run else CommandSession(provider_name)
+    if args.range:
+        _review_range(args, session, provider_name)
+        return
 
     # Get the appropriate diff based on user choice
     changes_type = args.changes
@@ -34,9 +53,7 @@ def main():
         diff = get_diff(commit='HEAD~1..HEAD')
         changes_desc = "last commit changes"
     else:  # 'all'
-        staged_diff = get_diff(staged=True)
-        unstaged_diff = get_diff(staged=False)
-        diff = f"{staged_diff}\n{unstaged_diff}".strip()
+        diff = get_diff(working=True)
         changes_desc = "all changes (staged + unstaged)"
 
     if not diff.strip():
@@ -47,6 +64,7 @@ def main():
         print(Colors.dim("  - Use --changes unstaged (for modified files)"))
         print(Colors.dim("  - Use --changes last-commit (for previous commit)"))
         return
+    diff, dropped = prefilter_diff(diff)
 
     review_type = args.type
     html = args.html
@@ -54,33 +72,335 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = args.output or f"ai_review_{timestamp}.html"
 
-    # Get repository context
+    # Get repository context from the cached list of tracked files. This runs after the diff:
+    # `git diff` may refresh the index, which would invalidate a list cached before it
     try:
-        repo_files = []
-        for root, dirs, files in os.walk('.'):
-            # Skip common ignore patterns
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'build', 'dist']]
-            for file in files:
-                if file.endswith(('.py', '.js', '.ts', '.java', '.cpp', '.h', '.cs', '.go', '.rs', '.rb', '.php')):
-                    repo_files.append(os.path.relpath(os.path.join(root, file)))
-        repo_context = f"Repository files: {', '.join(repo_files[:20])}" + ("..." if len(repo_files) > 20 else "")
-    except:
-        repo_context = "Repository context unavailable"
+        repo_index = RepoIndex.load()
+    except Exception:
+        repo_index = None
+
+    def repo_context(paths):
+        return repo_index.describe(paths) if repo_index is not None else "Repository context unavailable"
+
+    # Hunks reviewed before with the same settings keep their stored findings; only the rest is sent
+    store, hunks, reused = None, [], {}
+    if not html and not args.no_cache and cache_enabled() and findings_enabled():
+        store = FindingStore(provider_name, settings.get_provider_option('MODEL', provider_name), review_type, severity)
+        hunks = split_hunks(diff)
+        reused = store.lookup(hunks)
+        if reused:
+            diff = hunks_diff([hunk for i, hunk in enumerate(hunks) if i not in reused])
+
+    def build_prompt(chunk):
+        if chunk.total == 1:
+            return _build_prompt(chunk.diff, review_type, changes_desc, severity, repo_context(chunk.paths), html, by_hunk=store is not None)
+        return _build_prompt(chunk.diff, review_type, changes_desc, severity, repo_context(chunk.paths), False, part=chunk.label, by_hunk=store is not None)
+
+    if args.dry_run:
+        model = settings.get_provider_option('MODEL', provider_name)
+        chunks = plan_chunks(diff, get_chunk_budget(model)) if diff.strip() else []
+        print_dry_run_report(provider_name, model, [prompt_text(build_prompt(chunk)) for chunk in chunks], dropped)
+        if reused:
+            print(Colors.dim(f"💡 {len(reused)} of {len(hunks)} hunk(s) are unchanged since an earlier review and are not sent."))
+        if html and len(chunks) > 1:
+            print(Colors.dim("💡 An HTML report over several parts needs one more request to merge the findings."))
+        return
+    print_dropped_summary(dropped)
+    if reused:
+        print(Colors.dim(f"♻ {len(reused)} of {len(hunks)} hunk(s) are unchanged since an earlier review; reusing their findings."))
+    if not diff.strip():
+        _print_report_header()
+        print(format_cli_output(assemble_report(hunks, {}, reused, '')))
+        _print_report_footer()
+        return
+
+    provider = session.provider
+    generate = lambda messages: cached_generate(provider, prompt=prompt_text(messages), messages=messages, use_cache=not args.no_cache)
+    engine = ReviewEngine(generate, get_chunk_budget(getattr(provider, 'model', None)))
+
+    def report_progress(result):
+        if result.chunk.total > 1:
+            status = Colors.error("✗") if result.error else Colors.success("✓")
+            print(f"  {status} " + Colors.dim(result.chunk.label))
+
+    print(Colors.header(f"🔍 Reviewing your {changes_desc} with AI..."))
+    chunks = plan_chunks(diff, engine.max_chunk_tokens)
+    if not html and not args.no_stream and len(chunks) == 1 and not reused:
+        # Single request: print the review as it is generated
+        _print_report_header()
+        raw = []
+        try:
+            messages = build_prompt(chunks[0])
+            _print_streamed_review(_collect(cached_stream(provider, prompt=prompt_text(messages), messages=messages, use_cache=not args.no_cache), raw))
+        except Exception as e:
+            print(Colors.error(f"❌ Error generating review: {e}"))
+            return
+        _print_report_footer()
+        if store is not None:
+            _store_findings(store, hunks, reused, [ChunkResult(chunks[0], ''.join(raw))])
+        print_usage_summary(provider)
+        return
+
+    try:
+        results = engine.run_chunks(chunks, build_prompt, on_result=report_progress)
+        if len(results) == 1 and results[0].error:
+            raise results[0].error
+        if store is not None:
+            findings, notes = _store_findings(store, hunks, reused, results)
+            review = assemble_report(hunks, findings, reused, notes)
+        else:
+            review = merge_results(results)
+        if html and len(results) > 1:
+            print(Colors.dim(f"  Merging {len(results)} partial reviews into an HTML report..."))
+            changed_paths = [path for result in results for path in result.chunk.paths]
+            review = generate(_build_html_merge_prompt(review, review_type, changes_desc, severity, repo_context(changed_paths)))
+        # Clean up the AI-generated review
+        review = clean_review_output(review)
+    except Exception as e:
+        print(Colors.error(f"❌ Error generating review: {e}"))
+        return
 
     if html:
-        prompt = f"""You are a senior software architect and security expert. Perform a comprehensive, professional code review.
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(review)
+        print(Colors.success(f"✅ Professional AI review report saved to: {output_file}"))
+        print(Colors.info(f"📊 Open the HTML file in your browser to view the interactive report"))
+    else:
+        formatted_review = format_cli_output(review)
+        _print_report_header()
+        print(formatted_review)
+        _print_report_footer()
+    print_usage_summary(provider)
 
-**REVIEW CONFIGURATION:**
-- Review Type: {review_type.upper()}
-- Changes Reviewed: {changes_desc}
-- Minimum Severity: {severity}
-- Repository Context: {repo_context}
-- Timestamp: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+def _collect(pieces, into):
+    """Pass streamed pieces through, keeping a copy of each."""
+    for piece in pieces:
+        into.append(piece)
+        yield piece
 
-**REVIEW SCOPE:**
-{_get_review_scope_instructions(review_type)}
+def _store_findings(store, hunks, reused, results):
+    """
+    Split each chunk's review into findings per hunk, store them, and return them by position in
+    `hunks` together with the text that is not about a single hunk. A hunk split across chunks
+    is shown but not stored, since no one review saw all of it.
+    """
+    positions = {}
+    for i, hunk in enumerate(hunks):
+        if i not in reused:
+            # Two hunks with the same label can't be told apart in a review
+            positions[hunk.label] = None if hunk.label in positions else i
+    findings, notes, partial = {}, [], set()
+    for result in results:
+        if result.error:
+            notes.append(f"ERROR: review of {result.chunk.label} failed: {result.error}")
+            continue
+        labels = [hunk.label for hunk in split_hunks(result.chunk.diff)]
+        sections, other = split_findings(clean_review_output(result.output), labels)
+        for label, text in sections.items():
+            i = positions.get(label)
+            if i is None:
+                other = f"### {label}\n\n{text}\n\n{other}".strip()
+                continue
+            if i in findings or labels.count(label) > 1:
+                partial.add(i)
+            findings[i] = f"{findings[i]}\n\n{text}" if i in findings else text
+        if other:
+            notes.append(other)
+    store.store({hunks[i]: text for i, text in findings.items() if i not in partial})
+    return findings, '\n\n'.join(notes)
+
+class _RangeCommit:
+    """A commit under review with --range: its diff, and its review once done."""
+
+    def __init__(self, sha, subject, diff):
+        self.sha = sha
+        self.subject = subject
+        self.diff = diff
+        self.dropped = []
+        self.review = None
+        self.error = None
+        self.cached = False
+        self.filtered = False
+
+    @property
+    def description(self):
+        return f"commit {self.sha[:8]} ({self.subject})"
+
+def _range_commits(repo, start, end):
+    """Non-merge commits in start..end with their diffs, oldest first, from a single git process."""
+    output = repo.run_bytes(['log', '--reverse', '--no-merges', '-p', '--format=%x1e%H%x1f%s', f'{start}..{end}'])
+    commits = []
+    for record in output.decode('utf-8', 'replace').split('\x1e')[1:]:
+        header, _, diff = record.partition('\n')
+        sha, _, subject = header.partition('\x1f')
+        commits.append(_RangeCommit(sha, subject, diff.strip()))
+    return commits
+
+def _commit_review_key(commit, provider_name, review_type, severity):
+    """Cache key for a commit's review: a commit never changes, so its SHA stands for the diff."""
+    model = settings.get_provider_option('MODEL', provider_name)
+    return ResponseCache.make_key(provider_name, model, commit.sha, {'review': review_type, 'severity': severity})
+
+def _review_range(args, session, provider_name):
+    """Review each commit of a range independently on a worker pool and print one report, most severe first."""
+    repo = get_repo()
+    try:
+        start, end = parse_range(args.range)
+        commits = _range_commits(repo, start, end)
+    except (ValueError, subprocess.CalledProcessError) as e:
+        print(Colors.error(f"❌ Invalid range '{args.range}': {e}"))
+        sys.exit(1)
+    commits = [c for c in commits if c.diff]
+    if not commits:
+        print(Colors.info(f"ℹ No commits with changes in {args.range}."))
+        return
+
+    use_cache = not args.no_cache and cache_enabled()
+    cache = get_cache()
+    keys = {c.sha: _commit_review_key(c, provider_name, args.type, args.severity) for c in commits}
+    todo = []
+    for c in commits:
+        review = cache.get(keys[c.sha]) if use_cache else None
+        if review is not None:
+            c.review, c.cached = review, True
+        else:
+            c.diff, c.dropped = prefilter_diff(c.diff)
+            todo.append(c)
+
+    try:
+        repo_index = RepoIndex.load()
+    except Exception:
+        repo_index = None
+    model = settings.get_provider_option('MODEL', provider_name)
+    owners = {}
+    chunks = []
+    for c in todo:
+        for chunk in plan_chunks(c.diff, get_chunk_budget(model)):
+            owners[id(chunk)] = c
+            chunks.append(chunk)
+    # Commits whose every file was filtered out get a note instead of a review; it is not cached
+    for c in todo:
+        if not any(owners[id(chunk)] is c for chunk in chunks):
+            c.review, c.filtered = "No reviewable changes (all files filtered).", True
+    todo = [c for c in todo if c.review is None]
+
+    def build_prompt(chunk):
+        c = owners[id(chunk)]
+        context = repo_index.describe(chunk.paths) if repo_index is not None else "Repository context unavailable"
+        return _build_prompt(chunk.diff, args.type, c.description, args.severity, context, False,
+                             part=chunk.label if chunk.total > 1 else None)
+
+    if args.dry_run:
+        dropped = [(f"{c.sha[:8]} {path}", reason) for c in commits for path, reason in c.dropped]
+        print_dry_run_report(provider_name, model, [prompt_text(build_prompt(chunk)) for chunk in chunks], dropped)
+        print(Colors.dim(f"💡 {sum(1 for c in commits if c.cached)} of {len(commits)} commit(s) already have a cached review."))
+        return
+
+    generate = lambda messages: cached_generate(session.provider, prompt=prompt_text(messages), messages=messages, use_cache=not args.no_cache)
+    if todo:
+        engine = ReviewEngine(generate, get_chunk_budget(model), max_workers=args.workers)
+        print(Colors.header(f"🔍 Reviewing {len(todo)} commit(s) in {args.range} with {min(engine.max_workers, len(chunks))} worker(s)"
+                            + (f" ({len(commits) - len(todo)} cached or filtered)..." if len(todo) < len(commits) else "...")))
+        remaining = {c.sha: sum(1 for chunk in chunks if owners[id(chunk)] is c) for c in todo}
+        done = 0
+
+        def report_progress(result):
+            nonlocal done
+            c = owners[id(result.chunk)]
+            c.error = c.error or result.error
+            remaining[c.sha] -= 1
+            if not remaining[c.sha]:
+                done += 1
+                print(Colors.dim(f"  [{done}/{len(todo)}] {c.sha[:8]} ") + (Colors.error("failed") if c.error else Colors.success("done")))
+
+        results = engine.run_chunks(chunks, build_prompt, on_result=report_progress)
+        for c in todo:
+            own = [r for r in results if owners[id(r.chunk)] is c]
+            if c.error:
+                continue
+            c.review = clean_review_output(merge_results(own))
+            if cache_enabled():
+                cache.set(keys[c.sha], c.review)
+
+    report = _range_report(commits, args.range)
+    if args.html:
+        print(Colors.dim(f"  Merging {len(commits)} commit review(s) into an HTML report..."))
+        paths = [file.path for c in commits for file in parse_diff(c.diff)]
+        context = repo_index.describe(paths) if repo_index is not None else "Repository context unavailable"
+        try:
+            html = generate(_build_html_merge_prompt(report, args.type, f"{len(commits)} commits in {args.range}", args.severity, context))
+        except Exception as e:
+            print(Colors.error(f"❌ Error generating review: {e}"))
+            return
+        output_file = args.output or f"ai_review_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(clean_review_output(html))
+        print(Colors.success(f"✅ Professional AI review report saved to: {output_file}"))
+    else:
+        _print_report_header()
+        print(format_cli_output(report))
+        _print_report_footer()
+    if todo:
+        print_usage_summary(session.provider)
+
+def _range_report(commits, spec):
+    """One report for a range: failed commits first, then by the most severe finding, then in history order."""
+    levels = {c.sha: highest_severity(c.review) if c.review else None for c in commits}
+
+    def rank(c):
+        if c.error:
+            return -1
+        return SEVERITIES.index(levels[c.sha]) if levels[c.sha] else len(SEVERITIES)
+
+    sections = []
+    for c in sorted(commits, key=rank):
+        if c.error:
+            body = f"ERROR: review of this commit failed: {c.error}"
+        else:
+            body = c.review.strip()
+        if c.error:
+            level = "FAILED"
+        elif c.filtered:
+            level = "NO REVIEWABLE CHANGES"
+        else:
+            level = levels[c.sha].upper() if levels[c.sha] else "NO LABELLED FINDINGS"
+        sections.append(f"## {c.sha[:8]} {c.subject} [{level}]{' (cached)' if c.cached else ''}\n\n{body}")
+    counts = [f"{sum(1 for c in commits if levels[c.sha] == level)} {level}" for level in SEVERITIES[:-1]]
+    summary = f"## Summary\n\nReviewed {len(commits)} commit(s) in {spec}; most severe finding per commit: {', '.join(counts)}"
+    failed = sum(1 for c in commits if c.error)
+    if failed:
+        summary += f"; {failed} commit(s) failed"
+    return '\n\n'.join(sections + [summary + '.'])
+
+def _print_report_header():
+    print(Colors.header("\n" + "="*60))
+    print(Colors.header("  🚀 PROFESSIONAL AI CODE REVIEW REPORT  "))
+    print(Colors.header("="*60 + "\n"))
+
+def _print_report_footer():
+    print(Colors.header("\n" + "="*60))
+    print(Colors.header("  📋 Review Complete - Check findings above  "))
+    print(Colors.header("="*60))
+
+def _print_streamed_review(pieces):
+    """Print review text as it streams in, cleaned up like a complete review and colored one line at a time."""
+    for line in colorize_lines(_complete_lines(stream_review_output(pieces))):
+        print(line, flush=True)
 
-**OUTPUT FORMAT REQUIREMENT:**
+def _complete_lines(pieces):
+    """Turn streamed text into lines, yielding each one once its newline arrives."""
+    partial = []
+    for piece in pieces:
+        *lines, rest = piece.split('\n')
+        if lines:
+            lines[0] = ''.join(partial) + lines[0]
+            partial = []
+            yield from lines
+        partial.append(rest)
+    if ''.join(partial):
+        yield ''.join(partial)
+
+_HTML_FORMAT_INSTRUCTIONS = """**OUTPUT FORMAT REQUIREMENT:**
 Generate a complete, professional HTML document with:
 1. Modern CSS styling with responsive design
 2. Executive summary with metrics and risk assessment
@@ -93,27 +413,9 @@ Generate a complete, professional HTML document with:
 9. Performance impact analysis (if applicable)
 10. Compliance checklist (best practices, style guide adherence)
 
-Use professional icons, charts, and visual elements. Make it presentation-ready for stakeholders.
-
-**CODE CHANGES TO REVIEW:**
-```diff
-{diff}
-```
-
-Generate the complete HTML report now:"""
-    else:
-        prompt = f"""You are a senior software architect and security expert. Perform a comprehensive, professional code review.
+Use professional icons, charts, and visual elements. Make it presentation-ready for stakeholders."""
 
-**REVIEW CONFIGURATION:**
-- Review Type: {review_type.upper()}
-- Changes Reviewed: {changes_desc}
-- Minimum Severity: {severity}
-- Repository Context: {repo_context}
-
-**REVIEW SCOPE:**
-{_get_review_scope_instructions(review_type)}
-
-**CLI OUTPUT FORMAT REQUIREMENTS:**
+_CLI_FORMAT_INSTRUCTIONS = """**CLI OUTPUT FORMAT REQUIREMENTS:**
 - Use clear section headers with ASCII art dividers
 - Categorize findings by severity: CRITICAL, HIGH, MEDIUM, LOW, INFO
 - For each finding, provide: file:line, severity, description, recommendation
@@ -130,38 +432,73 @@ Generate the complete HTML report now:"""
 - Mark warnings with "WARNING", "CAUTION", "POTENTIAL", "CONSIDER", "SHOULD" so they get colored yellow
 - Mark good practices with "GOOD", "EXCELLENT", "WELL", "NICE", "CORRECT", "PROPER" so they get colored green
 - Use "##" for section headers to get cyan color formatting
-- Use "-" or "*" for bullet points to get white color formatting
+- Use "-" or "*" for bullet points to get white color formatting"""
+
+def _build_prompt(diff, review_type, changes_desc, severity, repo_context, html, part=None, by_hunk=False):
+    """
+    Build the review request for a diff, or for one part of a larger diff, as chat messages.
+    They are ordered from most to least stable so providers can reuse a cached prompt prefix:
+    the instructions (the same for every review of this type and format), then the diff, then
+    the details of this run. The first two are marked as cacheable.
+    """
+    part_note = ""
+    if part:
+        part_note = f"\n- Diff Part: {part}. Other parts are reviewed separately; only report findings for this part."
+    hunk_note = ""
+    if by_hunk:
+        diff = label_hunks(diff)
+        hunk_note = f"\n\n{HUNK_SECTION_INSTRUCTIONS}"
+    if html:
+        format_instructions = _HTML_FORMAT_INSTRUCTIONS
+        closing = "Generate the complete HTML report now:"
+        date_line = f"\n- Date: {datetime.now().strftime('%Y-%m-%d')}"
+    else:
+        format_instructions = _CLI_FORMAT_INSTRUCTIONS
+        closing = "Provide your comprehensive review now:"
+        date_line = ""
+    instructions = f"""You are a senior software architect and security expert. Perform a comprehensive, professional code review of the changes you are given.
+
+**REVIEW SCOPE ({review_type.upper()}):**
+{_get_review_scope_instructions(review_type)}
 
-**CODE CHANGES TO REVIEW:**
+{format_instructions}"""
+    changes = f"""**CODE CHANGES TO REVIEW:**
 ```diff
 {diff}
-```
+```"""
+    details = f"""**REVIEW CONFIGURATION:**
+- Review Type: {review_type.upper()}
+- Changes Reviewed: {changes_desc}
+- Minimum Severity: {severity}
+- Repository Context: {repo_context}{date_line}{part_note}{hunk_note}
 
-Provide your comprehensive review now:"""
+{closing}"""
+    return [
+        {"role": "system", "content": instructions, "cache": True},
+        {"role": "user", "content": changes, "cache": True},
+        {"role": "user", "content": details},
+    ]
 
-    print(Colors.header(f"🔍 Reviewing your {changes_desc} with AI..."))
-    try:
-        review = provider.generate(prompt=prompt)
-        # Clean up the AI-generated review
-        review = clean_review_output(review)
-    except Exception as e:
-        print(Colors.error(f"❌ Error generating review: {e}"))
-        return
+def _build_html_merge_prompt(findings, review_type, changes_desc, severity, repo_context):
+    """Build the messages that turn merged partial findings into a single HTML report."""
+    instructions = f"""You are a senior software architect and security expert. The changes were reviewed in several parts; combine the partial findings you are given into one professional report. Deduplicate overlapping findings and keep every file/line reference.
 
-    if html:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(review)
-        print(Colors.success(f"✅ Professional AI review report saved to: {output_file}"))
-        print(Colors.info(f"📊 Open the HTML file in your browser to view the interactive report"))
-    else:
-        formatted_review = format_cli_output(review)
-        print(Colors.header("\n" + "="*60))
-        print(Colors.header("  🚀 PROFESSIONAL AI CODE REVIEW REPORT  "))
-        print(Colors.header("="*60 + "\n"))
-        print(formatted_review)
-        print(Colors.header("\n" + "="*60))
-        print(Colors.header("  📋 Review Complete - Check findings above  "))
-        print(Colors.header("="*60))
+{_HTML_FORMAT_INSTRUCTIONS}"""
+    details = f"""**PARTIAL FINDINGS:**
+{findings}
+
+**REVIEW CONFIGURATION:**
+- Review Type: {review_type.upper()}
+- Changes Reviewed: {changes_desc}
+- Minimum Severity: {severity}
+- Repository Context: {repo_context}
+- Date: {datetime.now().strftime('%Y-%m-%d')}
+
+Generate the complete HTML report now:"""
+    return [
+        {"role": "system", "content": instructions, "cache": True},
+        {"role": "user", "content": details},
+    ]
 
 def _get_review_scope_instructions(review_type):
     """Get detailed instructions for each review type"""
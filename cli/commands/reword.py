@@ -0,0 +1,178 @@
+# CLI command to regenerate the messages of existing commits and rewrite them in one pass
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from core.config import settings
+from core.budget import prefilter_diff, print_dry_run_report, print_usage_summary
+from core.generator import build_commit_prompt, generate_commit_message, is_one_line
+from core.session import CommandSession
+from utils import Colors, get_repo, parse_range
+
+# Fields read for each commit; the message body goes last because it may contain anything but NUL
+_LOG_FORMAT = '%H%x1f%T%x1f%P%x1f%an%x1f%ae%x1f%ad%x1f%B'
+
+class RewordCommit:
+	"""A commit in the range, with its original metadata and (once generated) its new message."""
+
+	def __init__(self, record: str):
+		fields = record.split('\x1f', 6)
+		self.sha, self.tree = fields[0], fields[1]
+		self.parents = fields[2].split()
+		self.author_name, self.author_email, self.author_date = fields[3], fields[4], fields[5]
+		self.message = fields[6].strip()
+		self.new_message: Optional[str] = None
+		self.error: Optional[Exception] = None
+
+	@property
+	def is_merge(self) -> bool:
+		return len(self.parents) > 1
+
+	@property
+	def subject(self) -> str:
+		return self.message.split('\n', 1)[0]
+
+def load_commits(repo, start: str, end: str) -> List[RewordCommit]:
+	"""Commits in start..end, parents before children."""
+	output = repo.run_bytes(['log', '-z', '--reverse', '--topo-order', '--date=raw', f'--format={_LOG_FORMAT}', f'{start}..{end}'])
+	return [RewordCommit(record) for record in output.decode('utf-8', 'replace').split('\0') if record.strip()]
+
+def commit_diff(repo, commit: RewordCommit) -> str:
+	return repo.run_bytes(['diff-tree', '-p', '--root', commit.sha]).decode('utf-8', 'replace').strip()
+
+def rewrite(repo, commits: List[RewordCommit], old_head: str) -> str:
+	"""Recreate the commits with their new messages and move HEAD; returns the new HEAD."""
+	mapping: Dict[str, str] = {}
+	for commit in commits:
+		parents = [mapping.get(parent, parent) for parent in commit.parents]
+		if commit.new_message is None and parents == commit.parents:
+			# Unchanged and nothing below it changed: keep the original commit
+			mapping[commit.sha] = commit.sha
+			continue
+		args = ['commit-tree', commit.tree]
+		for parent in parents:
+			args += ['-p', parent]
+		env = {
+			'GIT_AUTHOR_NAME': commit.author_name,
+			'GIT_AUTHOR_EMAIL': commit.author_email,
+			'GIT_AUTHOR_DATE': '@' + commit.author_date,
+		}
+		message = (commit.new_message if commit.new_message is not None else commit.message) + '\n'
+		mapping[commit.sha] = repo.run_bytes(args, input=message.encode('utf-8'), env=env).decode().strip()
+	new_head = mapping[commits[-1].sha]
+	repo.run(['update-ref', 'ORIG_HEAD', old_head])
+	# Passing the old value makes git refuse the update if HEAD moved in the meantime
+	repo.run(['update-ref', '-m', 'git-ai reword', 'HEAD', new_head, old_head])
+	repo.refresh()
+	return new_head
+
+def main():
+	parser = argparse.ArgumentParser(description="Regenerate commit messages for a range of commits with AI")
+	parser.add_argument('range', help='Commits to reword, as A..B (B must be HEAD) or A (meaning A..HEAD)')
+	parser.add_argument('--format', choices=['detailed', 'one-line'], help='Commit message format')
+	parser.add_argument('--provider', help='Provider to use (overrides config)')
+	parser.add_argument('--model', help='Model to use (overrides config)')
+	parser.add_argument('--workers', type=int, help='Concurrent provider requests (default: REVIEW_WORKERS)')
+	parser.add_argument('--yes', '-y', action='store_true', help='Rewrite without asking for confirmation')
+	parser.add_argument('--no-cache', action='store_true', help='Always call the provider instead of reusing cached messages')
+	parser.add_argument('--dry-run', action='store_true', help='Show prompt size and projected cost without calling the provider')
+	args = parser.parse_args()
+
+	if args.format:
+		settings.set_override('COMMIT_FORMAT', args.format)
+	if args.provider:
+		settings.set_override('PROVIDER', args.provider)
+	provider_name = settings.get_provider()
+	if args.model:
+		settings.set_provider_override('MODEL', args.model, provider_name)
+
+	repo = get_repo()
+	try:
+		start, end = parse_range(args.range)
+		end_sha = repo.run(['rev-parse', '--verify', f'{end}^{{commit}}'])
+		repo.run(['rev-parse', '--verify', f'{start}^{{commit}}'])
+	except (ValueError, subprocess.CalledProcessError) as e:
+		print(Colors.error(f"❌ Invalid range '{args.range}': {e}"))
+		sys.exit(1)
+	old_head = repo.head
+	if end_sha != old_head:
+		print(Colors.error("❌ The range must end at HEAD, so that no other branch or commit depends on the rewritten commits."))
+		sys.exit(1)
+
+	# The provider is set up (and a local model loaded) while the commits are read and diffed
+	session = None if args.dry_run else CommandSession(provider_name)
+	commits = load_commits(repo, start, end)
+	if not commits:
+		print(Colors.info(f"ℹ No commits in {args.range}."))
+		return
+	branch = repo.branch
+	todo = [c for c in commits if not c.is_merge]
+	diffs = {c.sha: commit_diff(repo, c) for c in todo}
+	todo = [c for c in todo if diffs[c.sha]]
+	skipped = len(commits) - len(todo)
+
+	if args.dry_run:
+		prompts = []
+		dropped_all = []
+		for c in todo:
+			diff, dropped = prefilter_diff(diffs[c.sha])
+			prompt, _ = build_commit_prompt(diff, branch, is_one_line(), dropped)
+			prompts.append(prompt)
+			dropped_all.extend((f"{c.sha[:8]} {path}", reason) for path, reason in dropped)
+		model = settings.get_provider_option('MODEL', provider_name)
+		print_dry_run_report(provider_name, model, prompts, dropped_all)
+		if skipped:
+			print(Colors.dim(f"  {skipped} merge or empty commit(s) keep their message."))
+		return
+
+	provider = session.provider
+	workers = max(1, min(args.workers or int(settings.get('REVIEW_WORKERS', 4)), len(todo) or 1))
+	print(Colors.header(f"🤖 Generating {len(todo)} commit message(s) with {workers} worker(s)..."))
+
+	def generate(commit: RewordCommit) -> RewordCommit:
+		try:
+			commit.new_message = generate_commit_message(provider, diffs[commit.sha], branch, use_cache=not args.no_cache)
+		except Exception as e:
+			commit.error = e
+		return commit
+
+	done = 0
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		for future in as_completed([pool.submit(generate, c) for c in todo]):
+			done += 1
+			commit = future.result()
+			status = Colors.error("failed") if commit.error else Colors.success("done")
+			print(Colors.dim(f"  [{done}/{len(todo)}] {commit.sha[:8]} ") + status)
+	print_usage_summary(provider)
+
+	# Preview, in history order
+	print(Colors.header("\n📝 Preview"))
+	changed = 0
+	for commit in commits:
+		print(Colors.info(f"\n{commit.sha[:8]} ") + Colors.dim(commit.subject))
+		if commit.error:
+			print(Colors.error(f"  ✗ generation failed, keeping the original message: {commit.error}"))
+		elif commit.new_message is None:
+			print(Colors.dim("  (merge or empty commit, unchanged)"))
+		else:
+			changed += 1
+			for line in commit.new_message.splitlines():
+				print(Colors.highlight(f"  {line}"))
+	print()
+	if not changed:
+		print(Colors.warning("⚠ No messages were generated; nothing to rewrite."))
+		return
+	if not args.yes:
+		answer = input(Colors.dim(f"Rewrite {changed} of {len(commits)} commit(s)? [y/N]: ")).strip().lower()
+		if answer != 'y':
+			print(Colors.info("ℹ Nothing was changed."))
+			return
+	try:
+		new_head = rewrite(repo, commits, old_head)
+	except subprocess.CalledProcessError as e:
+		stderr = e.stderr.decode('utf-8', 'replace') if isinstance(e.stderr, bytes) else (e.stderr or '')
+		print(Colors.error(f"❌ Rewrite failed, history is unchanged: {stderr.strip() or e}"))
+		sys.exit(1)
+	print(Colors.success(f"✅ Rewrote {len(commits)} commit(s); HEAD is now {new_head[:8]}."))
+	print(Colors.dim(f"💡 To undo: git reset --soft {old_head[:8]} (also saved as ORIG_HEAD)"))
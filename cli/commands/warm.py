@@ -0,0 +1,45 @@
+# CLI command to load the configured model ahead of time (for shell startup or git hooks)
+import sys
+import time
+from core.config import settings
+from providers.factory import get_provider
+from utils import Colors
+
+def main():
+	import argparse
+	parser = argparse.ArgumentParser(description="Load the provider's model now, so the next commit or review doesn't wait for it.")
+	parser.add_argument('--provider', help='Provider to warm (default: the configured one)')
+	parser.add_argument('--model', help='Model to load (default: the configured one)')
+	parser.add_argument('--quiet', action='store_true', help='Print nothing; for shell startup files and hooks')
+	args = parser.parse_args()
+
+	if not settings.config_is_valid():
+		if not args.quiet:
+			print(Colors.warning("⚠️ git-ai is not configured yet; run 'git-ai config --interactive' first."))
+		return
+	if args.provider:
+		settings.set_override('PROVIDER', args.provider)
+	provider_name = settings.get_provider()
+	if args.model:
+		settings.set_provider_override('MODEL', args.model, provider_name)
+
+	start = time.monotonic()
+	try:
+		provider = get_provider(provider_name)
+		warmed = provider.warm()
+	except Exception as e:
+		if not args.quiet:
+			print(Colors.error(f"❌ Could not load the model: {e}"))
+		sys.exit(1)
+	if args.quiet:
+		return
+	if not warmed:
+		print(Colors.info(f"ℹ {provider_name} loads its models on the server side; nothing to warm."))
+		return
+	model = getattr(provider, 'model', None) or settings.get_provider_option('MODEL', provider_name)
+	keep_alive = settings.get_provider_option('KEEP_ALIVE', provider_name)
+	print(Colors.success(f"🔥 {model} is loaded ({time.monotonic() - start:.1f}s)")
+		+ (Colors.dim(f" (keep_alive: {keep_alive})") if keep_alive else ''))
+
+if __name__ == "__main__":
+	main()
@@ -1,17 +1,28 @@
 # Centralized argument parser for git-ai main CLI
 import argparse
-from cli.commands import commit_main, config_main, list_models_main, review_main
+from cli.commands import commit_main, config_main, list_models_main, review_main, cache_main, reword_main, daemon_main, hook_main, warm_main
 
 COMMANDS = {
     'commit': commit_main,
     'config': config_main,
     'list-models': list_models_main,
     'review': review_main,
+    'cache': cache_main,
+    'reword': reword_main,
+    'daemon': daemon_main,
+    'hook': hook_main,
+    'warm': warm_main,
 }
 
+# Commands that work without a valid provider configuration
+NO_CONFIG_COMMANDS = {'config', 'cache', 'daemon', 'hook', 'warm'}
+
 def get_main_parser():
     parser = argparse.ArgumentParser(
         description="git-ai: AI-powered Git commit assistant"
     )
     parser.add_argument('command', choices=COMMANDS.keys(), help='Command to run')
+    parser.add_argument('--import-time', action='store_true', help='Report startup time and which packages were imported')
+    parser.add_argument('--profile', action='store_true', help='Report where the time went (git, provider, cleanup) after the command')
+    parser.add_argument('--trace-file', metavar='PATH', help='Write timing spans to PATH (Chrome trace JSON, or JSON lines if PATH ends in .jsonl)')
     return parser
@@ -3,8 +3,11 @@
 import os
 import platform
 import configparser
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set, Tuple
 
 class Settings:
 	"""
@@ -16,70 +19,108 @@ class Settings:
 		'COMMIT_FORMAT': 'detailed',
 		'TEMPLATE': '',  # For future: custom commit templates
 		'HOOKS_ENABLED': 'false',
+		'HOOK_PREFETCH': 'true',  # pre-commit starts generating the message in the background
+		'HOOK_WAIT': '30',  # Seconds commit-msg waits for a prefetch that is still running
 		'LANGUAGE': 'en',
+		'CACHE_ENABLED': 'true',
+		'CACHE_TTL': '604800',  # Seconds a cached response stays valid (7 days)
+		'CACHE_MAX_MB': '50',
+		'MODELS_CACHE_TTL': '86400',  # Seconds a provider's model list is reused before it is fetched again
+		'REVIEW_CHUNK_TOKENS': '12000',  # Diff tokens per review chunk (capped at half the model context)
+		'REVIEW_WORKERS': '4',
+		'REVIEW_REUSE_FINDINGS': 'true',  # Reuse stored findings for diff hunks that are unchanged since an earlier review
+		'DIFF_IGNORE': '',  # Extra comma-separated globs to leave out of prompts
+		'DIFF_MAX_FILE_LINES': '2000',  # Truncate a file's diff beyond this many lines (0 = no limit)
+		'DIFF_SKIP_GENERATED': 'true',
+		'DAEMON_ENABLED': 'true',  # Send provider calls to `git-ai daemon` when it is running
+		'DAEMON_IDLE_TIMEOUT': '1800',  # Seconds without requests before the daemon exits (0 = never)
+		'HEDGE_PROVIDER': '',  # Second provider to race against the main one when it is slow (empty = off)
+		'HEDGE_DELAY': '2',  # Seconds without a first token before the hedge provider is asked too
+		'RETRY_MAX': '4',  # Retries after rate limits, timeouts and transient server errors
 	}
 
 	PROVIDER_DEFAULTS = {
 		'openai': {
 			'API_KEY': '',
 			'MODEL': 'gpt-4o-mini',
+			'RPM': '0',  # Requests per minute (0 = no limit)
+			'TPM': '0',  # Tokens per minute (0 = no limit)
 		},
 		'ollama': {
 			'HOST': 'http://localhost:11434',
 			'MODEL': 'llama3',
+			'POOL_SIZE': '10',
+			'CONNECT_TIMEOUT': '5',
+			'READ_TIMEOUT': '600',
+			'KEEP_ALIVE': '30m',  # How long the server keeps the model loaded after a request (-1 = always)
+			'PRELOAD': 'true',  # Start loading the model when a command starts, while the diff is collected
 		},
 		'anthropic': {
 			'API_KEY': '',
 			'MODEL': 'claude-3-opus-20240229',
+			'RPM': '0',  # Requests per minute (0 = no limit)
+			'TPM': '0',  # Tokens per minute (0 = no limit)
 		},
 		'gemini': {
             'API_KEY': '',
 			'MODEL': 'gemini-1.5-pro',
+			'RPM': '0',  # Requests per minute (0 = no limit)
+			'TPM': '0',  # Tokens per minute (0 = no limit)
         },
 		'lmstudio': {
             'HOST': 'http://localhost:1234',
 			'MODEL': 'gemma-3-1b-it-qat',
+			'POOL_SIZE': '10',
+			'CONNECT_TIMEOUT': '5',
+			'READ_TIMEOUT': '600',
         },
         'groq': {
             'API_KEY': '',
             'MODEL': 'openai/gpt-oss-120b',
+            'RPM': '0',  # Requests per minute (0 = no limit)
+            'TPM': '0',  # Tokens per minute (0 = no limit)
         },
         'deepseek': {
             'API_KEY': '',
             'MODEL': 'deepseek-chat',
+            'RPM': '0',  # Requests per minute (0 = no limit)
+            'TPM': '0',  # Tokens per minute (0 = no limit)
         },
 	}
 
+	# Required fields for each provider
+	REQUIRED_OPTIONS = {
+		'openai': ['API_KEY', 'MODEL'],
+		'ollama': ['HOST', 'MODEL'],
+		'anthropic': ['API_KEY', 'MODEL'],
+		'gemini': ['API_KEY', 'MODEL'],
+		'lmstudio': ['HOST', 'MODEL'],
+		'groq': ['API_KEY', 'MODEL'],
+		'deepseek': ['API_KEY', 'MODEL'],
+	}
+
+	# Environment variables override settings for a single process without touching the file:
+	# GIT_AI_<KEY> for global settings (e.g. GIT_AI_PROVIDER), GIT_AI_<PROVIDER>_<KEY> for provider
+	# options (e.g. GIT_AI_OPENAI_API_KEY), and GIT_AI_MODEL for the active provider's model.
+	ENV_PREFIX = 'GIT_AI_'
+
+	# How often (seconds) to check the config file's mtime for changes made by other processes
+	RELOAD_INTERVAL = 1.0
+
 	@classmethod
 	def config_file_exists(cls) -> bool:
 		"""Return True if the config file exists."""
 		return cls.get_config_file().exists()
-	@classmethod
-	def config_is_valid(cls) -> bool:
+
+	def config_is_valid(self) -> bool:
 		"""
 		Returns True if the config file exists and required config values for the selected provider are present.
 		"""
-		if not cls.config_file_exists():
-			return False
-		# Load config to check required fields
-		parser = configparser.ConfigParser()
-		parser.read(cls.get_config_file())
-		# Check global provider
-		provider = parser['DEFAULT'].get('PROVIDER', 'openai').lower()
-		# Required fields for each provider
-		required = {
-			'openai': ['API_KEY', 'MODEL'],
-			'ollama': ['HOST', 'MODEL'],
-			'anthropic': ['API_KEY', 'MODEL'],
-			'gemini': ['API_KEY', 'MODEL'],
-			'lmstudio': ['HOST', 'MODEL'],
-            'groq': ['API_KEY', 'MODEL'],
-		}
-		section = provider.upper()
-		if section not in parser:
+		if not self.config_file.exists():
 			return False
-		for key in required.get(provider, []):
-			if not parser[section].get(key):
+		provider = self.get_provider().lower()
+		for key in self.REQUIRED_OPTIONS.get(provider, []):
+			if not self.get_provider_option(key, provider):
 				return False
 		return True
 
@@ -94,6 +135,19 @@ class Settings:
 			return Path(os.getenv('APPDATA', home))
 		return home / '.config'
 
+	@staticmethod
+	def get_cache_dir() -> Path:
+		xdg = os.environ.get("XDG_CACHE_HOME")
+		if xdg:
+			return Path(xdg) / 'git-ai'
+		system = platform.system()
+		home = Path.home()
+		if system == 'Windows':
+			return Path(os.getenv('LOCALAPPDATA', home)) / 'git-ai' / 'cache'
+		if system == 'Darwin':
+			return home / 'Library' / 'Caches' / 'git-ai'
+		return home / '.cache' / 'git-ai'
+
 	@classmethod
 	def get_config_file(cls) -> Path:
 		return cls.get_config_dir() / 'sam.git.ini'
@@ -103,11 +157,44 @@ class Settings:
 		self.config = configparser.ConfigParser()
 		self._data: Dict[str, Any] = dict(self.DEFAULTS)
 		self._provider_data: Dict[str, Dict[str, Any]] = {k: dict(v) for k, v in self.PROVIDER_DEFAULTS.items()}
+		# Ephemeral values (CLI flags, environment) that are never written to disk
+		self._overrides: Dict[str, Any] = {}
+		self._provider_overrides: Dict[str, Dict[str, Any]] = {}
+		# Keys changed in this process and not yet saved, as (provider or None, key)
+		self._dirty: Set[Tuple[Optional[str], str]] = set()
+		self._batch_depth = 0
+		self._mtime: Optional[float] = None
+		self._checked = 0.0
+		self._load_env_overrides()
 		self.load()
 
+	def _load_env_overrides(self):
+		for name, value in os.environ.items():
+			if not name.startswith(self.ENV_PREFIX):
+				continue
+			key = name[len(self.ENV_PREFIX):]
+			if key in self.DEFAULTS:
+				self._overrides[key] = value
+			elif key == 'MODEL':
+				self._provider_overrides.setdefault(None, {})['MODEL'] = value
+			else:
+				for provider, defaults in self.PROVIDER_DEFAULTS.items():
+					prefix = provider.upper() + '_'
+					if key.startswith(prefix) and key[len(prefix):] in defaults:
+						self._provider_overrides.setdefault(provider, {})[key[len(prefix):]] = value
+
+	def _file_mtime(self) -> Optional[float]:
+		try:
+			return self.config_file.stat().st_mtime
+		except OSError:
+			return None
+
 	def load(self):
 		if self.config_file.exists():
+			self.config = configparser.ConfigParser()
 			self.config.read(self.config_file)
+			self._mtime = self._file_mtime()
+			self._checked = time.monotonic()
 			# Load global/defaults
 			for k in self.DEFAULTS:
 				v = self.config['DEFAULT'].get(k, self.DEFAULTS[k])
@@ -121,37 +208,113 @@ class Settings:
 		else:
 			self.save()  # Create with defaults
 
+	def reload_if_changed(self):
+		"""Re-read the config file if another process changed it (checked at most once per RELOAD_INTERVAL)."""
+		now = time.monotonic()
+		if now - self._checked < self.RELOAD_INTERVAL:
+			return
+		self._checked = now
+		if self._dirty or self._file_mtime() == self._mtime:
+			return
+		self.load()
+
 	def save(self):
-		self.config['DEFAULT'] = {k: str(v) for k, v in self._data.items()}
-		# Save provider sections
+		"""
+		Write pending changes. The latest file on disk is re-read first and only the keys changed
+		in this process are applied, so concurrent writers (e.g. several hook processes) don't
+		overwrite each other; the file is replaced atomically.
+		"""
+		if self._batch_depth:
+			return
+		merged = configparser.ConfigParser()
+		merged.read(self.config_file)
+		defaults = merged.defaults()
+		for k, v in self._data.items():
+			if (None, k) in self._dirty or k.lower() not in defaults:
+				merged.set('DEFAULT', k, str(v))
 		for provider, pdata in self._provider_data.items():
 			section = provider.upper()
-			self.config[section] = {k: str(v) for k, v in pdata.items()}
+			if not merged.has_section(section):
+				merged.add_section(section)
+			for k, v in pdata.items():
+				if (provider, k) in self._dirty or not merged.has_option(section, k):
+					merged.set(section, k, str(v))
 		self.config_file.parent.mkdir(parents=True, exist_ok=True)
-		with open(self.config_file, 'w') as f:
-			self.config.write(f)
+		fd, tmp = tempfile.mkstemp(dir=str(self.config_file.parent), prefix='.sam.git.', suffix='.tmp')
+		try:
+			with os.fdopen(fd, 'w') as f:
+				merged.write(f)
+			os.replace(tmp, self.config_file)
+		except BaseException:
+			try:
+				os.unlink(tmp)
+			except OSError:
+				pass
+			raise
+		self._dirty.clear()
+		self.load()
+
+	@contextmanager
+	def batch(self):
+		"""Group several set()/set_provider_option() calls into a single write."""
+		self._batch_depth += 1
+		try:
+			yield self
+		finally:
+			self._batch_depth -= 1
+		if not self._batch_depth and self._dirty:
+			self.save()
 
 	def get(self, key: str, default: Any = None) -> Any:
+		if key in self._overrides:
+			return self._overrides[key]
+		self.reload_if_changed()
 		return self._data.get(key, default)
 
 	def set(self, key: str, value: Any):
 		self._data[key] = value
+		self._dirty.add((None, key))
 		self.save()
 
+	def set_override(self, key: str, value: Any):
+		"""Override a global setting for this process only."""
+		self._overrides[key] = value
+
 	def get_provider(self) -> str:
-		return self._data.get('PROVIDER', 'openai')
+		return self.get('PROVIDER', 'openai')
 
 	def get_provider_option(self, key: str, provider: Optional[str] = None, default: Any = None) -> Any:
 		provider = provider or self.get_provider()
+		if key in self._provider_overrides.get(provider, {}):
+			return self._provider_overrides[provider][key]
+		if provider == self.get_provider() and key in self._provider_overrides.get(None, {}):
+			return self._provider_overrides[None][key]
+		self.reload_if_changed()
 		return self._provider_data.get(provider, {}).get(key, default)
 
+	def get_provider_options(self, provider: Optional[str] = None) -> Dict[str, Any]:
+		"""Return all effective options (file, environment and overrides) for a provider."""
+		provider = provider or self.get_provider()
+		self.reload_if_changed()
+		keys = set(self.PROVIDER_DEFAULTS.get(provider, {})) | set(self._provider_data.get(provider, {}))
+		keys |= set(self._provider_overrides.get(provider, {}))
+		if provider == self.get_provider():
+			keys |= set(self._provider_overrides.get(None, {}))
+		return {key: self.get_provider_option(key, provider) for key in sorted(keys)}
+
 	def set_provider_option(self, key: str, value: Any, provider: Optional[str] = None):
 		provider = provider or self.get_provider()
 		if provider not in self._provider_data:
 			self._provider_data[provider] = {}
 		self._provider_data[provider][key] = value
+		self._dirty.add((provider, key))
 		self.save()
 
+	def set_provider_override(self, key: str, value: Any, provider: Optional[str] = None):
+		"""Override a provider option for this process only."""
+		provider = provider or self.get_provider()
+		self._provider_overrides.setdefault(provider, {})[key] = value
+
 	def as_dict(self) -> Dict[str, Any]:
 		d = dict(self._data)
 		d['providers'] = {k: dict(v) for k, v in self._provider_data.items()}
@@ -0,0 +1,92 @@
+# Diff pre-filtering and token/cost estimates for prompts
+from typing import List, Optional, Tuple
+from core.config import settings
+from utils import Colors
+from utils.diff import filter_diff, estimate_tokens
+
+# Approximate USD price per million input tokens, by model name prefix; first match wins.
+# Local providers (Ollama, LM Studio) are free and are handled separately.
+MODEL_INPUT_PRICING = [
+	('gpt-4o-mini', 0.15),
+	('gpt-4o', 2.50),
+	('gpt-4.1-nano', 0.10),
+	('gpt-4.1-mini', 0.40),
+	('gpt-4.1', 2.00),
+	('gpt-4-turbo', 10.00),
+	('gpt-3.5', 0.50),
+	('claude-3-opus', 15.00),
+	('claude-3-5-haiku', 0.80),
+	('claude-3-haiku', 0.25),
+	('claude-3', 3.00),
+	('claude-opus', 15.00),
+	('claude-sonnet', 3.00),
+	('claude-haiku', 1.00),
+	('gemini-1.5-flash', 0.075),
+	('gemini-1.5-pro', 1.25),
+	('gemini-2.0-flash', 0.10),
+	('deepseek-chat', 0.27),
+	('deepseek-reasoner', 0.55),
+	('openai/gpt-oss-120b', 0.15),
+	('openai/gpt-oss-20b', 0.10),
+]
+LOCAL_PROVIDERS = {'ollama', 'lmstudio'}
+
+def prefilter_diff(diff: str) -> Tuple[str, List[Tuple[str, str]]]:
+	"""Apply the configured ignore globs, generated-file heuristics and per-file line limit."""
+	ignore = [g.strip() for g in str(settings.get('DIFF_IGNORE', '')).split(',') if g.strip()]
+	max_lines = int(settings.get('DIFF_MAX_FILE_LINES', 0) or 0)
+	skip_generated = str(settings.get('DIFF_SKIP_GENERATED', 'true')).lower() == 'true'
+	return filter_diff(diff, ignore, max_lines, skip_generated)
+
+def project_cost(provider_name: str, model: Optional[str], input_tokens: int) -> Optional[float]:
+	"""Return the approximate input cost in USD, or None if the model's price is unknown."""
+	if provider_name in LOCAL_PROVIDERS:
+		return 0.0
+	name = (model or '').lower()
+	for prefix, price in MODEL_INPUT_PRICING:
+		if name.startswith(prefix):
+			return input_tokens * price / 1000000
+	return None
+
+def print_dropped_summary(dropped: List[Tuple[str, str]]):
+	"""One-line note for regular runs when the pre-filter removed or truncated files."""
+	if dropped:
+		print(Colors.dim(f"ℹ Filtered {len(dropped)} file(s) from the diff (lockfiles, generated or oversized). Use --dry-run for details."))
+
+def print_dry_run_report(provider_name: str, model: Optional[str], prompts: List[str], dropped: List[Tuple[str, str]]):
+	"""Print what would be sent to the provider without sending anything."""
+	tokens = [estimate_tokens(p) for p in prompts]
+	total = sum(tokens)
+	print(Colors.header("🧮 Dry run: nothing was sent to the provider"))
+	print(Colors.info("  Provider: ") + Colors.highlight(f"{provider_name} ({model or 'default model'})"))
+	print(Colors.info("  Requests: ") + Colors.highlight(str(len(prompts))))
+	if len(prompts) > 1:
+		print(Colors.info("  Largest request: ") + Colors.highlight(f"~{max(tokens):,} tokens"))
+	print(Colors.info("  Prompt size: ") + Colors.highlight(f"~{total:,} input tokens ({sum(len(p) for p in prompts):,} chars)"))
+	cost = project_cost(provider_name, model, total)
+	if cost is None:
+		print(Colors.info("  Projected input cost: ") + Colors.dim("unknown for this model"))
+	else:
+		print(Colors.info("  Projected input cost: ") + Colors.highlight(f"${cost:.4f}"))
+	if dropped:
+		print(Colors.warning(f"\n  Filtered {len(dropped)} file(s):"))
+		for path, reason in dropped:
+			print(Colors.dim(f"    - {path}: {reason}"))
+	else:
+		print(Colors.dim("\n  No files were filtered."))
+
+def print_usage_summary(provider):
+	"""One line with the token usage the provider reported, including prompt cache hits."""
+	usage = getattr(provider, 'usage', None)
+	if not usage or not usage.get('input_tokens'):
+		return  # Nothing was sent (e.g. answered from the response cache) or nothing was reported
+	line = f"ℹ Tokens: {usage['input_tokens']:,} in"
+	if usage['cached_tokens']:
+		share = usage['cached_tokens'] / usage['input_tokens'] if usage['input_tokens'] else 0
+		line += f" ({usage['cached_tokens']:,} from the provider's prompt cache, {share:.0%})"
+	if usage['cache_write_tokens']:
+		line += f", {usage['cache_write_tokens']:,} written to the prompt cache"
+	line += f", {usage['output_tokens']:,} out"
+	if usage['requests'] > 1:
+		line += f" over {usage['requests']} requests"
+	print(Colors.dim(line))
@@ -0,0 +1,218 @@
+# Content-addressed on-disk cache for provider responses
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from core.config import settings
+
+class ResponseCache:
+	"""
+	Stores provider responses on disk, keyed by a hash of everything that determines the output
+	(provider, model, messages and generation parameters).
+	Entries expire after `ttl` seconds and the least recently used ones are evicted once the
+	cache grows past `max_bytes`.
+	"""
+
+	def __init__(self, directory: Optional[Path] = None, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+		self.directory = Path(directory) if directory else settings.get_cache_dir() / 'responses'
+		self.ttl = float(ttl if ttl is not None else settings.get('CACHE_TTL', 604800))
+		self.max_bytes = int(max_bytes if max_bytes is not None else float(settings.get('CACHE_MAX_MB', 50)) * 1024 * 1024)
+
+	@staticmethod
+	def make_key(provider: str, model: Optional[str], messages: Any, params: Optional[Dict[str, Any]] = None) -> str:
+		"""Return a stable hash for a generation request."""
+		payload = json.dumps(
+			{'provider': provider, 'model': model, 'messages': messages, 'params': params or {}},
+			sort_keys=True, ensure_ascii=False, default=str,
+		)
+		return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+	def _path(self, key: str) -> Path:
+		return self.directory / key[:2] / f"{key}.json"
+
+	def get(self, key: str) -> Optional[str]:
+		"""Return the cached value for key, or None if it is missing or expired."""
+		path = self._path(key)
+		try:
+			with open(path, 'r', encoding='utf-8') as f:
+				entry = json.load(f)
+		except (OSError, ValueError):
+			self._record('misses')
+			return None
+		if time.time() - entry.get('created', 0) > self.ttl:
+			self._unlink(path)
+			self._record('misses')
+			return None
+		try:
+			os.utime(path, None)  # Mark as recently used for LRU eviction
+		except OSError:
+			pass
+		self._record('hits')
+		return entry.get('value')
+
+	def set(self, key: str, value: str):
+		"""Store value under key and evict old entries if the cache is over its size limit."""
+		self._write(key, value)
+		self._evict()
+
+	def _write(self, key: str, value: str):
+		path = self._path(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+		with os.fdopen(fd, 'w', encoding='utf-8') as f:
+			json.dump({'created': time.time(), 'value': value}, f, ensure_ascii=False)
+		os.replace(tmp, path)
+
+	def _entries(self) -> List[Path]:
+		if not self.directory.exists():
+			return []
+		return list(self.directory.glob('*/*.json'))
+
+	def _evict(self):
+		entries = []
+		total = 0
+		for path in self._entries():
+			try:
+				st = path.stat()
+			except OSError:
+				continue
+			entries.append((st.st_mtime, st.st_size, path))
+			total += st.st_size
+		if total <= self.max_bytes:
+			return
+		for _, size, path in sorted(entries):
+			self._unlink(path)
+			total -= size
+			if total <= self.max_bytes:
+				break
+
+	@staticmethod
+	def _unlink(path: Path):
+		try:
+			path.unlink()
+		except OSError:
+			pass
+
+	def _stats_file(self) -> Path:
+		return self.directory / 'stats.json'
+
+	def _load_counters(self) -> Dict[str, int]:
+		try:
+			with open(self._stats_file(), 'r', encoding='utf-8') as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return {'hits': 0, 'misses': 0}
+
+	def _record(self, counter: str):
+		counters = self._load_counters()
+		counters[counter] = counters.get(counter, 0) + 1
+		try:
+			self.directory.mkdir(parents=True, exist_ok=True)
+			fd, tmp = tempfile.mkstemp(dir=str(self.directory), suffix='.tmp')
+			with os.fdopen(fd, 'w', encoding='utf-8') as f:
+				json.dump(counters, f)
+			os.replace(tmp, self._stats_file())
+		except OSError:
+			pass
+
+	def stats(self) -> Dict[str, Any]:
+		"""Return entry count, total size and hit/miss counters."""
+		sizes = []
+		for path in self._entries():
+			try:
+				sizes.append(path.stat().st_size)
+			except OSError:
+				continue
+		counters = self._load_counters()
+		return {
+			'directory': str(self.directory),
+			'entries': len(sizes),
+			'size_bytes': sum(sizes),
+			'max_bytes': self.max_bytes,
+			'ttl': self.ttl,
+			'hits': counters.get('hits', 0),
+			'misses': counters.get('misses', 0),
+		}
+
+	def clear(self) -> int:
+		"""Delete all entries and counters. Returns the number of entries removed."""
+		removed = 0
+		for path in self._entries():
+			self._unlink(path)
+			removed += 1
+		self._unlink(self._stats_file())
+		return removed
+
+_cache: Optional[ResponseCache] = None
+
+def get_cache() -> ResponseCache:
+	"""Return the process-wide response cache."""
+	global _cache
+	if _cache is None:
+		_cache = ResponseCache()
+	return _cache
+
+def cache_enabled() -> bool:
+	return str(settings.get('CACHE_ENABLED', 'true')).lower() == 'true'
+
+def provider_cache_key(provider, prompt: str, **kwargs) -> str:
+	"""Build the cache key for a provider.generate() call."""
+	params = {k: v for k, v in kwargs.items() if k != 'messages'}
+	params['host'] = getattr(provider, 'host', None)
+	return ResponseCache.make_key(
+		getattr(provider, 'class_name', type(provider).__name__),
+		getattr(provider, 'model', None),
+		kwargs.get('messages') or prompt,
+		params,
+	)
+
+def cached_generate(provider, prompt: str, use_cache: bool = True, **kwargs) -> str:
+	"""Call provider.generate(), returning a cached response for identical requests."""
+	if not (use_cache and cache_enabled()):
+		return provider.generate(prompt=prompt, **kwargs)
+	cache = get_cache()
+	key = provider_cache_key(provider, prompt, **kwargs)
+	cached = cache.get(key)
+	if cached is not None:
+		return cached
+	response = provider.generate(prompt=prompt, **kwargs)
+	if response:
+		cache.set(key, response)
+	return response
+
+def cached_stream(provider, prompt: str, use_cache: bool = True, **kwargs) -> Iterator[str]:
+	"""Like cached_generate(), but yields the response as it streams in.
+	A cache hit is yielded in one piece; a miss is stored once the stream completes."""
+	if not (use_cache and cache_enabled()):
+		yield from provider.stream(prompt=prompt, **kwargs)
+		return
+	cache = get_cache()
+	key = provider_cache_key(provider, prompt, **kwargs)
+	cached = cache.get(key)
+	if cached is not None:
+		yield cached
+		return
+	parts = []
+	for piece in provider.stream(prompt=prompt, **kwargs):
+		parts.append(piece)
+		yield piece
+	response = ''.join(parts)
+	if response:
+		cache.set(key, response)
+
+async def acached_generate(provider, prompt: str, use_cache: bool = True, **kwargs) -> str:
+	"""Async version of cached_generate()."""
+	if not (use_cache and cache_enabled()):
+		return await provider.agenerate(prompt, **kwargs)
+	cache = get_cache()
+	key = provider_cache_key(provider, prompt, **kwargs)
+	cached = cache.get(key)
+	if cached is not None:
+		return cached
+	response = await provider.agenerate(prompt, **kwargs)
+	if response:
+		cache.set(key, response)
+	return response
@@ -0,0 +1,303 @@
+# Background daemon that keeps provider clients warm and serves provider calls over a Unix socket
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from config import Settings
+from core.config import settings
+from providers.base import new_usage, usage_sink
+
+# Bumped whenever the wire format changes; clients fall back to in-process calls on a mismatch
+PROTOCOL = 1
+# Responses are sent as single JSON lines, so allow long ones
+LINE_LIMIT = 64 * 1024 * 1024
+
+def daemon_supported() -> bool:
+	return hasattr(socket, 'AF_UNIX')
+
+def daemon_dir() -> Path:
+	runtime = os.environ.get('XDG_RUNTIME_DIR')
+	return Path(runtime) / 'git-ai' if runtime else Settings.get_cache_dir() / 'daemon'
+
+def make_daemon_dir() -> Path:
+	"""Create the daemon's directory, private to this user even if it already existed."""
+	path = daemon_dir()
+	path.mkdir(parents=True, exist_ok=True, mode=0o700)
+	os.chmod(str(path), 0o700)
+	return path
+
+def socket_path() -> Path:
+	return daemon_dir() / 'daemon.sock'
+
+def log_path() -> Path:
+	return daemon_dir() / 'daemon.log'
+
+def self_command(*args: str) -> List[str]:
+	"""Command line that runs this git-ai installation (source checkout or frozen binary)."""
+	if getattr(sys, 'frozen', False):
+		return [sys.executable] + list(args)
+	main_py = Path(__file__).resolve().parent.parent / 'main.py'
+	return [sys.executable, str(main_py)] + list(args)
+
+def encode(message: Dict[str, Any]) -> bytes:
+	return json.dumps(message).encode('utf-8') + b'\n'
+
+# ---- Client side ----
+
+async def request(message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+	"""Send one request to the daemon and yield its response lines. Raises OSError if it is not running."""
+	reader, writer = await asyncio.open_unix_connection(str(socket_path()), limit=LINE_LIMIT)
+	try:
+		writer.write(encode(dict(message, protocol=PROTOCOL)))
+		await writer.drain()
+		while True:
+			line = await reader.readline()
+			if not line:
+				raise ConnectionError("git-ai daemon closed the connection")
+			reply = json.loads(line)
+			yield reply
+			if 'chunk' not in reply:
+				return
+	finally:
+		writer.close()
+
+def call(op: str, timeout: float = 2.0, **fields) -> Optional[Dict[str, Any]]:
+	"""Blocking single-reply request (ping, shutdown); returns None if the daemon is not reachable."""
+	if not daemon_supported() or not socket_path().exists():
+		return None
+	try:
+		with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+			sock.settimeout(timeout)
+			sock.connect(str(socket_path()))
+			sock.sendall(encode(dict(fields, op=op, protocol=PROTOCOL)))
+			data = b''
+			while not data.endswith(b'\n'):
+				chunk = sock.recv(65536)
+				if not chunk:
+					break
+				data += chunk
+		return json.loads(data) if data else None
+	except (OSError, ValueError):
+		return None
+
+def start_daemon(wait: float = 5.0) -> Optional[Dict[str, Any]]:
+	"""Start the daemon in the background and wait until it answers; returns its status."""
+	status = call('ping')
+	if status:
+		return status
+	make_daemon_dir()
+	with open(log_path(), 'ab') as log:
+		subprocess.Popen(
+			self_command('daemon', 'run'), stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+			start_new_session=True, close_fds=True,
+		)
+	deadline = time.monotonic() + wait
+	while time.monotonic() < deadline:
+		time.sleep(0.05)
+		status = call('ping')
+		if status:
+			return status
+	return None
+
+# ---- Server side ----
+
+class _Flight:
+	"""One in-progress provider call whose output is shared by every identical request."""
+
+	def __init__(self):
+		self.chunks: List[str] = []
+		self.done = False
+		self.error: Optional[BaseException] = None
+		self.cond = asyncio.Condition()
+		self.usage = new_usage()
+
+	async def follow(self) -> AsyncIterator[str]:
+		i = 0
+		while True:
+			async with self.cond:
+				await self.cond.wait_for(lambda: len(self.chunks) > i or self.done)
+				new, done = self.chunks[i:], self.done
+			i += len(new)
+			for piece in new:
+				yield piece
+			if done:
+				if self.error is not None:
+					raise self.error
+				return
+
+class DaemonServer:
+	"""
+	Serves generate/stream/list_models/warm requests with provider instances that stay alive between
+	CLI runs, so SDK imports, client setup and HTTP keep-alive connections are paid for once.
+	Identical concurrent requests share one provider call (single-flight).
+	"""
+
+	def __init__(self, idle_timeout: float = 0):
+		self.idle_timeout = idle_timeout
+		self.started = time.time()
+		self.last_active = time.monotonic()
+		self.active = 0
+		self.requests = 0
+		self.coalesced = 0
+		self._providers: Dict[Tuple[str, str], Any] = {}
+		self._flights: Dict[str, _Flight] = {}
+		self._stop: Optional[asyncio.Event] = None
+
+	def _provider(self, name: str, options: Dict[str, Any]):
+		from providers.factory import get_provider_class
+		from providers.scheduler import RateLimitedProvider
+		key = (name, json.dumps(options, sort_keys=True))
+		provider = self._providers.get(key)
+		if provider is None:
+			# Providers read their options from settings when constructed; apply the client's values
+			for option, value in options.items():
+				settings.set_provider_override(option, value, name)
+			provider = RateLimitedProvider(get_provider_class(name)(), name)
+			self._providers[key] = provider
+		return provider
+
+	def _start_flight(self, key: str, source: AsyncIterator[str]) -> _Flight:
+		flight = _Flight()
+		self._flights[key] = flight
+
+		async def produce():
+			# Token counts the provider records during this call are collected on the flight
+			usage_sink.set(flight.usage)
+			try:
+				async for piece in source:
+					async with flight.cond:
+						flight.chunks.append(piece)
+						flight.cond.notify_all()
+			except Exception as e:
+				flight.error = e
+			finally:
+				self._flights.pop(key, None)
+				async with flight.cond:
+					flight.done = True
+					flight.cond.notify_all()
+
+		asyncio.ensure_future(produce())
+		return flight
+
+	def _flight_for(self, message: Dict[str, Any]) -> Tuple[_Flight, bool]:
+		"""Return the flight serving this request and whether this request started it."""
+		op = message['op']
+		provider = self._provider(message['provider'], message.get('options') or {})
+		prompt, kwargs = message.get('prompt', ''), message.get('kwargs') or {}
+		key = hashlib.sha256(json.dumps(
+			[op, message['provider'], message.get('options'), prompt, kwargs], sort_keys=True
+		).encode('utf-8')).hexdigest()
+		flight = self._flights.get(key)
+		if flight is not None:
+			self.coalesced += 1
+			return flight, False
+		if op == 'stream':
+			source = provider.astream(prompt, **kwargs)
+		else:
+			async def single():
+				yield await provider.agenerate(prompt, **kwargs)
+			source = single()
+		return self._start_flight(key, source), True
+
+	def status(self) -> Dict[str, Any]:
+		from providers.scheduler import scheduler_metrics
+		return {
+			'pid': os.getpid(),
+			'protocol': PROTOCOL,
+			'uptime': time.time() - self.started,
+			'requests': self.requests,
+			'coalesced': self.coalesced,
+			'in_flight': len(self._flights),
+			'providers': sorted({name for name, _ in self._providers}),
+			'schedulers': scheduler_metrics(),
+		}
+
+	async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		self.active += 1
+		try:
+			line = await reader.readline()
+			if not line:
+				return
+			message = json.loads(line)
+			op = message.get('op')
+			if message.get('protocol') != PROTOCOL:
+				writer.write(encode({'error': f"protocol mismatch (daemon speaks {PROTOCOL})"}))
+			elif op == 'ping':
+				writer.write(encode(self.status()))
+			elif op == 'shutdown':
+				writer.write(encode({'ok': True}))
+				self._stop.set()
+			elif op == 'list_models':
+				self.requests += 1
+				provider = self._provider(message['provider'], message.get('options') or {})
+				writer.write(encode({'result': await provider.alist_models()}))
+			elif op == 'warm':
+				self.requests += 1
+				provider = self._provider(message['provider'], message.get('options') or {})
+				writer.write(encode({'result': await provider.awarm()}))
+			elif op in ('generate', 'stream'):
+				self.requests += 1
+				flight, leader = self._flight_for(message)
+				async for piece in flight.follow():
+					writer.write(encode({'chunk': piece}))
+					await writer.drain()
+				# Only the request that made the provider call reports its token usage
+				writer.write(encode({'done': True, 'usage': flight.usage if leader else None}))
+			else:
+				writer.write(encode({'error': f"unknown op: {op}"}))
+			await writer.drain()
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass  # Client went away; a shared flight keeps running for the others
+		except Exception as e:
+			try:
+				writer.write(encode({'error': f"{type(e).__name__}: {e}"}))
+				await writer.drain()
+			except ConnectionError:
+				pass
+		finally:
+			self.active -= 1
+			self.last_active = time.monotonic()
+			writer.close()
+
+	async def _watch_idle(self):
+		while not self._stop.is_set():
+			await asyncio.sleep(min(30.0, self.idle_timeout))
+			if not self.active and time.monotonic() - self.last_active > self.idle_timeout:
+				self._stop.set()
+
+	async def serve(self, path: Path):
+		self._stop = asyncio.Event()
+		make_daemon_dir()
+		if path.exists():
+			path.unlink()  # Stale socket from a daemon that did not shut down cleanly
+		# Clients send API keys over the socket, so it is created private rather than chmod'ed after bind
+		umask = os.umask(0o077)
+		try:
+			server = await asyncio.start_unix_server(self.handle, path=str(path), limit=LINE_LIMIT)
+		finally:
+			os.umask(umask)
+		watcher = asyncio.ensure_future(self._watch_idle()) if self.idle_timeout > 0 else None
+		try:
+			await self._stop.wait()
+		finally:
+			if watcher:
+				watcher.cancel()
+			server.close()
+			await server.wait_closed()
+			try:
+				path.unlink()
+			except OSError:
+				pass
+			from providers.http_pool import aclose_http_clients
+			await aclose_http_clients()
+
+def run_daemon():
+	"""Run the daemon in the foreground until it is stopped or goes idle."""
+	idle_timeout = float(settings.get('DAEMON_IDLE_TIMEOUT', 1800) or 0)
+	asyncio.run(DaemonServer(idle_timeout).serve(socket_path()))
@@ -0,0 +1,142 @@
+# Review findings stored per diff hunk, so hunks that did not change are not reviewed again
+import re
+from typing import Dict, List, Optional, Tuple
+from core.cache import ResponseCache
+from core.config import settings
+from utils.diff import FileDiff, parse_diff
+
+_HUNK_RANGE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+class Hunk:
+	"""One hunk of a file diff (or a file diff without hunks, such as a binary file or a rename)."""
+
+	def __init__(self, file: FileDiff, lines: List[str]):
+		self.file = file
+		self.lines = lines
+		self.label = file.path
+		m = _HUNK_RANGE.match(lines[0]) if lines else None
+		if m:
+			start, count = int(m.group(1)), int(m.group(2) or 1)
+			self.label = f"{file.path}:{start}-{start + count - 1}" if count else f"{file.path}:{start}"
+
+	def content(self) -> Dict[str, object]:
+		"""What the findings depend on: the path and the hunk's changed and context lines.
+		Line numbers are left out, so a hunk that only moved keeps its findings."""
+		return {'path': self.file.path, 'lines': [line.rstrip() for line in self.lines[1:]] or self.file.header}
+
+def split_hunks(diff: str) -> List[Hunk]:
+	hunks = []
+	for file in parse_diff(diff):
+		hunks.extend(Hunk(file, lines) for lines in file.hunks or [[]])
+	return hunks
+
+def hunks_diff(hunks: List[Hunk]) -> str:
+	"""A diff of just these hunks, each under its file's header."""
+	lines: List[str] = []
+	current = None
+	for hunk in hunks:
+		if hunk.file is not current:
+			current = hunk.file
+			lines.extend(current.header)
+		lines.extend(hunk.lines)
+	return '\n'.join(lines)
+
+def label_hunks(diff: str) -> str:
+	"""Put each hunk's `### path:start-end` label above it, for the model to file its findings under."""
+	files = parse_diff(diff)
+	if not files:
+		return diff
+	lines: List[str] = []
+	for file in files:
+		lines.extend(file.header)
+		for hunk_lines in file.hunks or [[]]:
+			lines.append(f"### {Hunk(file, hunk_lines).label}")
+			lines.extend(hunk_lines)
+	return '\n'.join(lines)
+
+HUNK_SECTION_INSTRUCTIONS = (
+	"Organize the review by hunk. For each hunk, in the order given, write its label line exactly as it "
+	"appears above the hunk in the diff (`### path:start-end`), followed by that hunk's findings as bullets, "
+	"each tagged with its severity; write `- No findings.` under a hunk without any. Put anything that is "
+	"not about a single hunk after all hunks, under `## Summary`."
+)
+
+def _heading(line: str) -> Optional[Tuple[int, str]]:
+	stripped = line.strip()
+	level = len(stripped) - len(stripped.lstrip('#'))
+	if not level:
+		return None
+	return level, stripped[level:].strip().strip('*`').rstrip(':').strip()
+
+def split_findings(review: str, labels: List[str]) -> Tuple[Dict[str, str], str]:
+	"""
+	Split a review written per hunk (see HUNK_SECTION_INSTRUCTIONS) into findings by label.
+	Text that is not under a hunk's label (an introduction, the summary) is returned separately.
+	"""
+	known = set(labels)
+	sections: Dict[str, List[str]] = {}
+	other: List[str] = []
+	current: Optional[List[str]] = None
+	for line in review.split('\n'):
+		heading = _heading(line)
+		if heading and heading[1] in known:
+			current = sections.setdefault(heading[1], [])
+			continue
+		if heading and heading[0] <= 3:
+			# Any other heading at the hunk labels' level or above ends the hunk's section
+			current = None
+		(current if current is not None else other).append(line)
+	return {label: '\n'.join(body).strip() for label, body in sections.items()}, '\n'.join(other).strip()
+
+class FindingStore(ResponseCache):
+	"""
+	Findings per hunk, keyed by the hunk's content (path and lines, not line numbers), the provider,
+	model, review type and minimum severity. Shares the response cache's expiry and size settings.
+	"""
+
+	def __init__(self, provider: str, model: Optional[str], review_type: str, severity: str):
+		super().__init__(settings.get_cache_dir() / 'findings')
+		self.provider = provider
+		self.model = model
+		self.params = {'review': review_type, 'severity': severity}
+
+	def key(self, hunk: Hunk) -> str:
+		return self.make_key(self.provider, self.model, hunk.content(), self.params)
+
+	def _record(self, counter: str):
+		pass  # Reuse is reported per review instead of in the response cache's counters
+
+	def lookup(self, hunks: List[Hunk]) -> Dict[int, str]:
+		"""Stored findings by position in `hunks`, for the hunks that have them."""
+		found = {}
+		for i, hunk in enumerate(hunks):
+			findings = self.get(self.key(hunk))
+			if findings is not None:
+				found[i] = findings
+		return found
+
+	def store(self, findings: Dict[Hunk, str]):
+		for hunk, text in findings.items():
+			self._write(self.key(hunk), text)
+		if findings:
+			self._evict()
+
+def clear_findings() -> int:
+	"""Delete all stored findings. Returns the number of entries removed."""
+	return ResponseCache(settings.get_cache_dir() / 'findings').clear()
+
+def findings_enabled() -> bool:
+	return str(settings.get('REVIEW_REUSE_FINDINGS', 'true')).lower() == 'true'
+
+def assemble_report(hunks: List[Hunk], findings: Dict[int, str], reused: Dict[int, str], notes: str) -> str:
+	"""The review for every hunk in diff order, stored findings marked as such, then the other notes."""
+	sections = []
+	for i, hunk in enumerate(hunks):
+		if i in reused:
+			sections.append(f"### {hunk.label} (unchanged since an earlier review)\n\n{reused[i]}")
+		elif i in findings:
+			sections.append(f"### {hunk.label}\n\n{findings[i]}")
+	summary = f"Reviewed {len(hunks) - len(reused)} changed hunk(s); reused findings for {len(reused)} unchanged hunk(s)."
+	if notes:
+		return '\n\n'.join(sections + [notes, summary])
+	return '\n\n'.join(sections + ['## Summary\n\n' + summary])
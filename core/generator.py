@@ -1,4 +1,57 @@
-# Commit message generator logic will go here
+# Commit message generation shared by the commit and reword commands
+import re
+from typing import Dict, List, Optional, Tuple
 from core.config import settings
+from core.budget import prefilter_diff
+from core.cache import cached_generate
+from utils import clean_commit_message
 
-# Future: Implement functions/classes for commit message generation using settings
+COMMIT_SYSTEM_PROMPT = (
+	"You are an expert Git commit assistant. When responding, return only the commit message text itself—no extra explanation, quotes, or formatting. "
+	"First, inspect the current Git branch name. If it begins with a ticket code matching the pattern LETTERS-DIGITS (for example ABC-123 or EL-2024), capture that exact code and place it at the very start of your message, followed by a colon and a space. If no ticket code is present, do not include any prefix. "
+	"Next, identify the primary change or task implied by the branch name and present it as the first action in your commit message. Then, describe any secondary updates, fixes, or refactoring included in this commit. "
+	"Use a natural, professional tone that reads like a teammate clearly explaining the work you’ve done. Use bullet points to separate multiple actions if they exist."
+)
+
+def get_ticket_prefix(branch):
+	m = re.match(r'^([A-Za-z]+-\d+)', branch)
+	return m.group(1) if m else ''
+
+def is_one_line() -> bool:
+	return settings.get('COMMIT_FORMAT', 'detailed') == 'one-line'
+
+def prompt_text(messages: List[Dict[str, str]]) -> str:
+	"""Flatten chat messages into a single prompt, for providers without a chat API and for size estimates."""
+	return '\n\n'.join(m['content'] for m in messages)
+
+def build_commit_prompt(diff: str, branch: str, short: bool, dropped: Optional[List[Tuple[str, str]]] = None) -> Tuple[str, List[Dict[str, str]]]:
+	"""
+	Return the prompt text and the chat messages for a commit message request.
+	The instructions and the diff come first and are marked cacheable, so a repeated request for the
+	same changes (e.g. from a hook, then from `git-ai commit`) can reuse the provider's prompt cache;
+	the branch and format come last.
+	"""
+	changes = f"Changes:\n\n{diff}"
+	if dropped:
+		changes += "\n\nAlso changed (diff omitted):\n" + '\n'.join(f"- {path}" for path, _ in dropped)
+	messages = [
+		{"role": "system", "content": COMMIT_SYSTEM_PROMPT, "cache": True},
+		{"role": "user", "content": changes, "cache": True},
+		{"role": "user", "content": f"Branch: {branch}\nWrite a {'one-line' if short else 'detailed, human-friendly'} commit message for the changes above."},
+	]
+	return prompt_text(messages), messages
+
+def finish_commit_message(raw: str, branch: str) -> str:
+	"""Clean up a generated message and make sure it starts with the branch's ticket code."""
+	commit_msg = clean_commit_message(raw)
+	prefix = get_ticket_prefix(branch)
+	if prefix and not commit_msg.startswith(prefix):
+		commit_msg = f"{prefix}: {commit_msg}"
+	return commit_msg
+
+def generate_commit_message(provider, diff: str, branch: str, short: Optional[bool] = None, use_cache: bool = True) -> str:
+	"""Filter the diff, ask the provider for a commit message and clean it up."""
+	diff, dropped = prefilter_diff(diff)
+	prompt, messages = build_commit_prompt(diff, branch, is_one_line() if short is None else short, dropped)
+	raw = cached_generate(provider, prompt=prompt, use_cache=use_cache, messages=messages)
+	return finish_commit_message(raw, branch)
@@ -0,0 +1,119 @@
+# On-disk cache of provider model lists, and listing models from several providers at once
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from core.config import settings
+from utils.aio import get_loop, run_sync
+
+class ModelListCache:
+	"""
+	Stores each provider's model list on disk, keyed by the provider, its endpoint and a hash of
+	its API key (accounts can see different models). Entries expire after `ttl` seconds.
+	"""
+
+	def __init__(self, directory: Optional[Path] = None, ttl: Optional[float] = None):
+		self.directory = Path(directory) if directory else settings.get_cache_dir() / 'models'
+		self.ttl = float(ttl if ttl is not None else settings.get('MODELS_CACHE_TTL', 86400))
+
+	@staticmethod
+	def make_key(provider: str) -> str:
+		api_key = settings.get_provider_option('API_KEY', provider, '') or ''
+		payload = json.dumps({
+			'provider': provider,
+			'host': settings.get_provider_option('HOST', provider),
+			'api_key': hashlib.sha256(api_key.encode('utf-8')).hexdigest() if api_key else None,
+		}, sort_keys=True)
+		return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+	def _path(self, provider: str) -> Path:
+		return self.directory / f"{provider}-{self.make_key(provider)[:16]}.json"
+
+	def get(self, provider: str) -> Optional[Dict[str, Any]]:
+		"""Return {'models', 'age'} for provider, or None if nothing fresh is cached."""
+		try:
+			with open(self._path(provider), 'r', encoding='utf-8') as f:
+				entry = json.load(f)
+		except (OSError, ValueError):
+			return None
+		age = time.time() - entry.get('created', 0)
+		if age > self.ttl or not isinstance(entry.get('models'), list):
+			return None
+		return {'models': entry['models'], 'age': age}
+
+	def set(self, provider: str, models: List[str]):
+		path = self._path(provider)
+		try:
+			path.parent.mkdir(parents=True, exist_ok=True)
+			fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+			with os.fdopen(fd, 'w', encoding='utf-8') as f:
+				json.dump({'created': time.time(), 'models': models}, f)
+			os.replace(tmp, path)
+		except OSError:
+			pass
+
+	def clear(self) -> int:
+		"""Delete all cached model lists. Returns the number removed."""
+		removed = 0
+		for path in self.directory.glob('*.json') if self.directory.exists() else []:
+			try:
+				path.unlink()
+				removed += 1
+			except OSError:
+				pass
+		return removed
+
+def _create_provider(name: str):
+	from providers.factory import get_provider
+	return get_provider(name)
+
+async def afetch_models(name: str, refresh: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+	"""
+	List a provider's models, from the cache unless `refresh` is set or the entry has expired.
+	Never raises: returns {'provider', 'models', 'cached_age', 'seconds', 'error'}, where
+	cached_age is None for a live answer and error is None on success.
+	"""
+	result = {'provider': name, 'models': [], 'cached_age': None, 'seconds': 0.0, 'error': None}
+	cache = ModelListCache()
+	if not refresh:
+		cached = cache.get(name)
+		if cached is not None:
+			result.update(models=cached['models'], cached_age=cached['age'])
+			return result
+
+	async def fetch():
+		# Creating a provider imports its SDK, which can take a while; keep the loop free meanwhile
+		provider = await asyncio.get_running_loop().run_in_executor(None, _create_provider, name)
+		return await provider.alist_models()
+
+	start = time.monotonic()
+	try:
+		models = await asyncio.wait_for(fetch(), timeout)
+	except asyncio.TimeoutError:
+		result['error'] = f"no answer within {timeout:g}s"
+	except Exception as e:
+		result['error'] = str(e) or type(e).__name__
+	else:
+		result['models'] = list(models)
+		cache.set(name, result['models'])
+	result['seconds'] = time.monotonic() - start
+	return result
+
+def fetch_models(name: str, refresh: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+	"""Blocking version of afetch_models()."""
+	return run_sync(afetch_models(name, refresh, timeout))
+
+def fetch_all_models(names: List[str], refresh: bool = False, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+	"""Query several providers concurrently; results are in the order of `names`."""
+	async def gather():
+		return await asyncio.gather(*(afetch_models(name, refresh, timeout) for name in names))
+	return run_sync(gather())
+
+def prefetch_models(name: str, timeout: Optional[float] = None) -> 'concurrent.futures.Future':
+	"""Start listing a provider's models in the background; the future holds the afetch_models() result."""
+	return asyncio.run_coroutine_threadsafe(afetch_models(name, timeout=timeout), get_loop())
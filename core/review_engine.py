@@ -0,0 +1,200 @@
+# Map-reduce review engine: split a diff into chunks, review them in parallel, merge the findings
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional
+from core.config import settings
+from utils.diff import FileDiff, parse_diff, estimate_tokens
+
+# Approximate context windows (in tokens) by model name prefix; first match wins
+MODEL_CONTEXT_TOKENS = [
+	('gpt-4o', 128000),
+	('gpt-4.1', 1000000),
+	('gpt-4-turbo', 128000),
+	('gpt-4', 8192),
+	('gpt-3.5', 16385),
+	('o1', 128000),
+	('o3', 200000),
+	('openai/gpt-oss', 128000),
+	('claude', 200000),
+	('gemini-1.5', 1000000),
+	('gemini', 32000),
+	('deepseek', 64000),
+	('llama3', 8192),
+]
+DEFAULT_CONTEXT_TOKENS = 8192
+
+def get_context_tokens(model: Optional[str]) -> int:
+	"""Return the approximate context window for a model name."""
+	name = (model or '').lower()
+	for prefix, tokens in MODEL_CONTEXT_TOKENS:
+		if name.startswith(prefix):
+			return tokens
+	return DEFAULT_CONTEXT_TOKENS
+
+def get_chunk_budget(model: Optional[str]) -> int:
+	"""Tokens of diff per chunk: the configured budget, capped at half the model context."""
+	configured = int(settings.get('REVIEW_CHUNK_TOKENS', 12000))
+	return max(512, min(configured, get_context_tokens(model) // 2))
+
+class ReviewChunk:
+	"""A slice of a diff small enough to be reviewed in a single provider call."""
+
+	def __init__(self, index: int = 0):
+		self.index = index
+		self.total = 1
+		self.paths: List[str] = []
+		self.parts: List[str] = []
+		self.tokens = 0
+
+	def add(self, path: str, text: str):
+		if path not in self.paths:
+			self.paths.append(path)
+		self.parts.append(text)
+		self.tokens += estimate_tokens(text)
+
+	@property
+	def diff(self) -> str:
+		return '\n'.join(self.parts)
+
+	@property
+	def label(self) -> str:
+		return f"Part {self.index + 1} of {self.total} ({', '.join(self.paths)})"
+
+class ChunkResult:
+	def __init__(self, chunk: ReviewChunk, output: str = '', error: Optional[Exception] = None):
+		self.chunk = chunk
+		self.output = output
+		self.error = error
+
+def _split_lines(header: str, lines: List[str], max_tokens: int) -> List[str]:
+	"""Split an oversized hunk into pieces that each fit max_tokens, repeating the header."""
+	pieces, current, size = [], [], estimate_tokens(header)
+	for line in lines:
+		cost = estimate_tokens(line)
+		if current and size + cost > max_tokens:
+			pieces.append('\n'.join([header] + current))
+			current, size = [], estimate_tokens(header)
+		current.append(line)
+		size += cost
+	if current:
+		pieces.append('\n'.join([header] + current))
+	return pieces
+
+def _file_pieces(file: FileDiff, max_tokens: int) -> List[str]:
+	"""Return the file diff as one piece, or per-hunk pieces if it is too large."""
+	if estimate_tokens(file.text) <= max_tokens:
+		return [file.text]
+	header = '\n'.join(file.header)
+	pieces = []
+	for hunk in file.hunks:
+		text = '\n'.join([header] + hunk)
+		if estimate_tokens(text) <= max_tokens:
+			pieces.append(text)
+		else:
+			pieces.extend(_split_lines(header + '\n' + hunk[0], hunk[1:], max_tokens))
+	return pieces or [header]
+
+def plan_chunks(diff: str, max_tokens: int) -> List[ReviewChunk]:
+	"""Pack whole files (or, for large files, individual hunks) into chunks of at most max_tokens."""
+	chunks: List[ReviewChunk] = []
+	current = ReviewChunk()
+	for file in parse_diff(diff):
+		for piece in _file_pieces(file, max_tokens):
+			cost = estimate_tokens(piece)
+			if current.parts and current.tokens + cost > max_tokens:
+				chunks.append(current)
+				current = ReviewChunk(len(chunks))
+			current.add(file.path, piece)
+	if current.parts:
+		chunks.append(current)
+	if not chunks and diff.strip():
+		# Not a git-style diff; review it as a single piece
+		current.add('', diff)
+		chunks.append(current)
+	for chunk in chunks:
+		chunk.total = len(chunks)
+	return chunks
+
+class ReviewEngine:
+	"""
+	Reviews a diff by fanning chunks out to the provider over a bounded thread pool.
+	`build_prompt` turns a chunk into a prompt (text or chat messages); `generate` takes that
+	prompt and returns the model output.
+	"""
+
+	def __init__(self, generate: Callable[[Any], str], max_chunk_tokens: int = 12000, max_workers: Optional[int] = None):
+		self.generate = generate
+		self.max_chunk_tokens = max_chunk_tokens
+		self.max_workers = max_workers or int(settings.get('REVIEW_WORKERS', 4))
+
+	def run(self, diff: str, build_prompt: Callable[[ReviewChunk], Any],
+			on_result: Optional[Callable[[ChunkResult], None]] = None) -> List[ChunkResult]:
+		"""Review every chunk of diff and return results in chunk order."""
+		return self.run_chunks(plan_chunks(diff, self.max_chunk_tokens), build_prompt, on_result)
+
+	def run_chunks(self, chunks: List[ReviewChunk], build_prompt: Callable[[ReviewChunk], Any],
+			on_result: Optional[Callable[[ChunkResult], None]] = None) -> List[ChunkResult]:
+		"""Review already planned chunks (of one diff or several) and return results in list order."""
+		if not chunks:
+			return []
+		results: List[Optional[ChunkResult]] = [None] * len(chunks)
+
+		def review(chunk: ReviewChunk) -> ChunkResult:
+			try:
+				return ChunkResult(chunk, self.generate(build_prompt(chunk)))
+			except Exception as e:
+				return ChunkResult(chunk, error=e)
+
+		if len(chunks) == 1:
+			results[0] = review(chunks[0])
+			if on_result:
+				on_result(results[0])
+			return results
+
+		with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+			futures = {pool.submit(review, chunk): i for i, chunk in enumerate(chunks)}
+			for future in as_completed(futures):
+				result = future.result()
+				results[futures[future]] = result
+				if on_result:
+					on_result(result)
+		return results
+
+# Severity levels the review prompt asks for, most severe first, and the emoji it pairs them with
+SEVERITIES = ['critical', 'high', 'medium', 'low', 'info']
+_SEVERITY_MARKERS = re.compile(r'\b(CRITICAL|HIGH|MEDIUM|LOW|INFO)\b|(🔴|🟠|🟡|🔵)')
+_EMOJI_SEVERITY = {'🔴': 'critical', '🟠': 'high', '🟡': 'medium', '🔵': 'low'}
+
+# Summary lines that count a level without reporting one ("CRITICAL: 0", "No HIGH issues")
+_NO_FINDINGS = re.compile(r'[:\-]\s*(0|none|zero)\b|\bno\s+(critical|high|medium|low)\b', re.IGNORECASE)
+
+def highest_severity(review: str) -> Optional[str]:
+	"""The most severe level a review labels a finding with, or None if it labels none."""
+	best = len(SEVERITIES)
+	for line in review.splitlines():
+		markers = _SEVERITY_MARKERS.findall(line)
+		if not markers or _NO_FINDINGS.search(line):
+			continue
+		for word, emoji in markers:
+			best = min(best, SEVERITIES.index(word.lower() if word else _EMOJI_SEVERITY[emoji]))
+		if best == 0:
+			break
+	return SEVERITIES[best] if best < len(SEVERITIES) else None
+
+def merge_results(results: List[ChunkResult]) -> str:
+	"""Merge per-chunk findings into a single report, in diff order."""
+	if len(results) == 1 and not results[0].error:
+		return results[0].output
+	sections = []
+	for result in results:
+		if result.error:
+			body = f"ERROR: review of this part failed: {result.error}"
+		else:
+			body = result.output.strip()
+		sections.append(f"## {result.chunk.label}\n\n{body}")
+	failed = sum(1 for r in results if r.error)
+	files = sum(len(r.chunk.paths) for r in results)
+	summary = f"## Summary\n\nReviewed {files} file section(s) in {len(results)} part(s)"
+	if failed:
+		summary += f"; {failed} part(s) failed"
+	return '\n\n'.join(sections + [summary + '.'])
@@ -1,4 +1,48 @@
-# Session management logic will go here
-from core.config import settings
+# Per-command session: provider setup and other preparation running alongside git
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+from utils.profiling import span
 
-# Future: Implement session state, history, or context using settings
+class CommandSession:
+	"""
+	Runs the independent parts of a command side by side. The provider (SDK import and client
+	setup, then a model preload for local servers) is created on a worker thread as soon as the
+	session starts, while the command runs git; other preparation, such as loading repository
+	context, can be submitted alongside. The command only waits for the provider once its
+	prompt is ready. Workers are daemon threads, so a command that ends early (nothing to
+	commit) does not wait for an SDK import it no longer needs.
+	"""
+
+	def __init__(self, provider_name: str):
+		self.provider_name = provider_name
+		self._provider = self.submit(self._create_provider)
+
+	def _create_provider(self):
+		from providers.factory import get_hedged_provider, preload_model
+		provider = get_hedged_provider(self.provider_name)
+		preload_model(self.provider_name, provider)
+		return provider
+
+	@property
+	def provider(self):
+		"""The provider for this command; raises whatever creating it raised."""
+		if not self._provider.done():
+			with span('session.wait-provider'):
+				return self._provider.result()
+		return self._provider.result()
+
+	@staticmethod
+	def submit(fn: Callable[..., Any], *args, **kwargs) -> Future:
+		"""Run fn on a worker thread; the returned future holds its result."""
+		future: Future = Future()
+
+		def run():
+			if future.set_running_or_notify_cancel():
+				try:
+					future.set_result(fn(*args, **kwargs))
+				except BaseException as e:
+					future.set_exception(e)
+
+		threading.Thread(target=run, name='git-ai-session', daemon=True).start()
+		return future
@@ -1,14 +1,40 @@
+import os
 import sys
-from cli.parser import get_main_parser, COMMANDS
+import time
+_START = time.perf_counter()
+_BASE_MODULES = set(sys.modules)
+_command_start = _START
+
+from cli.parser import get_main_parser, COMMANDS, NO_CONFIG_COMMANDS
 from utils import Colors
 from pathlib import Path
 from core.config import settings
+from utils import profiling
+
+def _is_stdlib(name):
+    module = sys.modules.get(name)
+    path = getattr(module, '__file__', None)
+    if not path:
+        return True  # builtin or namespace module
+    import sysconfig
+    return path.startswith(sysconfig.get_paths()['stdlib']) and 'site-packages' not in path
+
+def print_import_report():
+    """Print which non-stdlib packages were imported during this run and how long it took."""
+    from providers.factory import get_import_times
+    new_modules = set(sys.modules) - _BASE_MODULES
+    loaded = sorted({name.split('.')[0] for name in new_modules if not _is_stdlib(name.split('.')[0])})
+    print(Colors.header("\n⏱  Import report"))
+    print(Colors.info(f"  Startup: {(_command_start - _START) * 1000:.1f} ms, total: {(time.perf_counter() - _START) * 1000:.1f} ms"))
+    for provider, seconds in get_import_times().items():
+        print(Colors.dim(f"  provider '{provider}' imported in {seconds * 1000:.1f} ms"))
+    print(Colors.dim(f"  Top-level packages loaded ({len(loaded)}): {', '.join(loaded)}"))
 
 def main():
     parser = get_main_parser()
     args, unknown = parser.parse_known_args()
     config_is_valid = settings.config_is_valid()
-    if args.command != 'config' and (not config_is_valid):
+    if args.command not in NO_CONFIG_COMMANDS and (not config_is_valid):
         print(Colors.error("❌ No configuration file found."))
         print(Colors.info("Let's set it up now. You can change these settings later by running: 'git-ai config --interactive'"))
         cmd_func = COMMANDS['config']
@@ -17,7 +43,24 @@ def main():
         return
     cmd_func = COMMANDS[args.command]
     sys.argv = [sys.argv[0]] + unknown
-    cmd_func()
+    global _command_start
+    _command_start = time.perf_counter()
+    # The environment variables reach runs started by git hooks
+    show_profile = args.profile or os.environ.get('GIT_AI_PROFILE', '').lower() in ('1', 'true', 'yes')
+    trace_file = args.trace_file or os.environ.get('GIT_AI_TRACE_FILE')
+    if show_profile or trace_file:
+        profiling.enable(origin=_START, memory=os.environ.get('GIT_AI_PROFILE_MEMORY', '').lower() not in ('0', 'false', 'no'))
+        profiling.add_span('startup', _START, _command_start)
+    try:
+        with profiling.span('command', command=args.command):
+            cmd_func()
+    finally:
+        if args.import_time:
+            print_import_report()
+        if show_profile:
+            profiling.print_report()
+        if trace_file:
+            profiling.write_trace(trace_file)
 
 if __name__ == "__main__":
     main()
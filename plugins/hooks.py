@@ -1,21 +1,42 @@
 # Plugin hook management for git-ai
 import os
+import shlex
 import stat
+import subprocess
+import sys
+import tempfile
+import time
 from pathlib import Path
+from typing import Optional
 from core.config import settings
-from utils import Colors
+from core.daemon import self_command
+from utils import Colors, get_repo
 
+# {command} is replaced with the command line of this git-ai installation when the hook is installed.
+# The pre-commit hook only starts generating in the background, so neither hook can block a commit on errors.
 HOOK_TEMPLATES = {
-	'pre-commit': """#!/bin/sh\n# git-ai pre-commit hook\npython git-ai.py --hook pre-commit\n""",
-	'commit-msg': """#!/bin/sh\n# git-ai commit-msg hook\npython git-ai.py --hook commit-msg "$1"\n"""
+	'pre-commit': """#!/bin/sh\n# git-ai pre-commit hook\n{command} hook pre-commit || true\n""",
+	'commit-msg': """#!/bin/sh\n# git-ai commit-msg hook\n{command} hook commit-msg "$1" || true\n"""
 }
 
+# Tree of an empty repository, used as the diff base before the first commit
+EMPTY_TREE = '4b825dc642cb6eb9a060e54bf8d69288fbee4904'
+PREFETCH_DIR = 'git-ai-prefetch'
+# Prefetched messages and markers older than this are removed
+PREFETCH_MAX_AGE = 24 * 3600
+
+def hook_command() -> str:
+	"""Shell-quoted command line that runs this git-ai installation from a hook script."""
+	return ' '.join(shlex.quote(Path(part).as_posix() if i < 2 else part) for i, part in enumerate(self_command()))
+
 def get_git_hooks_dir(repo_path: Path = Path.cwd()) -> Path:
-    
-	git_dir = repo_path / '.git'
-	if not git_dir.exists():
-		raise RuntimeError(f"No .git directory found in {repo_path}")
-	return git_dir / 'hooks'
+	"""Hooks directory of the repository (respects core.hooksPath and linked worktrees)."""
+	try:
+		repo = get_repo(repo_path)
+		hooks = repo.run(['rev-parse', '--git-path', 'hooks'])
+	except subprocess.CalledProcessError:
+		raise RuntimeError(f"No git repository found in {repo_path}")
+	return Path(repo.root) / hooks
 
 def install_hook(hook_name: str, repo_path: Path = Path.cwd()):
 	hooks_dir = get_git_hooks_dir(repo_path)
@@ -25,7 +46,7 @@ def install_hook(hook_name: str, repo_path: Path = Path.cwd()):
 	if not script:
 		raise ValueError(f"Unknown hook: {hook_name}")
 	with open(hook_path, 'w') as f:
-		f.write(script)
+		f.write(script.format(command=hook_command()))
 	os.chmod(hook_path, os.stat(hook_path).st_mode | stat.S_IEXEC)
 
 def remove_hook(hook_name: str, repo_path: Path = Path.cwd()):
@@ -48,6 +69,104 @@ def disable_hooks(repo_path: Path = Path.cwd()):
 def is_hook_enabled() -> bool:
 	return settings.get('HOOKS_ENABLED', 'false').lower() == 'true'
 
+# ---- Message prefetch ----
+# pre-commit starts generating a message for the staged tree in a background process;
+# commit-msg picks it up if the tree is unchanged, waiting for it if it is still running.
+
+def _prefetch_dir(repo) -> Path:
+	return Path(repo.git_dir) / PREFETCH_DIR
+
+def _write_atomic(path: Path, text: str):
+	fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+	with os.fdopen(fd, 'w', encoding='utf-8') as f:
+		f.write(text)
+	os.replace(tmp, path)
+
+def _cleanup_prefetch(directory: Path):
+	cutoff = time.time() - PREFETCH_MAX_AGE
+	for entry in directory.iterdir():
+		try:
+			if entry.stat().st_mtime < cutoff:
+				entry.unlink()
+		except OSError:
+			pass
+
+def generate_for_tree(repo, tree: str) -> str:
+	"""Generate a commit message for the changes between HEAD and a tree."""
+	from core.generator import generate_commit_message
+	from core.session import CommandSession
+	session = CommandSession(settings.get_provider())
+	diff = repo.run_bytes(['diff', repo.head or EMPTY_TREE, tree]).decode('utf-8', 'replace').strip()
+	if not diff:
+		return ''
+	return generate_commit_message(session.provider, diff, repo.branch)
+
+def start_prefetch(repo_path=None) -> Optional[str]:
+	"""From pre-commit: start generating the message for the index tree in the background."""
+	if str(settings.get('HOOK_PREFETCH', 'true')).lower() != 'true' or not settings.config_is_valid():
+		return None
+	repo = get_repo(repo_path)
+	tree = repo.run(['write-tree'])  # Honours GIT_INDEX_FILE, e.g. for `git commit -a`
+	directory = _prefetch_dir(repo)
+	directory.mkdir(exist_ok=True)
+	_cleanup_prefetch(directory)
+	if (directory / f'{tree}.msg').exists() or (directory / f'{tree}.pending').exists():
+		return tree
+	_write_atomic(directory / f'{tree}.pending', str(time.time()))
+	# The temporary index git uses during the commit may be gone by the time the child reads it
+	env = {k: v for k, v in os.environ.items() if k != 'GIT_INDEX_FILE'}
+	kwargs = {'start_new_session': True} if os.name != 'nt' else {'creationflags': subprocess.DETACHED_PROCESS}
+	with open(directory / 'prefetch.log', 'ab') as log:
+		subprocess.Popen(
+			self_command('hook', 'prefetch', tree), cwd=repo.root, env=env,
+			stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, close_fds=True, **kwargs
+		)
+	return tree
+
+def run_prefetch(tree: str, repo_path=None):
+	"""Background half of start_prefetch(): generate and store the message for a tree."""
+	repo = get_repo(repo_path)
+	directory = _prefetch_dir(repo)
+	try:
+		message = generate_for_tree(repo, tree)
+		if message:
+			_write_atomic(directory / f'{tree}.msg', message)
+	finally:
+		try:
+			(directory / f'{tree}.pending').unlink()
+		except OSError:
+			pass
+
+def _has_message(text: str) -> bool:
+	return any(line.strip() and not line.startswith('#') for line in text.splitlines())
+
+def fill_commit_message(message_file: str, repo_path=None) -> bool:
+	"""
+	From commit-msg: if the user left the message empty, fill in the prefetched message for
+	the tree being committed, waiting up to HOOK_WAIT seconds for it, or generate one now.
+	"""
+	path = Path(message_file)
+	text = path.read_text(encoding='utf-8') if path.exists() else ''
+	if _has_message(text) or not settings.config_is_valid():
+		return False
+	repo = get_repo(repo_path)
+	tree = repo.run(['write-tree'])
+	directory = _prefetch_dir(repo)
+	ready, pending = directory / f'{tree}.msg', directory / f'{tree}.pending'
+	deadline = time.monotonic() + float(settings.get('HOOK_WAIT', 30) or 0)
+	while not ready.exists() and pending.exists() and time.monotonic() < deadline:
+		time.sleep(0.1)
+	if ready.exists():
+		message = ready.read_text(encoding='utf-8')
+		ready.unlink()
+	else:
+		print(Colors.dim("git-ai: no prefetched message for this tree, generating one now..."), file=sys.stderr)
+		message = generate_for_tree(repo, tree)
+	if not message:
+		return False
+	path.write_text(message.rstrip('\n') + '\n' + text, encoding='utf-8')
+	return True
+
 # Example usage:
 
 if __name__ == "__main__":
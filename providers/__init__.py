@@ -1,8 +1,18 @@
-from .openai_provider import OpenAIProvider
-from .ollama_provider import OllamaProvider
-from .anthropic_provider import AnthropicProvider
-from .gemini_provider import GeminiProvider
-from .lmstudio_provider import LMStudioProvider
-from .groq_provider import GroqProvider
-from .deepseek_provider import DeepseekProvider
-from .factory import get_provider
+from .factory import get_provider, get_provider_class, available_providers, register_provider
+
+# Provider classes are exposed lazily so importing the package does not pull in
+# every SDK; `from providers import OpenAIProvider` still works.
+_LAZY_CLASSES = {
+	'OpenAIProvider': 'openai',
+	'OllamaProvider': 'ollama',
+	'AnthropicProvider': 'anthropic',
+	'GeminiProvider': 'gemini',
+	'LMStudioProvider': 'lmstudio',
+	'GroqProvider': 'groq',
+	'DeepseekProvider': 'deepseek',
+}
+
+def __getattr__(name):
+	if name in _LAZY_CLASSES:
+		return get_provider_class(_LAZY_CLASSES[name])
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,24 +3,62 @@ from .base import ProviderBase
 from core.config import settings
 import anthropic
 
+DEFAULT_MAX_TOKENS = 4096
+MAX_CACHE_BREAKPOINTS = 4
+
 class AnthropicProvider(ProviderBase):
 	def __init__(self, api_key: str = None, model: str = None, **kwargs):
 		# Prefer explicit args, then provider config, then fallback
 		self.api_key = api_key or settings.get_provider_option('API_KEY', 'anthropic', '')
 		self.model = model or settings.get_provider_option('MODEL', 'anthropic', 'claude-3-opus-20240229')
-		self.client = anthropic.Anthropic(api_key=self.api_key)
+		# Retries and backoff are handled by providers.scheduler, with budgets shared across requests
+		self.client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0)
+
+	@staticmethod
+	def _content(message):
+		"""Message content as text blocks, with a cache breakpoint after messages marked `cache`."""
+		block = {'type': 'text', 'text': message['content']}
+		if message.get('cache'):
+			block['cache_control'] = {'type': 'ephemeral'}
+		return block
 
-	def generate(self, prompt: str, **kwargs):
-		messages = kwargs.get('messages')
+	def _request(self, prompt: str, **kwargs):
+		"""Build messages.create() arguments; the Messages API takes the system prompt separately."""
+		messages = kwargs.pop('messages', None)
 		if not messages:
 			messages = [{"role": "user", "content": prompt}]
-		response = self.client.messages.create(
-			model=self.model,
-			messages=messages,
-			**{k: v for k, v in kwargs.items() if k != 'messages'}
-		)
+		# Breakpoints beyond the API limit are dropped from the front, keeping the longest prefixes
+		marked = [i for i, m in enumerate(messages) if m.get('cache')]
+		drop = set(marked[:-MAX_CACHE_BREAKPOINTS])
+		messages = [dict(m, cache=False) if i in drop else m for i, m in enumerate(messages)]
+		system = [self._content(m) for m in messages if m['role'] == 'system']
+		request = {
+			'model': self.model,
+			'messages': [{'role': m['role'], 'content': [self._content(m)]} for m in messages if m['role'] != 'system'],
+			'max_tokens': kwargs.pop('max_tokens', DEFAULT_MAX_TOKENS),
+			**kwargs
+		}
+		if system:
+			request['system'] = system
+		return request
+
+	def _record(self, usage):
+		# input_tokens only counts tokens after the last cache breakpoint
+		cached = getattr(usage, 'cache_read_input_tokens', 0) or 0
+		written = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+		self.record_usage(usage.input_tokens + cached + written, usage.output_tokens, cached, written)
+
+	async def agenerate(self, prompt: str, **kwargs):
+		response = await self.client.messages.create(**self._request(prompt, **kwargs))
+		self._record(response.usage)
 		return response.content[0].text.strip() if hasattr(response.content[0], 'text') else str(response.content[0])
 
-	def list_models(self):
-		models = self.client.models.list(limit=20)
+	async def astream(self, prompt: str, **kwargs):
+		async with self.client.messages.stream(**self._request(prompt, **kwargs)) as response:
+			async for text in response.text_stream:
+				yield text
+			self._record((await response.get_final_message()).usage)
+
+	async def alist_models(self):
+		models = await self.client.models.list(limit=20)
 		return [m.id for m in models.data]
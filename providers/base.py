@@ -1,15 +1,125 @@
 # Abstract base class for LLM providers
-from abc import ABC, abstractmethod
+import asyncio
+import functools
+from abc import ABC
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List
+from utils.aio import run_sync, iter_sync
+from utils import profiling
+
+USAGE_KEYS = ('requests', 'input_tokens', 'cached_tokens', 'cache_write_tokens', 'output_tokens')
+
+# When set, usage recorded by providers in this context is also added here (used by the daemon
+# to report usage per request)
+usage_sink = ContextVar('git_ai_usage_sink', default=None)
+
+def new_usage() -> Dict[str, int]:
+	return dict.fromkeys(USAGE_KEYS, 0)
+
+def add_usage(total: Dict[str, int], usage: Dict[str, int]):
+	for key in USAGE_KEYS:
+		total[key] = total.get(key, 0) + (usage.get(key) or 0)
+
+def plain_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+	"""Drop git-ai's `cache` markers for APIs that only accept role and content."""
+	return [{'role': m['role'], 'content': m['content']} for m in messages]
 
 class ProviderBase(ABC):
-	"""Base interface for all LLM providers."""
+	"""
+	Base interface for all LLM providers.
+	Providers implement the async methods (agenerate, astream, alist_models); the blocking
+	generate/stream/list_models methods run them on the shared event loop.
+	Providers that only implement the blocking methods still work: their async
+	counterparts run them in a worker thread.
+
+	Chat messages may carry `'cache': True` to mark the end of a prompt prefix that is reused
+	between requests; providers with explicit prompt caching put a cache breakpoint there.
+	Providers report token counts with record_usage(); `usage` holds the totals for the instance.
+	"""
+
+	def record_usage(self, input_tokens: int = 0, output_tokens: int = 0, cached_tokens: int = 0, cache_write_tokens: int = 0):
+		"""Record one request's token counts. input_tokens includes cached and cache-write tokens."""
+		usage = {
+			'requests': 1,
+			'input_tokens': input_tokens or 0,
+			'cached_tokens': cached_tokens or 0,
+			'cache_write_tokens': cache_write_tokens or 0,
+			'output_tokens': output_tokens or 0,
+		}
+		self.last_usage = usage
+		add_usage(self.usage, usage)
+		for key in ('input_tokens', 'cached_tokens', 'output_tokens'):
+			profiling.count(f'tokens.{key[:-len("_tokens")]}', usage[key])
+		sink = usage_sink.get()
+		if sink is not None:
+			add_usage(sink, usage)
+
+	@property
+	def usage(self) -> Dict[str, int]:
+		"""Token usage totals for all requests made through this instance."""
+		if '_usage' not in self.__dict__:
+			self._usage = new_usage()
+		return self._usage
 
-	@abstractmethod
-	def generate(self, prompt: str, **kwargs):
+	async def agenerate(self, prompt: str, **kwargs) -> str:
 		"""Generate a response from the provider."""
-		pass
+		if type(self).generate is ProviderBase.generate:
+			raise NotImplementedError(f"{type(self).__name__} must implement agenerate() or generate()")
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(None, functools.partial(self.generate, prompt, **kwargs))
 
-	@abstractmethod
-	def list_models(self):
+	async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+		"""Yield the response in pieces as the provider produces them.
+		Providers without streaming support yield the whole response at once."""
+		yield await self.agenerate(prompt, **kwargs)
+
+	async def alist_models(self) -> List[str]:
 		"""List available models for this provider."""
-		pass
+		if type(self).list_models is ProviderBase.list_models:
+			raise NotImplementedError(f"{type(self).__name__} must implement alist_models() or list_models()")
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(None, self.list_models)
+
+	async def awarm(self) -> bool:
+		"""
+		Get the model ready ahead of the first request, for providers that load models on demand
+		(local servers). Returns whether there was anything to do.
+		"""
+		return False
+
+	def generate(self, prompt: str, **kwargs) -> str:
+		"""Blocking version of agenerate()."""
+		with profiling.span('provider.generate', provider=getattr(self, 'class_name', type(self).__name__)):
+			_count_sent(prompt, kwargs)
+			result = run_sync(self.agenerate(prompt, **kwargs))
+			profiling.count('bytes.received', len((result or '').encode('utf-8')))
+			return result
+
+	def stream(self, prompt: str, **kwargs) -> Iterator[str]:
+		"""Blocking version of astream()."""
+		if not profiling.is_enabled():
+			return iter_sync(self.astream(prompt, **kwargs))
+		return self._profiled_stream(prompt, **kwargs)
+
+	def _profiled_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+		with profiling.span('provider.stream', provider=getattr(self, 'class_name', type(self).__name__)) as current:
+			_count_sent(prompt, kwargs)
+			for piece in iter_sync(self.astream(prompt, **kwargs)):
+				current.mark('first_token_ms')
+				profiling.count('bytes.received', len(piece.encode('utf-8')))
+				yield piece
+
+	def list_models(self) -> List[str]:
+		"""Blocking version of alist_models()."""
+		return run_sync(self.alist_models())
+
+	def warm(self) -> bool:
+		"""Blocking version of awarm()."""
+		return run_sync(self.awarm())
+
+def _count_sent(prompt: str, kwargs: Dict[str, Any]):
+	"""Approximate request size: the prompt, or the message contents when messages are given."""
+	if profiling.is_enabled():
+		messages = kwargs.get('messages')
+		text = ''.join(m['content'] for m in messages) if messages else (prompt or '')
+		profiling.count('bytes.sent', len(text.encode('utf-8')))
@@ -1,26 +1,120 @@
 # Provider factory for LLM providers
+import importlib
+import time
+from typing import Dict, List, Optional, Type
 from .base import ProviderBase
-from .openai_provider import OpenAIProvider
-from .anthropic_provider import AnthropicProvider
-from .ollama_provider import OllamaProvider
-from .gemini_provider import GeminiProvider
-from .lmstudio_provider import LMStudioProvider
-from .groq_provider import GroqProvider
-from .deepseek_provider import DeepseekProvider
-
-_PROVIDER_MAP = {
-	'openai': OpenAIProvider,
-	'anthropic': AnthropicProvider,
-	'ollama': OllamaProvider,
-    'gemini': GeminiProvider,
-    'lmstudio': LMStudioProvider,
-    'groq': GroqProvider,
-    'deepseek': DeepseekProvider,
+from utils.profiling import span
+
+# Provider classes are referenced by dotted path and only imported on demand,
+# so a run that uses Ollama never pays for importing openai/anthropic/genai.
+_PROVIDER_REGISTRY = {
+	'openai': 'providers.openai_provider.OpenAIProvider',
+	'anthropic': 'providers.anthropic_provider.AnthropicProvider',
+	'ollama': 'providers.ollama_provider.OllamaProvider',
+	'gemini': 'providers.gemini_provider.GeminiProvider',
+	'lmstudio': 'providers.lmstudio_provider.LMStudioProvider',
+	'groq': 'providers.groq_provider.GroqProvider',
+	'deepseek': 'providers.deepseek_provider.DeepseekProvider',
 }
 
-def get_provider(name: str, **kwargs) -> ProviderBase:
-	"""Return an instance of the provider by name."""
-	cls = _PROVIDER_MAP.get(name.lower())
-	if not cls:
+_loaded: Dict[str, Type[ProviderBase]] = {}
+_import_times: Dict[str, float] = {}
+
+def register_provider(name: str, path: str):
+	"""Register a provider class by dotted path (e.g. 'mypkg.module.MyProvider')."""
+	_PROVIDER_REGISTRY[name.lower()] = path
+	_loaded.pop(name.lower(), None)
+
+def available_providers() -> List[str]:
+	"""Return the names of all registered providers."""
+	return list(_PROVIDER_REGISTRY)
+
+def get_provider_class(name: str) -> Type[ProviderBase]:
+	"""Resolve and import the provider class registered under name."""
+	key = name.lower()
+	if key in _loaded:
+		return _loaded[key]
+	path = _PROVIDER_REGISTRY.get(key)
+	if not path:
 		raise ValueError(f"Unknown provider: {name}")
-	return cls(**kwargs)
+	module_name, _, class_name = path.rpartition('.')
+	start = time.perf_counter()
+	with span('provider.import', provider=key):
+		module = importlib.import_module(module_name)
+	_import_times[key] = time.perf_counter() - start
+	cls = getattr(module, class_name)
+	_loaded[key] = cls
+	return cls
+
+def get_import_times() -> Dict[str, float]:
+	"""Return seconds spent importing each provider resolved so far."""
+	return dict(_import_times)
+
+def _daemon_provider(name: str):
+	"""Return a RemoteProvider if `git-ai daemon` is running and can serve this provider."""
+	from core.config import settings
+	from core import daemon
+	key = name.lower()
+	path = _PROVIDER_REGISTRY.get(key, '')
+	# Providers registered at runtime by plugins are unknown to the daemon process
+	if not path.startswith('providers.') or str(settings.get('DAEMON_ENABLED', 'true')).lower() != 'true':
+		return None
+	status = daemon.call('ping', timeout=0.5)
+	if not status or status.get('protocol') != daemon.PROTOCOL:
+		return None
+	from .remote_provider import RemoteProvider
+	return RemoteProvider(key, settings.get_provider_options(key), path.rpartition('.')[2])
+
+def get_provider(name: str, **kwargs) -> ProviderBase:
+	"""
+	Return an instance of the provider by name, with its requests scheduled and retried
+	(see providers.scheduler). While the daemon is running, the instance forwards calls to it,
+	so the provider's SDK is not imported in this process.
+	"""
+	if not kwargs:
+		with span('provider.daemon-check'):
+			remote = _daemon_provider(name)
+		if remote is not None:
+			return remote
+	cls = get_provider_class(name)
+	with span('provider.init', provider=name):
+		provider = cls(**kwargs)
+	from .scheduler import RateLimitedProvider
+	return RateLimitedProvider(provider, name.lower())
+
+def get_hedged_provider(name: str) -> ProviderBase:
+	"""
+	Return the provider for commit/review requests: the named provider, or, when HEDGE_PROVIDER
+	names a different one, a HedgedProvider that falls back to it after HEDGE_DELAY seconds.
+	"""
+	from core.config import settings
+	provider = get_provider(name)
+	backup_name = (settings.get('HEDGE_PROVIDER', '') or '').strip().lower()
+	if not backup_name or backup_name == name.lower():
+		return provider
+	from .hedged_provider import HedgedProvider
+	return HedgedProvider(provider, lambda: get_provider(backup_name), float(settings.get('HEDGE_DELAY', 2) or 0))
+
+def preload_model(name: str, provider: Optional[ProviderBase] = None):
+	"""
+	For providers with PRELOAD on (local servers that load models on demand), start loading the
+	model in the background and return at once, so the load overlaps with collecting the diff.
+	Uses `provider` if given, or creates one in the background. Returns a
+	concurrent.futures.Future, or None when there is nothing to preload. Errors are left to the
+	real request to report.
+	"""
+	from core.config import settings
+	if str(settings.get_provider_option('PRELOAD', name.lower(), 'false')).lower() != 'true':
+		return None
+	import asyncio
+	from utils.aio import get_loop
+
+	async def warm():
+		with span('provider.preload', provider=name):
+			try:
+				instance = provider or await asyncio.get_running_loop().run_in_executor(None, get_provider, name)
+				return await instance.awarm()
+			except Exception:
+				return False
+
+	return asyncio.run_coroutine_threadsafe(warm(), get_loop())
@@ -11,15 +11,39 @@ class GeminiProvider(ProviderBase):
 		genai.configure(api_key=self.api_key)
 		self.client = genai.GenerativeModel(self.model)
 
-	def generate(self, prompt: str, **kwargs):
+	async def agenerate(self, prompt: str, **kwargs):
 		"""Generate a response using the Gemini Python SDK."""
-		response = self.client.generate_content(prompt)
+		response = await self.client.generate_content_async(prompt)
+		self._record(getattr(response, 'usage_metadata', None))
 		try:
 			return response.text
 		except Exception:
 			return str(response)
 
-	def list_models(self):
+	async def astream(self, prompt: str, **kwargs):
+		"""Stream a response using the Gemini Python SDK."""
+		response = await self.client.generate_content_async(prompt, stream=True)
+		usage = None
+		async for chunk in response:
+			usage = getattr(chunk, 'usage_metadata', None)
+			try:
+				text = chunk.text
+			except Exception:
+				continue  # Chunks without text parts (e.g. safety metadata)
+			if text:
+				yield text
+		# Every chunk carries the running totals; the last one is final
+		self._record(usage)
+
+	def _record(self, usage):
+		if usage:
+			self.record_usage(
+				getattr(usage, 'prompt_token_count', 0),
+				getattr(usage, 'candidates_token_count', 0),
+				getattr(usage, 'cached_content_token_count', 0),
+			)
+
+	async def alist_models(self):
 		"""List available Gemini models (static list or via API if available)."""
 		# The Python SDK does not provide a public model listing endpoint as of now
 		return ["gemini-pro", "gemini-pro-vision"]
@@ -0,0 +1,110 @@
+# Provider that hedges a request to a primary provider with a delayed backup request to a second one
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from .base import ProviderBase, new_usage, add_usage
+from utils import profiling
+
+class HedgedProvider(ProviderBase):
+	"""
+	Sends each request to the primary provider and, if it has not answered within `delay` seconds
+	(or fails first), sends the same request to the backup provider. Streams go to whichever
+	provider produces the first token; generate() takes whichever response completes first.
+	The other request is cancelled. Response cache keys are the primary provider's.
+	The backup is created by `make_backup` the first time it is needed, so runs that never
+	hedge do not import its SDK.
+	"""
+
+	def __init__(self, primary: ProviderBase, make_backup: Callable[[], ProviderBase], delay: float):
+		self.primary = primary
+		self.make_backup = make_backup
+		self.backup: Optional[ProviderBase] = None
+		self.delay = delay
+		# Which provider answered the last request: 'primary' or 'backup'
+		self.last_winner: Optional[str] = None
+		self.class_name = getattr(primary, 'class_name', type(primary).__name__)
+		self.model = getattr(primary, 'model', None)
+		self.host = getattr(primary, 'host', None)
+
+	@property
+	def usage(self) -> Dict[str, int]:
+		"""Token usage of both providers, including requests that lost the race."""
+		total = new_usage()
+		add_usage(total, self.primary.usage)
+		if self.backup is not None:
+			add_usage(total, self.backup.usage)
+		return total
+
+	async def _race(self, start) -> Tuple[str, 'asyncio.Future', List['asyncio.Future']]:
+		"""
+		Run start(provider) for the primary, and for the backup once `delay` passes without an
+		answer or the primary fails. Returns the name and task of the first call to succeed
+		and the tasks still running.
+		"""
+		tasks = {asyncio.ensure_future(start(self.primary)): 'primary'}
+		hedged = False
+		error = None
+		while tasks:
+			done, _ = await asyncio.wait(tasks, timeout=None if hedged else self.delay, return_when=asyncio.FIRST_COMPLETED)
+			for task in done:
+				name = tasks.pop(task)
+				exc = task.exception()
+				# A stream that ends before its first token has finished too
+				if exc is None or isinstance(exc, StopAsyncIteration):
+					return name, task, list(tasks)
+				error = error or exc
+			if not hedged:
+				hedged = True
+				profiling.count('hedge.backup_requests')
+				tasks[asyncio.ensure_future(self._start_backup(start))] = 'backup'
+		raise error
+
+	async def _start_backup(self, start):
+		if self.backup is None:
+			# Importing a provider SDK can take a while; keep the primary's request running meanwhile
+			loop = asyncio.get_running_loop()
+			self.backup = await loop.run_in_executor(None, self.make_backup)
+		return await start(self.backup)
+
+	@staticmethod
+	async def _cancel(tasks):
+		for task in tasks:
+			task.cancel()
+		await asyncio.gather(*tasks, return_exceptions=True)
+
+	async def agenerate(self, prompt: str, **kwargs):
+		winner, task, losers = await self._race(lambda provider: provider.agenerate(prompt, **kwargs))
+		await self._cancel(losers)
+		self._won(winner)
+		return task.result()
+
+	async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+		streams = {}
+
+		def start(provider):
+			stream = provider.astream(prompt, **kwargs)
+			streams[provider] = stream
+			return stream.__anext__()
+
+		winner, task, losers = await self._race(start)
+		await self._cancel(losers)
+		stream = streams[self.primary if winner == 'primary' else self.backup]
+		for other in streams.values():
+			if other is not stream:
+				await other.aclose()
+		self._won(winner)
+		if isinstance(task.exception(), StopAsyncIteration):
+			return  # The winner finished without output
+		yield task.result()
+		async for piece in stream:
+			yield piece
+
+	def _won(self, winner: str):
+		self.last_winner = winner
+		if winner == 'backup':
+			profiling.count('hedge.backup_wins')
+
+	async def alist_models(self) -> List[str]:
+		return await self.primary.alist_models()
+
+	async def awarm(self) -> bool:
+		return await self.primary.awarm()
@@ -0,0 +1,52 @@
+# Shared keep-alive HTTP connection pools for providers that talk to a local server
+import asyncio
+import weakref
+from typing import Dict, Tuple
+import httpx
+from core.config import settings
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 600.0
+KEEPALIVE_EXPIRY = 60.0
+
+# One pool per (event loop, base URL, settings): connections are bound to the loop that opened them
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+def pool_options(provider: str) -> Tuple[int, float, float]:
+	"""Return (pool size, connect timeout, read timeout) configured for a provider."""
+	return (
+		int(settings.get_provider_option('POOL_SIZE', provider, DEFAULT_POOL_SIZE) or DEFAULT_POOL_SIZE),
+		float(settings.get_provider_option('CONNECT_TIMEOUT', provider, DEFAULT_CONNECT_TIMEOUT) or DEFAULT_CONNECT_TIMEOUT),
+		float(settings.get_provider_option('READ_TIMEOUT', provider, DEFAULT_READ_TIMEOUT) or DEFAULT_READ_TIMEOUT),
+	)
+
+def get_http_client(base_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+		connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT) -> httpx.AsyncClient:
+	"""
+	Return a pooled keep-alive client for base_url on the running event loop.
+	Every provider instance pointing at the same server shares the pool, so list_models()
+	and generate() in one run reuse the same connections.
+	"""
+	loop = asyncio.get_running_loop()
+	clients = _clients.setdefault(loop, {})
+	key = (base_url, pool_size, connect_timeout, read_timeout)
+	client = clients.get(key)
+	if client is None or client.is_closed:
+		client = httpx.AsyncClient(
+			base_url=base_url,
+			limits=httpx.Limits(
+				max_connections=pool_size,
+				max_keepalive_connections=pool_size,
+				keepalive_expiry=KEEPALIVE_EXPIRY,
+			),
+			timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+		)
+		clients[key] = client
+	return client
+
+async def aclose_http_clients():
+	"""Close every pool opened on the running event loop."""
+	clients = _clients.pop(asyncio.get_running_loop(), {})
+	for client in clients.values():
+		await client.aclose()
@@ -1,6 +1,7 @@
 # LM Studio LLM provider implementation
-import requests
-from .base import ProviderBase
+import json
+from .base import ProviderBase, plain_messages
+from .http_pool import get_http_client, pool_options
 from core.config import settings
 from utils import Colors
 
@@ -9,24 +10,58 @@ class LMStudioProvider(ProviderBase):
         # Prefer explicit args, then provider config, then fallback
         self.host = (host or settings.get_provider_option('HOST', 'lmstudio', 'http://localhost:1234')).rstrip('/')
         self.model = model or settings.get_provider_option('MODEL', 'lmstudio', 'default')
+        self.pool_size, self.connect_timeout, self.read_timeout = pool_options('lmstudio')
 
-    def generate(self, prompt: str, **kwargs):
+    def _http(self):
+        return get_http_client(self.host, self.pool_size, self.connect_timeout, self.read_timeout)
+
+    def _request(self, prompt: str, messages=None, stream=False):
+        """Use the chat endpoint when messages are given, the plain completions endpoint otherwise."""
+        if messages:
+            return "/v1/chat/completions", {"model": self.model, "messages": plain_messages(messages), "stream": stream}
+        return "/v1/completions", {"model": self.model, "prompt": prompt, "stream": stream}
+
+    async def agenerate(self, prompt: str, **kwargs):
         """Generate a response using the LM Studio local API."""
-        url = f"{self.host}/v1/completions"
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-        }
-        resp = requests.post(url, json=payload, timeout=1000)
+        messages = kwargs.get('messages')
+        url, payload = self._request(prompt, messages)
+        resp = await self._http().post(url, json=payload)
         resp.raise_for_status()
-        result = resp.json()
-        return result.get('choices', [{}])[0].get('text', '')
+        data = resp.json()
+        self._record(data.get('usage'))
+        choice = data.get('choices', [{}])[0]
+        if messages:
+            return choice.get('message', {}).get('content', '')
+        return choice.get('text', '')
+
+    async def astream(self, prompt: str, **kwargs):
+        """Stream a response from the LM Studio local API (OpenAI-style server-sent events)."""
+        messages = kwargs.get('messages')
+        url, payload = self._request(prompt, messages, stream=True)
+        async with self._http().stream('POST', url, json=payload) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    continue  # Read to the end of the stream so the connection can be reused
+                chunk = json.loads(data)
+                self._record(chunk.get('usage'))
+                choices = chunk.get('choices') or [{}]
+                text = choices[0].get('delta', {}).get('content') if messages else choices[0].get('text')
+                if text:
+                    yield text
+
+    def _record(self, usage):
+        if usage:
+            cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0)
+            self.record_usage(usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0), cached)
 
-    def list_models(self):
+    async def alist_models(self):
         """List available LM Studio models (if API supports it, else static list)."""
-        url = f"{self.host}/v1/models"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = await self._http().get("/v1/models", timeout=10)
             resp.raise_for_status()
             data = resp.json()
             return [m['id'] for m in data.get('data', [])]
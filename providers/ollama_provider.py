@@ -1,40 +1,77 @@
 # Ollama LLM provider implementation
 
 
-import requests
-from .base import ProviderBase
+import json
+from .base import ProviderBase, plain_messages
+from .http_pool import get_http_client, pool_options
 from core.config import settings
 
 
+def _keep_alive(value):
+	"""Ollama takes a duration ("30m") or a number of seconds (-1 = until the server stops)."""
+	value = str(value or '').strip()
+	if not value:
+		return None
+	try:
+		return int(value)
+	except ValueError:
+		return value
+
+
 class OllamaProvider(ProviderBase):
 	def __init__(self, model: str = None, host: str = None, **kwargs):
 		# Prefer explicit args, then provider config, then fallback
 		self.model = model or settings.get_provider_option('MODEL', 'ollama', 'llama3')
 		self.host = (host or settings.get_provider_option('HOST', 'ollama', 'http://localhost:11434')).rstrip('/')
+		self.pool_size, self.connect_timeout, self.read_timeout = pool_options('ollama')
+		# How long the server keeps the model loaded after a request ('' = server default of 5m)
+		self.keep_alive = _keep_alive(settings.get_provider_option('KEEP_ALIVE', 'ollama', '30m'))
 
-	def generate(self, prompt: str, **kwargs):
+	def _http(self):
+		return get_http_client(self.host, self.pool_size, self.connect_timeout, self.read_timeout)
+
+	async def agenerate(self, prompt: str, **kwargs):
 		"""Generate a response using the Ollama local API."""
-		url = f"{self.host}/api/generate"
-		payload = {
-			"model": self.model,
-			"prompt": prompt,
-			**kwargs
-		}
-		resp = requests.post(url, json=payload, timeout=1000)
-		resp.raise_for_status()
-		# Ollama streams responses, but for simplicity, get the first chunk
-		for line in resp.iter_lines():
-			if line:
-				import json
+		return ''.join([piece async for piece in self.astream(prompt, **kwargs)])
+
+	async def astream(self, prompt: str, **kwargs):
+		"""Stream a response from the Ollama local API, one NDJSON chunk at a time."""
+		messages = kwargs.pop('messages', None)
+		if messages:
+			url = "/api/chat"
+			payload = {"model": self.model, "messages": plain_messages(messages), "stream": True, **kwargs}
+		else:
+			url = "/api/generate"
+			payload = {"model": self.model, "prompt": prompt, "stream": True, **kwargs}
+		if self.keep_alive is not None:
+			payload.setdefault("keep_alive", self.keep_alive)
+		async with self._http().stream('POST', url, json=payload) as resp:
+			resp.raise_for_status()
+			async for line in resp.aiter_lines():
+				if not line:
+					continue
 				data = json.loads(line)
-				if 'response' in data:
-					return data['response']
-		return ""
+				if data.get('error'):
+					raise RuntimeError(f"Ollama error: {data['error']}")
+				text = data.get('message', {}).get('content') if messages else data.get('response')
+				if text:
+					yield text
+				if data.get('done'):
+					# Ollama reuses the KV cache for a repeated prefix but does not report it
+					self.record_usage(data.get('prompt_eval_count', 0), data.get('eval_count', 0))
 
-	def list_models(self):
+	async def alist_models(self):
 		"""List available Ollama models via the local API."""
-		url = f"{self.host}/api/tags"
-		resp = requests.get(url, timeout=10)
+		resp = await self._http().get("/api/tags", timeout=10)
 		resp.raise_for_status()
 		data = resp.json()
 		return [m['name'] for m in data.get('models', [])]
+
+	async def awarm(self):
+		"""Load the model into memory: Ollama loads it without generating when the prompt is empty."""
+		payload = {"model": self.model}
+		if self.keep_alive is not None:
+			payload["keep_alive"] = self.keep_alive
+		resp = await self._http().post("/api/generate", json=payload)
+		resp.raise_for_status()
+		return True
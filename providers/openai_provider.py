@@ -1,24 +1,59 @@
-from .base import ProviderBase
+from .base import ProviderBase, plain_messages
 from core.config import settings
 import openai
 
 class OpenAIProvider(ProviderBase):
+	# Subclasses for OpenAI-compatible APIs override these
+	NAME = 'openai'
+	BASE_URL = None
+	DEFAULT_MODEL = 'gpt-4o-mini'
+
 	def __init__(self, api_key: str = None, model: str = None, **kwargs):
 		# Prefer explicit args, then provider config, then fallback
-		self.api_key = api_key or settings.get_provider_option('API_KEY', 'openai', '')
-		self.model = model or settings.get_provider_option('MODEL', 'openai', 'gpt-4o-mini')
-		self.client = openai.OpenAI(api_key=self.api_key)
+		self.api_key = api_key or settings.get_provider_option('API_KEY', self.NAME, '')
+		self.model = model or settings.get_provider_option('MODEL', self.NAME, self.DEFAULT_MODEL)
+		# Retries and backoff are handled by providers.scheduler, with budgets shared across requests
+		self.client = openai.AsyncOpenAI(base_url=self.BASE_URL, api_key=self.api_key, max_retries=0)
 
-	def generate(self, prompt: str, **kwargs):
+	def _messages(self, prompt: str, kwargs):
+		# OpenAI-compatible APIs cache long prompt prefixes automatically; no markers needed
 		messages = kwargs.get('messages')
 		if not messages:
 			messages = [{"role": "user", "content": prompt}]
-		response = self.client.chat.completions.create(
+		return plain_messages(messages), {k: v for k, v in kwargs.items() if k != 'messages'}
+
+	def _record(self, usage):
+		if not usage:
+			return
+		details = getattr(usage, 'prompt_tokens_details', None)
+		# DeepSeek reports cache hits as prompt_cache_hit_tokens instead
+		cached = getattr(details, 'cached_tokens', None) or getattr(usage, 'prompt_cache_hit_tokens', 0)
+		self.record_usage(usage.prompt_tokens, usage.completion_tokens, cached)
+
+	async def agenerate(self, prompt: str, **kwargs):
+		messages, params = self._messages(prompt, kwargs)
+		response = await self.client.chat.completions.create(
 			model=self.model,
 			messages=messages,
-			**{k: v for k, v in kwargs.items() if k != 'messages'}
+			**params
 		)
+		self._record(response.usage)
 		return response.choices[0].message.content.strip()
 
-	def list_models(self):
-		return [m.id for m in self.client.models.list().data]
+	async def astream(self, prompt: str, **kwargs):
+		messages, params = self._messages(prompt, kwargs)
+		response = await self.client.chat.completions.create(
+			model=self.model,
+			messages=messages,
+			stream=True,
+			stream_options={"include_usage": True},
+			**params
+		)
+		async for chunk in response:
+			if chunk.choices and chunk.choices[0].delta.content:
+				yield chunk.choices[0].delta.content
+			if getattr(chunk, 'usage', None):
+				self._record(chunk.usage)
+
+	async def alist_models(self):
+		return [m.id async for m in self.client.models.list()]
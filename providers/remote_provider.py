@@ -0,0 +1,94 @@
+# Provider that forwards calls to the git-ai daemon, falling back to an in-process provider
+from typing import Any, Dict, List, Optional
+from .base import ProviderBase
+from core import daemon
+
+class RemoteProvider(ProviderBase):
+	"""
+	Stands in for a provider while `git-ai daemon` is running: requests go over the daemon's
+	socket, where the real provider is already imported and connected. If the daemon cannot be
+	reached, the provider is created in-process and used directly.
+	"""
+
+	def __init__(self, name: str, options: Dict[str, Any], class_name: str):
+		self.name = name
+		self.options = options
+		# Match the attributes of the real provider so response cache keys are the same
+		self.class_name = class_name
+		self.model = options.get('MODEL')
+		host = options.get('HOST')
+		self.host = host.rstrip('/') if host else None
+		self._local: Optional[ProviderBase] = None
+
+	def _fallback(self) -> ProviderBase:
+		if self._local is None:
+			from .factory import get_provider_class
+			from .scheduler import RateLimitedProvider
+			# Scheduled and retried like any provider created in-process (the SDK clients don't retry)
+			self._local = RateLimitedProvider(get_provider_class(self.name)(), self.name)
+		return self._local
+
+	def _message(self, op: str, prompt: str = '', kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+		return {'op': op, 'provider': self.name, 'options': self.options, 'prompt': prompt, 'kwargs': kwargs or {}}
+
+	def _done(self, reply: Dict[str, Any]):
+		if 'error' in reply:
+			raise RuntimeError(reply['error'])
+		usage = reply.get('usage')
+		if usage and usage.get('requests'):
+			self.record_usage(usage['input_tokens'], usage['output_tokens'], usage['cached_tokens'], usage['cache_write_tokens'])
+
+	async def astream(self, prompt: str, **kwargs):
+		if self._local is None:
+			started = False
+			try:
+				async for reply in daemon.request(self._message('stream', prompt, kwargs)):
+					if 'chunk' in reply:
+						started = True
+						yield reply['chunk']
+					else:
+						self._done(reply)
+				return
+			except OSError:
+				if started:
+					raise
+		async for piece in self._fallback().astream(prompt, **kwargs):
+			yield piece
+
+	async def agenerate(self, prompt: str, **kwargs):
+		if self._local is None:
+			try:
+				parts = []
+				async for reply in daemon.request(self._message('generate', prompt, kwargs)):
+					if 'chunk' in reply:
+						parts.append(reply['chunk'])
+					else:
+						self._done(reply)
+				return ''.join(parts)
+			except OSError:
+				pass
+		return await self._fallback().agenerate(prompt, **kwargs)
+
+	async def _call(self, op: str):
+		"""Send a request with a single result, or raise OSError if the daemon cannot be reached."""
+		async for reply in daemon.request(self._message(op)):
+			if 'error' in reply:
+				raise RuntimeError(reply['error'])
+			return reply.get('result')
+		raise OSError("daemon closed the connection")
+
+	async def alist_models(self) -> List[str]:
+		if self._local is None:
+			try:
+				return await self._call('list_models') or []
+			except OSError:
+				pass
+		return await self._fallback().alist_models()
+
+	async def awarm(self) -> bool:
+		if self._local is None:
+			try:
+				return bool(await self._call('warm'))
+			except OSError:
+				pass
+		return await self._fallback().awarm()
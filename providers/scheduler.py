@@ -0,0 +1,237 @@
+# Per-provider request budgets, retries and backoff shared by every request in the process
+import asyncio
+import email.utils
+import random
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+from .base import ProviderBase
+from core.config import settings
+from utils import profiling
+from utils.diff import estimate_tokens
+
+# HTTP statuses worth retrying: rate limits, timeouts and transient server errors (529 = overloaded)
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# Errors (by class name, so no SDK has to be imported) for requests that never got an answer
+RETRY_ERRORS = {'TransportError', 'APIConnectionError', 'ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError'}
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+def error_status(error: BaseException) -> Optional[int]:
+	"""HTTP status of a provider error (OpenAI/Anthropic, httpx and Google errors all carry one)."""
+	for value in (getattr(error, 'status_code', None), getattr(getattr(error, 'response', None), 'status_code', None), getattr(error, 'code', None)):
+		if isinstance(value, int):
+			return value
+	return None
+
+def retry_after(error: BaseException) -> Optional[float]:
+	"""Seconds the server asked us to wait (Retry-After or retry-after-ms), if it said."""
+	headers = getattr(getattr(error, 'response', None), 'headers', None)
+	if not headers:
+		return None
+	try:
+		if headers.get('retry-after-ms'):
+			return float(headers['retry-after-ms']) / 1000
+		value = headers.get('retry-after')
+		if not value:
+			return None
+		try:
+			return max(0.0, float(value))
+		except ValueError:
+			return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+	except (TypeError, ValueError):
+		return None
+
+def is_retryable(error: BaseException) -> bool:
+	status = error_status(error)
+	if status is not None:
+		return status in RETRY_STATUSES
+	if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+		return True
+	return any(cls.__name__ in RETRY_ERRORS for cls in type(error).__mro__)
+
+class TokenBucket:
+	"""Refills `per_minute` units a minute, holding at most a minute's worth."""
+
+	def __init__(self, per_minute: float):
+		self.capacity = per_minute
+		self.rate = per_minute / 60.0
+		self.level = per_minute
+		self.updated = time.monotonic()
+
+	def _refill(self):
+		now = time.monotonic()
+		self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+		self.updated = now
+
+	def wait_time(self, amount: float) -> float:
+		"""Seconds until `amount` can be taken (a request larger than the bucket waits for a full one)."""
+		self._refill()
+		amount = min(amount, self.capacity)
+		return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+	def take(self, amount: float):
+		self._refill()
+		self.level -= amount
+
+class RequestScheduler:
+	"""
+	Admits one provider's requests in arrival order within its requests-per-minute and
+	tokens-per-minute budgets (0 = no limit), and holds every request back while the provider
+	has asked us to wait after a rate-limit error.
+	"""
+
+	def __init__(self, name: str, rpm: float = 0, tpm: float = 0):
+		self.name = name
+		self.requests_bucket = TokenBucket(rpm) if rpm > 0 else None
+		self.tokens_bucket = TokenBucket(tpm) if tpm > 0 else None
+		self.blocked_until = 0.0
+		self._lock = asyncio.Lock()
+		self.queued = 0
+		self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'max_queued': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+	def _wait_time(self, tokens: int) -> float:
+		wait = self.blocked_until - time.monotonic()
+		if self.requests_bucket:
+			wait = max(wait, self.requests_bucket.wait_time(1))
+		if self.tokens_bucket:
+			wait = max(wait, self.tokens_bucket.wait_time(tokens))
+		return wait
+
+	async def acquire(self, tokens: int):
+		"""Wait until the budgets allow a request of about `tokens` tokens, then charge for it."""
+		start = time.monotonic()
+		self.queued += 1
+		self.stats['max_queued'] = max(self.stats['max_queued'], self.queued)
+		try:
+			async with self._lock:
+				wait = self._wait_time(tokens)
+				while wait > 0:
+					await asyncio.sleep(wait)
+					wait = self._wait_time(tokens)
+				if self.requests_bucket:
+					self.requests_bucket.take(1)
+				if self.tokens_bucket:
+					self.tokens_bucket.take(tokens)
+		finally:
+			self.queued -= 1
+		waited = time.monotonic() - start
+		self.stats['requests'] += 1
+		self.stats['wait_seconds'] += waited
+		self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+		profiling.count('scheduler.wait_ms', waited * 1000)
+
+	def charge(self, tokens: int):
+		"""Charge tokens that were only known after the request (the response)."""
+		if self.tokens_bucket and tokens:
+			self.tokens_bucket.take(tokens)
+
+	def retry_delay(self, error: BaseException, attempt: int) -> float:
+		"""
+		Seconds to wait before retrying after `error`: what the server asked for, or jittered
+		exponential backoff. A rate-limit error holds back every request to the provider.
+		"""
+		self.stats['retries'] += 1
+		profiling.count('scheduler.retries')
+		requested = retry_after(error)
+		if requested is not None:
+			delay = requested + random.uniform(0, 0.1 * requested + 0.05)
+		else:
+			delay = random.uniform(0.1, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt))
+		if error_status(error) == 429:
+			self.stats['rate_limited'] += 1
+			self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+		return delay
+
+	def metrics(self) -> Dict[str, Any]:
+		return dict(self.stats, queued=self.queued)
+
+# One scheduler per (event loop, provider): asyncio locks belong to the loop that uses them
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, RequestScheduler]]" = weakref.WeakKeyDictionary()
+
+def get_scheduler(name: str) -> RequestScheduler:
+	"""Return the scheduler shared by every request to provider `name` on the running loop."""
+	schedulers = _schedulers.setdefault(asyncio.get_running_loop(), {})
+	scheduler = schedulers.get(name)
+	if scheduler is None:
+		rpm = float(settings.get_provider_option('RPM', name, 0) or 0)
+		tpm = float(settings.get_provider_option('TPM', name, 0) or 0)
+		scheduler = schedulers[name] = RequestScheduler(name, rpm, tpm)
+	return scheduler
+
+def scheduler_metrics() -> Dict[str, Dict[str, Any]]:
+	"""Queue depth, wait time and retry counts per provider, for the running loop."""
+	return {name: s.metrics() for name, s in _schedulers.get(asyncio.get_running_loop(), {}).items()}
+
+def _request_tokens(prompt: str, kwargs: Dict[str, Any]) -> int:
+	messages = kwargs.get('messages')
+	return sum(estimate_tokens(m['content']) for m in messages) if messages else estimate_tokens(prompt or '')
+
+class RateLimitedProvider(ProviderBase):
+	"""
+	Wraps a provider so its requests go through the provider's RequestScheduler and are retried
+	(up to RETRY_MAX times) on rate limits, timeouts and transient server errors. A stream is
+	only retried if it failed before its first piece. Other attributes come from the wrapped provider.
+	"""
+
+	def __init__(self, provider: ProviderBase, name: str):
+		self.provider = provider
+		self.name = name
+		self.class_name = getattr(provider, 'class_name', type(provider).__name__)
+		self.max_retries = int(settings.get('RETRY_MAX', 4) or 0)
+
+	def __getattr__(self, attr):
+		return getattr(self.provider, attr)
+
+	@property
+	def usage(self) -> Dict[str, int]:
+		return self.provider.usage
+
+	async def _should_retry(self, scheduler: RequestScheduler, error: Exception, attempt: int) -> bool:
+		if attempt >= self.max_retries or not is_retryable(error):
+			return False
+		delay = scheduler.retry_delay(error, attempt)
+		if error_status(error) != 429:
+			await asyncio.sleep(delay)  # A 429 holds the whole queue back instead
+		return True
+
+	async def agenerate(self, prompt: str, **kwargs):
+		scheduler = get_scheduler(self.name)
+		tokens = _request_tokens(prompt, kwargs)
+		attempt = 0
+		while True:
+			await scheduler.acquire(tokens)
+			try:
+				result = await self.provider.agenerate(prompt, **kwargs)
+			except Exception as e:
+				if not await self._should_retry(scheduler, e, attempt):
+					raise
+				attempt += 1
+				continue
+			scheduler.charge(estimate_tokens(result or ''))
+			return result
+
+	async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+		scheduler = get_scheduler(self.name)
+		tokens = _request_tokens(prompt, kwargs)
+		attempt = 0
+		while True:
+			await scheduler.acquire(tokens)
+			received = []
+			try:
+				async for piece in self.provider.astream(prompt, **kwargs):
+					received.append(piece)
+					yield piece
+			except Exception as e:
+				if received or not await self._should_retry(scheduler, e, attempt):
+					raise
+				attempt += 1
+				continue
+			scheduler.charge(estimate_tokens(''.join(received)))
+			return
+
+	async def alist_models(self) -> List[str]:
+		return await self.provider.alist_models()
+
+	async def awarm(self) -> bool:
+		return await self.provider.awarm()
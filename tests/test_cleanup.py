@@ -0,0 +1,65 @@
+# Streamed cleanup must produce exactly what whole-text cleanup does, however the text is split
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.cleanup import (
+	AI_RESPONSE_CLEANUP, COMMIT_MESSAGE_CLEANUP, REVIEW_OUTPUT_CLEANUP, HEAD_WINDOW,
+	clean_commit_message, clean_review_output, stream_review_output,
+)
+
+# Pieces that exercise every rule: fences, inline code, quotes, prefixes, blank lines, sign-offs
+FRAGMENTS = [
+	"Here's the review:", "Review:", "Code review:", "Review results:", "Commit message:",
+	"Here is the commit message:", "Response:", "answer: ", "- commit:", "* commit:",
+	"```", "```python", "```text\n", "`", "`x`", "`a b`", "``",
+	'"', "'", '"Fix bug"', "'Add tests'",
+	"\n", "\n\n", "\n\n\n\n", "\r\n", " ", "  ", "\t",
+	"## src/app.py", "- WARNING: `fetch()` retries", "- GOOD: config", "CRITICAL: 0",
+	"Let me know if you need more.", "Hope this helps!", "This commit message explains it.",
+	"let me know", "this message", "hope  this\nhelps",
+	"fix: handle empty input", "word", "more words here", "#", "*bold*", "**strong**",
+]
+
+def random_text(rng):
+	return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+
+def random_split(rng, text):
+	pieces, i = [], 0
+	while i < len(text):
+		step = rng.choice([1, 1, 2, 3, 5, 8, 40])
+		pieces.append(text[i:i + step])
+		i += step
+	return pieces
+
+def test_stream_matches_clean_for_any_split():
+	rng = random.Random(20260417)
+	for _ in range(3000):
+		text = random_text(rng)
+		pieces = random_split(rng, text)
+		for pipeline in (AI_RESPONSE_CLEANUP, REVIEW_OUTPUT_CLEANUP, COMMIT_MESSAGE_CLEANUP):
+			expected = pipeline.clean(text)
+			assert ''.join(pipeline.stream(pieces)) == expected, (pipeline, pieces)
+			assert ''.join(pipeline.stream([text])) == expected, (pipeline, text)
+
+def test_stream_with_a_long_first_line():
+	text = "Review: " + "x" * (HEAD_WINDOW * 3) + "\n\n`code` and more\n\nHope this helps!"
+	for size in (1, 7, HEAD_WINDOW - 1, HEAD_WINDOW + 1):
+		pieces = [text[i:i + size] for i in range(0, len(text), size)]
+		assert ''.join(stream_review_output(pieces)) == clean_review_output(text)
+
+def test_review_cleanup():
+	text = "Review:\n\n## app.py\n\n\n\n- WARNING: `fetch()` retries\n\n```python\nx = 1\n```\n\nLet me know if you need more."
+	assert clean_review_output(text) == "## app.py\n\n- WARNING: fetch() retries\n\nx = 1"
+
+def test_sign_off_is_only_removed_as_a_closing_paragraph():
+	text = "- HIGH: let me know is logged\n\n- LOW: naming\n\nHope this helps!"
+	assert clean_review_output(text) == "- HIGH: let me know is logged\n\n- LOW: naming"
+
+def test_commit_message_cleanup():
+	assert clean_commit_message('```\nCommit message: "fix: handle empty input"\n```') == "fix: handle empty input"
+	assert clean_commit_message("feat: add cache\nstore responses on disk\n\n\nkeyed by prompt") == (
+		"feat: add cache\n\nstore responses on disk\nkeyed by prompt"
+	)
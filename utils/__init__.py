@@ -2,4 +2,5 @@
 from .io import *
 from .git import *
 from .cleanup import *
-from .colors import *
\ No newline at end of file
+from .colors import *
+from .diff import *
\ No newline at end of file
@@ -0,0 +1,48 @@
+# Bridge between synchronous callers and the shared asyncio event loop
+import asyncio
+import threading
+from typing import AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar('T')
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+	"""
+	Return the process-wide event loop, starting it on a daemon thread on first use.
+	All async provider clients live on this loop, so sync calls from any thread can share
+	their connection pools.
+	"""
+	global _loop, _thread
+	with _lock:
+		if _loop is None:
+			_loop = asyncio.new_event_loop()
+			_thread = threading.Thread(target=_loop.run_forever, name='git-ai-loop', daemon=True)
+			_thread.start()
+	return _loop
+
+def _check_not_on_loop():
+	if _thread is not None and threading.current_thread() is _thread:
+		raise RuntimeError("Blocking call made from the event loop thread; use the async API instead")
+
+def run_sync(coro: Awaitable[T]) -> T:
+	"""Run a coroutine on the shared loop and block until it finishes."""
+	_check_not_on_loop()
+	return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+def iter_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+	"""Iterate an async generator from synchronous code, one item at a time."""
+	_check_not_on_loop()
+	loop = get_loop()
+	try:
+		while True:
+			try:
+				yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+			except StopAsyncIteration:
+				break
+	finally:
+		aclose = getattr(agen, 'aclose', None)
+		if aclose:
+			asyncio.run_coroutine_threadsafe(aclose(), loop).result()
@@ -1,81 +1,209 @@
 # Utility functions for cleaning up AI-generated responses
 import re
+from .profiling import traced
 
-def clean_ai_response(text):
-    """
-    Clean up AI-generated text by removing common formatting artifacts.
-    Useful for commit messages and review outputs.
-    """
-    if not text:
-        return ""
-    
-    # Remove markdown code blocks (```text```, ```python```, etc.)
-    text = re.sub(r'```[\w]*\n?', '', text)
-    text = re.sub(r'```', '', text)
-    
-    # Remove backticks around single words/phrases
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # Remove quotes that wrap the entire response
-    text = text.strip()
-    if (text.startswith('"') and text.endswith('"')) or (text.startswith("'") and text.endswith("'")):
-        text = text[1:-1]
-    
-    # Remove common AI prefixes/suffixes
-    prefixes_to_remove = [
-        r'^(here\'s?\s+(the\s+)?)?commit\s+message:?\s*',
-        r'^(here\'s?\s+(a\s+)?)?review:?\s*',
-        r'^(here\'s?\s+(the\s+)?)?analysis:?\s*',
-        r'^response:?\s*',
-        r'^answer:?\s*',
-        r'^result:?\s*'
-    ]
-    
-    for prefix in prefixes_to_remove:
-        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
-    
-    # Remove trailing explanations
-    suffixes_to_remove = [
-        r'\s*\n\n.*this\s+(commit\s+)?message.*$',
-        r'\s*\n\n.*hope\s+this\s+helps.*$',
-        r'\s*\n\n.*let\s+me\s+know.*$'
-    ]
-    
-    for suffix in suffixes_to_remove:
-        text = re.sub(suffix, '', text, flags=re.IGNORECASE | re.DOTALL)
-    
-    # Clean up extra whitespace
-    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)  # Multiple blank lines -> single blank line
-    text = text.strip()
-    
-    return text
+# Code fences (```text, ```python, ```) and `inline code` markers
+_FENCE = re.compile(r'```\w*\n?')
+_INLINE_CODE = re.compile(r'`([^`]+)`')
 
-def clean_commit_message(text):
+# Common AI prefixes, removed from the start of a response in this order
+_AI_PREFIXES = [re.compile(p, re.IGNORECASE) for p in (
+    r'^(here\'s?\s+(the\s+)?)?commit\s+message:?\s*',
+    r'^(here\'s?\s+(a\s+)?)?review:?\s*',
+    r'^(here\'s?\s+(the\s+)?)?analysis:?\s*',
+    r'^response:?\s*',
+    r'^answer:?\s*',
+    r'^result:?\s*',
+)]
+
+_COMMIT_PREFIXES = [re.compile(p, re.IGNORECASE) for p in (
+    r'^commit\s+message:?\s*',
+    r'^git\s+commit\s+message:?\s*',
+    r'^\s*-\s*commit:?\s*',
+    r'^\s*\*\s*commit:?\s*',
+    r'^here\s+is\s+the\s+commit\s+message:?\s*',
+    r'^the\s+commit\s+message\s+is:?\s*',
+)]
+
+_REVIEW_PREFIXES = [re.compile(p, re.IGNORECASE) for p in (
+    r'^code\s+review:?\s*',
+    r'^review\s+results?:?\s*',
+    r'^analysis\s+results?:?\s*',
+)]
+
+# A closing paragraph that opens with one of these is a sign-off rather than content
+_OUTRO = re.compile(r'this\s+(commit\s+)?message|hope\s+this\s+helps|let\s+me\s+know', re.IGNORECASE)
+
+# Leading text to collect before giving up on a prefix that spans a very long first line
+HEAD_WINDOW = 512
+
+class CleanupPipeline:
     """
-    Specifically clean commit messages.
+    Cleanup rules compiled once and applied in order: code fences, inline code markers, wrapping
+    quotes and leading phrases, repeated blank lines, closing sign-offs and surrounding whitespace.
+    clean() handles a whole response; stream() cleans a response as it is generated, holding back
+    only what a rule still has to see (an unclosed `, the opening line, a possible sign-off).
+    Both take one pass over the text. `finish` runs on the complete result, so a pipeline with it
+    only yields once the stream ends.
     """
-    text = clean_ai_response(text)
-    
-    # Remove commit-specific artifacts
-    commit_artifacts = [
-        r'^commit\s+message:?\s*',
-        r'^git\s+commit\s+message:?\s*',
-        r'^\s*-\s*commit:?\s*',
-        r'^\s*\*\s*commit:?\s*',
-        r'^here\s+is\s+the\s+commit\s+message:?\s*',
-        r'^the\s+commit\s+message\s+is:?\s*'
-    ]
-    
-    for artifact in commit_artifacts:
-        text = re.sub(artifact, '', text, flags=re.IGNORECASE)
-    
+
+    def __init__(self, prefixes, finish=None):
+        # Groups of prefix rules; leading whitespace is stripped after each group
+        self.prefixes = prefixes
+        self.finish = finish
+
+    def clean(self, text):
+        if not text:
+            return ""
+        run = _CleanupRun(self.prefixes)
+        text = run.feed(text) + run.close()
+        return self.finish(text) if self.finish else text
+
+    def stream(self, pieces):
+        if self.finish:
+            yield self.clean(''.join(pieces))
+            return
+        run = _CleanupRun(self.prefixes)
+        for piece in pieces:
+            text = run.feed(piece)
+            if text:
+                yield text
+        text = run.close()
+        if text:
+            yield text
+
+class _CleanupRun:
+    """State of one pass through a CleanupPipeline; each stage passes on what it has finished with."""
+
+    def __init__(self, prefixes):
+        self.prefixes = prefixes
+        # Incomplete last line, for the fence rule
+        self.fence_parts = []
+        # Text from an unclosed ` onwards
+        self.code_parts = []
+        self.code_open = False
+        # Opening text until the prefix rules have run, then None
+        self.head = []
+        self.quoted = False
+        # Incomplete last line, for the line rules
+        self.line_parts = []
+        self.seen_content = False
+        self.paragraphs = 0
+        # Newline (and trailing whitespace) after the last content line, and blank lines since it
+        self.pending = ''
+        self.blanks = []
+        # Closing paragraphs that look like sign-offs, dropped unless more content follows
+        self.held = []
+        self.in_outro = False
+
+    def feed(self, text):
+        return self._lines(self._head(self._inline(self._fences(text, False), False), False), False)
+
+    def close(self):
+        return self._lines(self._head(self._inline(self._fences('', True), True), True), True)
+
+    def _fences(self, text, final):
+        # A fence never spans a newline, so complete lines can be cleaned on their own
+        if not final and '\n' not in text:
+            self.fence_parts.append(text)
+            return ''
+        self.fence_parts.append(text)
+        data = ''.join(self.fence_parts)
+        cut = len(data) if final else data.rfind('\n') + 1
+        self.fence_parts = [data[cut:]]
+        return _FENCE.sub('', data[:cut])
+
+    def _inline(self, text, final):
+        self.code_parts.append(text)
+        if not final and (not text or (self.code_open and '`' not in text)):
+            return ''
+        data = ''.join(self.code_parts)
+        if final:
+            self.code_parts = []
+            return _INLINE_CODE.sub(r'\1', data)
+        # Hold back from the last ` that is not part of a complete pair
+        last_end = 0
+        for match in _INLINE_CODE.finditer(data):
+            last_end = match.end()
+        hold = data.find('`', last_end)
+        if hold == -1:
+            hold = len(data)
+        self.code_parts = [data[hold:]]
+        self.code_open = hold < len(data)
+        return _INLINE_CODE.sub(r'\1', data[:hold])
+
+    def _head(self, text, final):
+        if self.head is None:
+            return text
+        self.head.append(text)
+        if self.quoted and not final:
+            return ''
+        head = ''.join(self.head).lstrip()
+        self.head = [head]
+        if not head:
+            if final:
+                self.head = None
+            return ''
+        if head[0] in '"\'':
+            # A response wrapped in quotes can only be recognised at its end
+            if not final:
+                self.quoted = True
+                return ''
+            head = head.strip()
+            if (head.startswith('"') and head.endswith('"')) or (head.startswith("'") and head.endswith("'")):
+                head = head[1:-1]
+        for group in self.prefixes:
+            for prefix in group:
+                head = prefix.sub('', head)
+            head = head.lstrip()
+        # Wait for the first line after the prefixes is complete; a prefix may still be arriving
+        if not final and '\n' not in head and len(self.head[0]) < HEAD_WINDOW:
+            return ''
+        self.head = None
+        return head
+
+    def _lines(self, text, final):
+        if not final and '\n' not in text:
+            self.line_parts.append(text)
+            return ''
+        self.line_parts.append(text)
+        lines = ''.join(self.line_parts).split('\n')
+        self.line_parts = [] if final else [lines.pop()]
+        out = []
+        for line in lines:
+            self._line(line, out)
+        return ''.join(out)
+
+    def _line(self, line, out):
+        content = line.rstrip()
+        if not content:
+            if self.seen_content:
+                self.blanks.append(line)
+            return
+        separator = self.pending
+        if self.blanks:
+            # Two or more blank lines in a row become one empty line
+            separator += self.blanks[0] + '\n' if len(self.blanks) == 1 else '\n'
+        new_paragraph = bool(self.blanks) or not self.seen_content
+        self.seen_content = True
+        self.blanks = []
+        self.pending = line[len(content):] + '\n'
+        if new_paragraph:
+            self.paragraphs += 1
+            self.in_outro = self.paragraphs > 1 and bool(_OUTRO.search(content))
+            if not self.in_outro:
+                out.extend(self.held)
+                self.held = []
+        (self.held if self.in_outro else out).append(separator + content)
+
+def _finish_commit_message(text):
     # Remove quotes if they wrap a simple commit message
     text = text.strip()
     if text.count('"') == 2 and text.startswith('"') and text.endswith('"'):
         text = text[1:-1]
     elif text.count("'") == 2 and text.startswith("'") and text.endswith("'"):
         text = text[1:-1]
-    
+
     # Ensure proper formatting for multi-line commits
     lines = text.split('\n')
     if len(lines) > 1:
@@ -85,30 +213,54 @@ def clean_commit_message(text):
             cleaned_lines.append('')  # Add blank line if not present
         cleaned_lines.extend([line.rstrip() for line in lines[1:] if line.strip()])
         text = '\n'.join(cleaned_lines)
-    
+
     return text.strip()
 
+AI_RESPONSE_CLEANUP = CleanupPipeline([_AI_PREFIXES])
+COMMIT_MESSAGE_CLEANUP = CleanupPipeline([_AI_PREFIXES, _COMMIT_PREFIXES], finish=_finish_commit_message)
+REVIEW_OUTPUT_CLEANUP = CleanupPipeline([_AI_PREFIXES, _REVIEW_PREFIXES])
+
+@traced('cleanup.ai_response')
+def clean_ai_response(text):
+    """
+    Clean up AI-generated text by removing common formatting artifacts.
+    Useful for commit messages and review outputs.
+    """
+    return AI_RESPONSE_CLEANUP.clean(text)
+
+@traced('cleanup.commit_message')
+def clean_commit_message(text):
+    """
+    Specifically clean commit messages.
+    """
+    return COMMIT_MESSAGE_CLEANUP.clean(text)
+
+@traced('cleanup.review_output')
 def clean_review_output(text):
     """
     Specifically clean review outputs while preserving formatting.
     """
-    text = clean_ai_response(text)
-    
-    # Remove review-specific artifacts
-    review_artifacts = [
-        r'^code\s+review:?\s*',
-        r'^review\s+results?:?\s*',
-        r'^analysis\s+results?:?\s*'
-    ]
-    
-    for artifact in review_artifacts:
-        text = re.sub(artifact, '', text, flags=re.IGNORECASE)
-    
-    # Preserve important formatting like headers, lists, etc.
-    # Just clean up excessive whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)  # Max 2 consecutive newlines
-    
-    return text.strip()
+    return REVIEW_OUTPUT_CLEANUP.clean(text)
+
+def stream_review_output(pieces):
+    """Clean review output as it streams in; yields the same text clean_review_output() returns."""
+    return REVIEW_OUTPUT_CLEANUP.stream(pieces)
+
+_INTRO_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'here\'s?\s+(the\s+|a\s+)?',
+    r'i\'ll\s+',
+    r'let\s+me\s+',
+    r'sure,?\s+',
+    r'of\s+course,?\s+',
+)]
+
+_OUTRO_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'this\s+(commit\s+)?message',
+    r'hope\s+this\s+helps',
+    r'let\s+me\s+know',
+    r'feel\s+free\s+to',
+    r'if\s+you\s+need',
+)]
 
 def extract_main_content(text):
     """
@@ -117,39 +269,23 @@ def extract_main_content(text):
     """
     if not text:
         return ""
-    
+
     lines = text.strip().split('\n')
-    
+
     # Find the start of main content (skip intro lines)
     start_idx = 0
-    intro_patterns = [
-        r'here\'s?\s+(the\s+|a\s+)?',
-        r'i\'ll\s+',
-        r'let\s+me\s+',
-        r'sure,?\s+',
-        r'of\s+course,?\s+'
-    ]
-    
     for i, line in enumerate(lines):
-        if any(re.match(pattern, line.strip(), re.IGNORECASE) for pattern in intro_patterns):
+        if any(pattern.match(line.strip()) for pattern in _INTRO_PATTERNS):
             start_idx = i + 1
             break
-    
+
     # Find the end of main content (before explanations)
     end_idx = len(lines)
-    outro_patterns = [
-        r'this\s+(commit\s+)?message',
-        r'hope\s+this\s+helps',
-        r'let\s+me\s+know',
-        r'feel\s+free\s+to',
-        r'if\s+you\s+need'
-    ]
-    
     for i in range(start_idx, len(lines)):
-        if any(re.search(pattern, lines[i].strip(), re.IGNORECASE) for pattern in outro_patterns):
+        if any(pattern.search(lines[i].strip()) for pattern in _OUTRO_PATTERNS):
             end_idx = i
             break
-    
+
     # Extract and clean the main content
     main_content = '\n'.join(lines[start_idx:end_idx]).strip()
     return clean_ai_response(main_content)
@@ -157,16 +293,20 @@ def extract_main_content(text):
 def is_wrapped_in_quotes(text):
     """Check if text is wrapped in quotes and should be unwrapped."""
     text = text.strip()
-    return ((text.startswith('"') and text.endswith('"')) or 
+    return ((text.startswith('"') and text.endswith('"')) or
             (text.startswith("'") and text.endswith("'")))
 
+_MARKDOWN_HEADER = re.compile(r'^#+\s*(commit message|review|analysis)\s*:?\s*$', re.IGNORECASE | re.MULTILINE)
+_BOLD = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC = re.compile(r'\*(.*?)\*')
+
 def remove_markdown_artifacts(text):
     """Remove common markdown artifacts from AI responses."""
     # Remove markdown headers if they're just formatting
-    text = re.sub(r'^#+\s*(commit message|review|analysis)\s*:?\s*$', '', text, flags=re.IGNORECASE | re.MULTILINE)
-    
+    text = _MARKDOWN_HEADER.sub('', text)
+
     # Remove bold/italic markdown
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    
+    text = _BOLD.sub(r'\1', text)
+    text = _ITALIC.sub(r'\1', text)
+
     return text
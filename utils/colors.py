@@ -1,5 +1,6 @@
 # Color utilities for git-ai CLI
 import os
+import re
 import sys
 
 class Colors:
@@ -85,6 +86,80 @@ class Colors:
         """Magenta text for highlighting"""
         return cls.colorize(text, cls.MAGENTA + cls.BOLD)
 
+# Keyword sets for coloring AI output, highest priority first: a line gets the color of the
+# first set with a word starting with one of its keywords
+REVIEW_KEYWORDS = [
+    (Colors.RED + Colors.BOLD, ['error', 'bug', 'vulnerability', 'vulnerabilities', 'critical', 'severe', 'dangerous', 'fail']),
+    (Colors.YELLOW, ['warning', 'caution', 'potential', 'consider', 'should', 'might']),
+    (Colors.GREEN, ['good', 'excellent', 'well', 'nice', 'correct', 'proper', 'success']),
+]
+
+class KeywordColorizer:
+    """
+    Colors lines of AI output by keyword, with every keyword set compiled into one regex so each
+    line is scanned once. Keywords match at the start of a word ("errors", "failed", but not
+    "debug"). Lines without a keyword are colored by shape: headers, list items, numbered items.
+    """
+
+    def __init__(self, keywords=None):
+        self.keywords = keywords if keywords is not None else REVIEW_KEYWORDS
+        # All keywords in one pattern, factored into a prefix tree because Python's regex engine
+        # tries alternatives one by one; a line is lowercased once and scanned once
+        self.ranks = {}
+        for rank, (_, words) in enumerate(self.keywords):
+            for word in words:
+                self.ranks.setdefault(word.lower(), rank)
+        self.pattern = re.compile(r'\b' + _prefix_tree_pattern(self.ranks)) if self.ranks else None
+
+    def color_for(self, line):
+        """Return the color code for a line, or None to leave it as it is."""
+        if self.pattern is not None:
+            found = self.pattern.findall(line.lower())
+            if found:
+                return self.keywords[min(self.ranks[word] for word in found)][0]
+        if line.startswith('#'):
+            return Colors.CYAN + Colors.BOLD
+        stripped = line.strip()
+        if stripped and (stripped.startswith(('-', '*', '•', '→', '○')) or stripped[0].isdigit()):
+            return Colors.WHITE
+        return None
+
+    def lines(self, lines, enabled=None):
+        """Color an iterable of lines (e.g. as a review streams in), yielding each one as it comes."""
+        if enabled is None:
+            enabled = Colors.supports_color()
+        if not enabled:
+            yield from lines
+            return
+        for line in lines:
+            color = self.color_for(line)
+            yield f"{color}{line}{Colors.END}" if color else line
+
+def _prefix_tree_pattern(words):
+    """Regex matching any of words, with shared prefixes factored out: bug|c(?:aution|onsider)|..."""
+    tree = {}
+    for word in words:
+        node = tree
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A word that ends here and is also the start of a longer one
+        return f"(?:{body})?" if '' in node else body
+
+    return build(tree)
+
+_review_colorizer = KeywordColorizer()
+
+def colorize_lines(lines):
+    """Color review lines by their keywords as they arrive."""
+    return _review_colorizer.lines(lines)
+
 def format_cli_output(text):
     """
     Format text with colors based on content keywords.
@@ -92,42 +167,7 @@ def format_cli_output(text):
     """
     if not Colors.supports_color():
         return text
-    
-    lines = text.split('\n')
-    formatted_lines = []
-    
-    for line in lines:
-        line_lower = line.lower()
-        
-        # Critical issues - Red
-        if any(word in line_lower for word in ['error', 'bug', 'vulnerability', 'critical', 'severe', 'dangerous', 'fail']):
-            formatted_lines.append(Colors.colorize(line, Colors.RED + Colors.BOLD))
-        
-        # Warnings - Yellow
-        elif any(word in line_lower for word in ['warning', 'caution', 'potential', 'consider', 'should', 'might']):
-            formatted_lines.append(Colors.colorize(line, Colors.YELLOW))
-        
-        # Good practices - Green
-        elif any(word in line_lower for word in ['good', 'excellent', 'well', 'nice', 'correct', 'proper', 'success']):
-            formatted_lines.append(Colors.colorize(line, Colors.GREEN))
-        
-        # Headers (lines starting with #)
-        elif line.startswith('#') or line.startswith('##'):
-            formatted_lines.append(Colors.colorize(line, Colors.CYAN + Colors.BOLD))
-        
-        # List items
-        elif line.strip().startswith(('-', '*', '•', '→')):
-            formatted_lines.append(Colors.colorize(line, Colors.WHITE))
-        
-        # Numbers or bullet points at start
-        elif line.strip() and (line.strip()[0].isdigit() or line.strip().startswith('○')):
-            formatted_lines.append(Colors.colorize(line, Colors.WHITE))
-        
-        # Default
-        else:
-            formatted_lines.append(line)
-    
-    return '\n'.join(formatted_lines)
+    return '\n'.join(_review_colorizer.lines(text.split('\n'), enabled=True))
 
 def print_section_header(title):
     """Print a formatted section header"""
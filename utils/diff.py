@@ -0,0 +1,134 @@
+# Helpers for parsing and sizing unified diffs
+import fnmatch
+import re
+from typing import List, Optional, Tuple
+
+_HUNK_RE = re.compile(r'^@@ ')
+
+class FileDiff:
+	"""The part of a unified diff that belongs to a single file."""
+
+	def __init__(self, path: str, header: List[str], hunks: List[List[str]]):
+		self.path = path
+		self.header = header
+		self.hunks = hunks
+
+	@property
+	def text(self) -> str:
+		lines = list(self.header)
+		for hunk in self.hunks:
+			lines.extend(hunk)
+		return '\n'.join(lines)
+
+	@property
+	def line_count(self) -> int:
+		return sum(len(h) for h in self.hunks)
+
+	def __repr__(self):
+		return f"FileDiff({self.path!r}, hunks={len(self.hunks)})"
+
+def _path_from_header(header: List[str]) -> str:
+	new_path = old_path = None
+	for line in header:
+		if line.startswith('+++ '):
+			new_path = line[4:].strip()
+		elif line.startswith('--- '):
+			old_path = line[4:].strip()
+	for candidate in (new_path, old_path):
+		if candidate and candidate != '/dev/null':
+			return candidate[2:] if candidate[:2] in ('a/', 'b/') else candidate
+	# Binary files and pure renames have no ---/+++ lines
+	m = re.match(r'^diff --git a/(.*) b/(.*)$', header[0]) if header else None
+	return m.group(2) if m else ''
+
+def parse_diff(diff: str) -> List[FileDiff]:
+	"""Split a unified diff into per-file pieces, each with its header and hunks."""
+	files = []
+	header = None
+	hunks = []
+	for line in diff.split('\n'):
+		if line.startswith('diff --git '):
+			if header is not None:
+				files.append(FileDiff(_path_from_header(header), header, hunks))
+			header, hunks = [line], []
+		elif header is None:
+			continue
+		elif _HUNK_RE.match(line):
+			hunks.append([line])
+		elif hunks:
+			hunks[-1].append(line)
+		else:
+			header.append(line)
+	if header is not None:
+		files.append(FileDiff(_path_from_header(header), header, hunks))
+	return files
+
+def estimate_tokens(text: str) -> int:
+	"""Rough token estimate (about four characters per token for code and English)."""
+	return len(text) // 4 + 1 if text else 0
+
+# Files that are almost never worth sending to a model
+DEFAULT_IGNORE_GLOBS = [
+	'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'npm-shrinkwrap.json', 'poetry.lock',
+	'Pipfile.lock', 'Cargo.lock', 'composer.lock', 'Gemfile.lock', 'go.sum', 'uv.lock',
+	'*.min.js', '*.min.css', '*.map', '*_pb2.py', '*_pb2_grpc.py', '*.pb.go', '*.pb.cc', '*.pb.h',
+	'vendor/*', '*/vendor/*', 'node_modules/*', '*/node_modules/*', 'third_party/*',
+]
+
+_GENERATED_MARKERS = ('@generated', 'do not edit', 'code generated by', 'autogenerated', 'auto-generated')
+_MINIFIED_LINE_LENGTH = 500
+
+def _matches_any(path: str, globs: List[str]) -> Optional[str]:
+	name = path.rsplit('/', 1)[-1]
+	for pattern in globs:
+		if fnmatch.fnmatchcase(path, pattern) or fnmatch.fnmatchcase(name, pattern):
+			return pattern
+	return None
+
+def _looks_generated(file: FileDiff) -> Optional[str]:
+	"""Return a reason if the file diff looks machine-generated or minified, else None."""
+	added = [line[1:] for hunk in file.hunks for line in hunk[1:] if line.startswith('+')]
+	head = '\n'.join(added[:20]).lower()
+	for marker in _GENERATED_MARKERS:
+		if marker in head:
+			return f"generated ('{marker}' marker)"
+	if added and sum(len(line) for line in added) / len(added) > _MINIFIED_LINE_LENGTH:
+		return "minified (very long lines)"
+	return None
+
+def _truncate(file: FileDiff, max_lines: int) -> FileDiff:
+	hunks, remaining = [], max_lines
+	for hunk in file.hunks:
+		if remaining <= 0:
+			break
+		hunks.append(hunk[:remaining + 1])  # +1 keeps the @@ line
+		remaining -= len(hunk) - 1
+	omitted = file.line_count - sum(len(h) for h in hunks)
+	if hunks and omitted > 0:
+		hunks[-1] = hunks[-1] + [f"\\ ... {omitted} more line(s) omitted"]
+	return FileDiff(file.path, file.header, hunks)
+
+def filter_diff(diff: str, ignore_globs: Optional[List[str]] = None, max_file_lines: int = 0,
+		skip_generated: bool = True) -> Tuple[str, List[Tuple[str, str]]]:
+	"""
+	Drop noise from a diff before it is sent to a model.
+	Returns the filtered diff and a list of (path, reason) for every file that was dropped or truncated.
+	"""
+	globs = DEFAULT_IGNORE_GLOBS + list(ignore_globs or [])
+	kept, dropped = [], []
+	for file in parse_diff(diff):
+		pattern = _matches_any(file.path, globs)
+		if pattern:
+			dropped.append((file.path, f"ignored ({pattern})"))
+			continue
+		reason = _looks_generated(file) if skip_generated else None
+		if reason:
+			dropped.append((file.path, reason))
+			continue
+		if max_file_lines and file.line_count > max_file_lines:
+			dropped.append((file.path, f"truncated from {file.line_count} to {max_file_lines} lines"))
+			file = _truncate(file, max_file_lines)
+		kept.append(file.text)
+	if not kept and not dropped:
+		return diff, []  # Not a git-style diff; leave it alone
+	return '\n'.join(kept), dropped
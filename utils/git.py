@@ -1,6 +1,11 @@
 # Versatile Git utility functions
+import atexit
+import os
 import subprocess
+import threading
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .profiling import span, count
 
 def run_git_command(args, repo_path=None, capture_output=True, check=True, text=True):
 	"""Run a git command and return output or raise error."""
@@ -13,39 +18,266 @@ def run_git_command(args, repo_path=None, capture_output=True, check=True, text=
 		'encoding': 'utf-8',
 		'errors': 'replace'  # Replace invalid characters instead of failing
 	}
-	result = subprocess.run(cmd, **{k: v for k, v in kwargs.items() if v is not None})
+	with span('git', cmd=args[0] if args else ''):
+		result = subprocess.run(cmd, **{k: v for k, v in kwargs.items() if v is not None})
+	count('git.processes')
 	if capture_output:
 		return (result.stdout or "").strip()
 	return result
 
+class _BatchProcess:
+	"""A long-lived `git cat-file --batch` or `--batch-check` process, shared under a lock."""
+
+	def __init__(self, cwd: str, mode: str):
+		self.cwd = cwd
+		self.mode = mode
+		self.lock = threading.Lock()
+		self.proc: Optional[subprocess.Popen] = None
+
+	def _start(self):
+		count('git.processes')
+		self.proc = subprocess.Popen(
+			['git', 'cat-file', self.mode], cwd=self.cwd,
+			stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+		)
+
+	def query(self, rev: str) -> Tuple[Optional[Tuple[str, str, int]], Optional[bytes]]:
+		"""Return ((sha, type, size), content) for rev, or (None, None) if it does not exist."""
+		if '\n' in rev:
+			raise ValueError("Object names cannot contain newlines")
+		with self.lock, span('git.cat-file'):
+			if self.proc is None or self.proc.poll() is not None:
+				self._start()
+			self.proc.stdin.write(rev.encode('utf-8') + b'\n')
+			self.proc.stdin.flush()
+			header = self.proc.stdout.readline()
+			if not header:
+				self.proc = None
+				raise RuntimeError(f"git cat-file exited while reading {rev}")
+			if header.endswith((b' missing\n', b' ambiguous\n')):
+				# "<rev> missing" or "<rev> ambiguous"; rev itself may contain spaces
+				return None, None
+			fields = header.decode('utf-8', 'replace').rsplit(None, 2)
+			info = (fields[0], fields[1], int(fields[2]))
+			if self.mode != '--batch':
+				return info, None
+			content = self.proc.stdout.read(info[2])
+			self.proc.stdout.read(1)  # Trailing newline after the object
+			return info, content
+
+	def close(self):
+		with self.lock:
+			if self.proc is not None:
+				try:
+					self.proc.stdin.close()
+					self.proc.wait(timeout=5)
+				except Exception:
+					self.proc.kill()
+				self.proc = None
+
+class GitRepo:
+	"""
+	A git repository with the root, git dir, HEAD and branch looked up once and cached.
+	Object reads go through persistent `git cat-file` processes instead of one fork per call.
+	Methods that change HEAD or the index clear the cached values; call refresh() after
+	outside changes.
+	"""
+
+	def __init__(self, path=None):
+		self.path = str(path) if path else None
+		self._root: Optional[str] = None
+		self._git_dir: Optional[str] = None
+		self._head: Optional[str] = None
+		self._head_known = False
+		self._branch: Optional[str] = None
+		self._batch: Optional[_BatchProcess] = None
+		self._batch_check: Optional[_BatchProcess] = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def _locate(self):
+		output = run_git_command(['rev-parse', '--absolute-git-dir', '--show-toplevel'], self.path)
+		lines = output.splitlines()
+		self._git_dir = lines[0]
+		# Bare repositories have no work tree
+		self._root = lines[1] if len(lines) > 1 else lines[0]
+
+	@property
+	def root(self) -> str:
+		"""Absolute path of the work tree."""
+		if self._root is None:
+			self._locate()
+		return self._root
+
+	@property
+	def git_dir(self) -> str:
+		"""Absolute path of the git directory (per-worktree for linked worktrees)."""
+		if self._git_dir is None:
+			self._locate()
+		return self._git_dir
+
+	@property
+	def head(self) -> Optional[str]:
+		"""SHA of HEAD, or None on an unborn branch."""
+		if not self._head_known:
+			info = self.object_info('HEAD')
+			self._head = info[0] if info else None
+			self._head_known = True
+		return self._head
+
+	@property
+	def branch(self) -> str:
+		"""Current branch name, or 'HEAD' when detached (same as `git rev-parse --abbrev-ref HEAD`)."""
+		if self._branch is None:
+			try:
+				ref = (Path(self.git_dir) / 'HEAD').read_text(encoding='utf-8').strip()
+			except OSError:
+				ref = ''
+			if ref.startswith('ref: '):
+				ref = ref[5:]
+				self._branch = ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ref
+			elif ref:
+				self._branch = 'HEAD'
+			else:
+				self._branch = run_git_command(['rev-parse', '--abbrev-ref', 'HEAD'], self.root)
+		return self._branch
+
+	def refresh(self):
+		"""Forget cached HEAD and branch, e.g. after another process committed."""
+		self._head = None
+		self._head_known = False
+		self._branch = None
+
+	def run(self, args: List[str], check: bool = True) -> str:
+		"""Run a git command in the repository and return its output as text."""
+		return run_git_command(args, self.root, check=check)
+
+	def run_bytes(self, args: List[str], check: bool = True, input: Optional[bytes] = None,
+			env: Optional[Dict[str, str]] = None) -> bytes:
+		"""Run a git command in the repository and return its raw output. `env` adds to the environment."""
+		full_env = dict(os.environ, **env) if env else None
+		with span('git', cmd=args[0] if args else '') as current:
+			result = subprocess.run(['git'] + args, cwd=self.root, input=input, capture_output=True, check=check, env=full_env)
+			current.set(bytes=len(result.stdout))
+		count('git.processes')
+		return result.stdout
+
+	def _batch_process(self, check_only: bool) -> _BatchProcess:
+		if check_only:
+			if self._batch_check is None:
+				self._batch_check = _BatchProcess(self.root, '--batch-check')
+			return self._batch_check
+		if self._batch is None:
+			self._batch = _BatchProcess(self.root, '--batch')
+		return self._batch
+
+	def object_info(self, rev: str) -> Optional[Tuple[str, str, int]]:
+		"""Return (sha, type, size) for any revision or `rev:path`, or None if it does not exist."""
+		return self._batch_process(True).query(rev)[0]
+
+	def read_object(self, rev: str) -> Optional[Tuple[str, bytes]]:
+		"""Return (type, content) of an object, or None if it does not exist."""
+		info, content = self._batch_process(False).query(rev)
+		return (info[1], content) if info else None
+
+	def read_blob(self, path: str, rev: str = 'HEAD') -> Optional[bytes]:
+		"""Return a file's contents at a revision, or None if it is not there."""
+		obj = self.read_object(f"{rev}:{path}")
+		return obj[1] if obj and obj[0] == 'blob' else None
+
+	def diff_bytes(self, staged: bool = False, commit: Optional[str] = None, working: bool = False) -> bytes:
+		"""Raw diff output; see diff()."""
+		if commit:
+			return self.run_bytes(['diff', commit])
+		if working:
+			if self.head:
+				# One diff of the work tree against HEAD covers staged and unstaged changes
+				return self.run_bytes(['diff', 'HEAD'])
+			return self.run_bytes(['diff', '--staged']) + b'\n' + self.run_bytes(['diff'])
+		return self.run_bytes(['diff', '--staged'] if staged else ['diff'])
+
+	def diff(self, staged: bool = False, commit: Optional[str] = None, working: bool = False) -> str:
+		"""
+		Diff between commits, of staged changes, of unstaged changes, or (working=True) of
+		all changes in the work tree, staged or not.
+		"""
+		return self.diff_bytes(staged, commit, working).decode('utf-8', 'replace').strip()
+
+	def status(self) -> str:
+		return self.run(['status', '--short'])
+
+	def ls_files(self) -> List[str]:
+		"""Tracked file paths, relative to the repository root."""
+		output = self.run_bytes(['ls-files', '-z'])
+		return [f for f in output.decode('utf-8', 'replace').split('\0') if f]
+
+	def stage_all(self):
+		run_git_command(['add', '.'], self.path, capture_output=False)
+
+	def commit(self, msg: str):
+		run_git_command(['commit', '-m', msg], self.path, capture_output=False)
+		self.refresh()
+
+	def push(self):
+		run_git_command(['push'], self.path, capture_output=False)
+
+	def close(self):
+		"""Stop the cat-file processes; they restart on the next read."""
+		for batch in (self._batch, self._batch_check):
+			if batch is not None:
+				batch.close()
+
+_repos: Dict[str, GitRepo] = {}
+_repos_lock = threading.Lock()
+
+def get_repo(repo_path=None) -> GitRepo:
+	"""Return the shared GitRepo for a path (default: the current directory)."""
+	key = os.path.abspath(str(repo_path) if repo_path else os.getcwd())
+	with _repos_lock:
+		if key not in _repos:
+			_repos[key] = GitRepo(repo_path)
+		return _repos[key]
+
+@atexit.register
+def _close_repos():
+	for repo in list(_repos.values()):
+		repo.close()
+
+def parse_range(spec: str):
+	"""Split A..B into (A, B); a single revision A means A..HEAD."""
+	if '...' in spec:
+		raise ValueError("Symmetric ranges (A...B) are not supported; use A..B")
+	if '..' in spec:
+		start, end = spec.split('..', 1)
+		return start or 'HEAD', end or 'HEAD'
+	return spec, 'HEAD'
+
 def get_branch(repo_path=None):
 	"""Get current branch name."""
-	return run_git_command(['rev-parse', '--abbrev-ref', 'HEAD'], repo_path)
+	return get_repo(repo_path).branch
 
 def get_status(repo_path=None):
 	"""Get git status (short)."""
-	return run_git_command(['status', '--short'], repo_path)
-
-def get_diff(staged=False, repo_path=None, commit=None):
-	"""Get git diff (staged, unstaged, or between commits)."""
-	if commit:
-		args = ['diff', commit]
-	elif staged:
-		args = ['diff', '--staged']
-	else:
-		args = ['diff']
-	return run_git_command(args, repo_path)
+	return get_repo(repo_path).status()
+
+def get_diff(staged=False, repo_path=None, commit=None, working=False):
+	"""Get git diff (staged, unstaged, all working tree changes, or between commits)."""
+	return get_repo(repo_path).diff(staged=staged, commit=commit, working=working)
 
 def stage_all(repo_path=None):
 	"""Stage all changes."""
-	run_git_command(['add', '.'], repo_path, capture_output=False)
+	get_repo(repo_path).stage_all()
 
 def commit(msg, repo_path=None):
 	"""Commit staged changes with a message."""
-	run_git_command(['commit', '-m', msg], repo_path, capture_output=False)
+	get_repo(repo_path).commit(msg)
 
 def push(repo_path=None):
 	"""Push to remote."""
-	run_git_command(['push'], repo_path, capture_output=False)
+	get_repo(repo_path).push()
 
 # Future: Add helpers for branch creation, tag, log, blame, etc.
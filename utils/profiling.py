@@ -0,0 +1,166 @@
+# Lightweight spans, counters and memory tracking for --profile and --trace-file
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from .colors import Colors
+
+_enabled = False
+_origin = time.perf_counter()
+_spans: List[Dict[str, Any]] = []
+_counters: Dict[str, float] = defaultdict(float)
+_lock = threading.Lock()
+_local = threading.local()
+
+def is_enabled() -> bool:
+	return _enabled
+
+def enable(origin: Optional[float] = None, memory: bool = True):
+	"""Start recording spans and counters; origin is the perf_counter() value traces start from."""
+	global _enabled, _origin
+	_enabled = True
+	if origin is not None:
+		_origin = origin
+	if memory and not tracemalloc.is_tracing():
+		tracemalloc.start()
+
+class _Span:
+	"""A running span; attributes can be added while it is open (e.g. time to first token)."""
+
+	def __init__(self, name: str, attrs: Dict[str, Any]):
+		self.name = name
+		self.attrs = attrs
+		self.start = time.perf_counter()
+
+	def set(self, **attrs):
+		self.attrs.update(attrs)
+
+	def mark(self, attr: str):
+		"""Record the time since the span started, in ms, unless already recorded."""
+		if attr not in self.attrs:
+			self.attrs[attr] = round((time.perf_counter() - self.start) * 1000, 3)
+
+class _NoSpan:
+	def set(self, **attrs):
+		pass
+
+	def mark(self, attr: str):
+		pass
+
+_NO_SPAN = _NoSpan()
+
+@contextmanager
+def _record(name: str, attrs: Dict[str, Any]):
+	current = _Span(name, attrs)
+	stack = getattr(_local, 'stack', None)
+	if stack is None:
+		stack = _local.stack = []
+	parent = stack[-1].name if stack else None
+	stack.append(current)
+	try:
+		yield current
+	finally:
+		stack.pop()
+		end = time.perf_counter()
+		event = {
+			'name': name,
+			'start': current.start - _origin,
+			'dur': end - current.start,
+			'tid': threading.get_ident(),
+			'parent': parent,
+			'attrs': current.attrs,
+		}
+		with _lock:
+			_spans.append(event)
+
+@contextmanager
+def _no_record():
+	yield _NO_SPAN
+
+def span(name: str, **attrs):
+	"""Time a block: `with span('git', cmd='diff'):`. Costs almost nothing while profiling is off."""
+	if not _enabled:
+		return _no_record()
+	return _record(name, attrs)
+
+def traced(name: str):
+	"""Decorator form of span() for whole functions."""
+	def decorator(fn):
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			if not _enabled:
+				return fn(*args, **kwargs)
+			with _record(name, {}):
+				return fn(*args, **kwargs)
+		return wrapper
+	return decorator
+
+def add_span(name: str, start: float, end: float, **attrs):
+	"""Record a span that was timed elsewhere (perf_counter() values)."""
+	if _enabled:
+		with _lock:
+			_spans.append({'name': name, 'start': start - _origin, 'dur': end - start,
+				'tid': threading.get_ident(), 'parent': None, 'attrs': attrs})
+
+def count(name: str, value: float = 1):
+	"""Add to a counter, e.g. bytes sent or git processes started."""
+	if _enabled:
+		with _lock:
+			_counters[name] += value
+
+def peak_memory() -> Optional[int]:
+	return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+
+def summary() -> Dict[str, Any]:
+	"""Per-span-name totals, counters and peak traced memory."""
+	totals: Dict[str, Dict[str, float]] = {}
+	for event in _spans:
+		entry = totals.setdefault(event['name'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+		ms = event['dur'] * 1000
+		entry['count'] += 1
+		entry['total_ms'] += ms
+		entry['max_ms'] = max(entry['max_ms'], ms)
+	return {'spans': totals, 'counters': dict(_counters), 'peak_memory_bytes': peak_memory()}
+
+def print_report():
+	"""Human-readable profile: where the time went, by span name, plus counters and memory."""
+	data = summary()
+	total = time.perf_counter() - _origin
+	print(Colors.header("\n⏱  Profile"))
+	print(Colors.info(f"  Wall time: {total * 1000:.1f} ms"))
+	for name, entry in sorted(data['spans'].items(), key=lambda item: -item[1]['total_ms']):
+		calls = f" in {entry['count']} calls (max {entry['max_ms']:.1f} ms)" if entry['count'] > 1 else ""
+		print(Colors.dim(f"  {name:<24} {entry['total_ms']:>9.1f} ms{calls}"))
+	for name, value in sorted(data['counters'].items()):
+		print(Colors.dim(f"  {name:<24} {value:>12,.0f}"))
+	if data['peak_memory_bytes'] is not None:
+		print(Colors.dim(f"  {'peak memory (traced)':<24} {data['peak_memory_bytes'] / 1024 / 1024:>9.1f} MB"))
+
+def write_trace(path: str):
+	"""
+	Write the recorded spans. A `.jsonl` file gets one JSON object per span plus a summary line,
+	appended so several processes (e.g. both git hooks) can share one file; any other name gets
+	a Chrome trace (open it in chrome://tracing or Perfetto).
+	"""
+	pid = os.getpid()
+	if path.endswith('.jsonl'):
+		with open(path, 'a', encoding='utf-8') as f:
+			for event in _spans:
+				line = {k: v for k, v in event.items() if k not in ('start', 'dur')}
+				line.update(pid=pid, start_ms=event['start'] * 1000, dur_ms=event['dur'] * 1000)
+				f.write(json.dumps(line, default=str) + '\n')
+			f.write(json.dumps(dict(summary(), type='summary', pid=pid), default=str) + '\n')
+		return
+	events = [{
+		'name': event['name'], 'ph': 'X', 'pid': pid, 'tid': event['tid'],
+		'ts': event['start'] * 1e6, 'dur': event['dur'] * 1e6, 'args': event['attrs'],
+	} for event in _spans]
+	for name, value in _counters.items():
+		events.append({'name': name, 'ph': 'C', 'pid': pid, 'ts': (time.perf_counter() - _origin) * 1e6, 'args': {name: value}})
+	with open(path, 'w', encoding='utf-8') as f:
+		json.dump({'traceEvents': events, 'otherData': {'peak_memory_bytes': peak_memory()}}, f, default=str)
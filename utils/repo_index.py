@@ -0,0 +1,126 @@
+# Cached index of tracked repository files, used to give the model context around a change
+import json
+import os
+import posixpath
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from .git import get_repo
+
+CACHE_NAME = 'git-ai-files.json'
+
+class RepoIndex:
+	"""
+	The list of tracked files from `git ls-files`, which already respects .gitignore.
+	The list is cached in the git directory and reused until the git index or HEAD changes.
+	"""
+
+	def __init__(self, files: List[str]):
+		self.files = files
+		self._by_dir: Optional[Dict[str, List[str]]] = None
+		self._by_stem: Optional[Dict[str, List[str]]] = None
+
+	def __len__(self):
+		return len(self.files)
+
+	@staticmethod
+	def _fingerprint(git_dir: Path) -> Dict[str, object]:
+		"""Cheap cache key: index mtime/size and the contents of HEAD (no git process needed)."""
+		fingerprint: Dict[str, object] = {}
+		try:
+			st = (git_dir / 'index').stat()
+			fingerprint['index'] = [st.st_mtime_ns, st.st_size]
+		except OSError:
+			fingerprint['index'] = None
+		try:
+			fingerprint['head'] = (git_dir / 'HEAD').read_text(encoding='utf-8').strip()
+		except OSError:
+			fingerprint['head'] = None
+		return fingerprint
+
+	@classmethod
+	def load(cls, repo_path=None) -> 'RepoIndex':
+		"""Return the index for the repository, from cache when it is still current."""
+		repo = get_repo(repo_path)
+		git_dir = Path(repo.git_dir)
+		cache_file = git_dir / CACHE_NAME
+		fingerprint = cls._fingerprint(git_dir)
+		try:
+			with open(cache_file, 'r', encoding='utf-8') as f:
+				cached = json.load(f)
+			if cached.get('fingerprint') == fingerprint:
+				return cls(cached['files'])
+		except (OSError, ValueError, KeyError):
+			pass
+		files = repo.ls_files()
+		try:
+			fd, tmp = tempfile.mkstemp(dir=str(git_dir), suffix='.tmp')
+			with os.fdopen(fd, 'w', encoding='utf-8') as f:
+				json.dump({'fingerprint': fingerprint, 'files': files}, f)
+			os.replace(tmp, cache_file)
+		except OSError:
+			pass  # Read-only git dir; the index still works, just uncached
+		return cls(files)
+
+	def _build_maps(self):
+		self._by_dir, self._by_stem = {}, {}
+		for path in self.files:
+			directory, name = posixpath.split(path)
+			self._by_dir.setdefault(directory, []).append(path)
+			self._by_stem.setdefault(_stem(name), []).append(path)
+
+	def near(self, paths: Iterable[str], limit: int = 20) -> List[str]:
+		"""
+		Return tracked files related to the given paths, most relevant first: files in the same
+		directory, files with a matching name elsewhere (e.g. tests), then files in parent directories.
+		"""
+		if self._by_dir is None:
+			self._build_maps()
+		paths = [p for p in paths if p]
+		exclude = set(paths)
+		result: List[str] = []
+		seen = set(exclude)
+
+		def take(candidates):
+			for candidate in candidates:
+				if len(result) >= limit:
+					return
+				if candidate not in seen:
+					seen.add(candidate)
+					result.append(candidate)
+
+		# Interleave candidates across the changed paths so each one gets some context
+		take(_interleave([self._by_dir.get(posixpath.dirname(p), []) for p in paths]))
+		stems = [_stem(posixpath.basename(p)) for p in paths]
+		take(_interleave([self._by_stem.get(stem, []) for stem in stems if stem]))
+		parents = [posixpath.dirname(posixpath.dirname(p)) if posixpath.dirname(p) else None for p in paths]
+		while len(result) < limit and any(d is not None for d in parents):
+			take(_interleave([self._by_dir.get(d, []) for d in parents if d is not None]))
+			parents = [posixpath.dirname(d) if d else None for d in parents]
+		return result
+
+	def describe(self, paths: Iterable[str], limit: int = 20) -> str:
+		"""One-line summary of the repository and the files near the changed paths, for prompts."""
+		nearby = self.near(paths, limit)
+		summary = f"{len(self.files)} tracked files"
+		if nearby:
+			summary += f"; files near the changes: {', '.join(nearby)}"
+		return summary
+
+def _stem(name: str) -> str:
+	"""Normalize a file name so foo.py, test_foo.py and foo_test.go share a stem."""
+	stem = name.split('.', 1)[0].lower()
+	for affix in ('test_', 'tests_', 'spec_'):
+		if stem.startswith(affix):
+			stem = stem[len(affix):]
+	for affix in ('_test', '_tests', '_spec'):
+		if stem.endswith(affix):
+			stem = stem[:-len(affix)]
+	return stem
+
+def _interleave(lists: List[List[str]]) -> Iterable[str]:
+	"""Yield the first item of each list, then the second of each, and so on."""
+	for i in range(max((len(items) for items in lists), default=0)):
+		for items in lists:
+			if i < len(items):
+				yield items[i]